@@ -0,0 +1,45 @@
+import hmac
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from core.catalog import reload_catalog
+from core.config import settings
+from core.metrics import registry
+from db.instrumentation import query_stats
+
+router = APIRouter(tags=["admin"])
+
+
+def require_metrics_access(authorization: str | None = Header(None)) -> None:
+    """METRICS_ENABLED 가 아니면 엔드포인트 자체를 숨기고(404), 토큰이 설정돼 있으면 Bearer 토큰을 확인."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(_: None = Depends(require_metrics_access)):
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/debug/queries", include_in_schema=False)
+def top_queries(
+    by: Literal["total", "count", "max"] = Query("total"),
+    limit: int = Query(20, ge=1, le=200),
+    _: None = Depends(require_metrics_access),
+):
+    """지문별 누적 시간/횟수 상위 쿼리 (이 워커 프로세스 기준)."""
+    return {"by": by, "fingerprints": len(query_stats), "top": query_stats.top(by=by, limit=limit)}
+
+
+@router.post("/debug/catalog/reload", include_in_schema=False)
+def reload_car_catalog(_: None = Depends(require_metrics_access)):
+    """제조사/모델 카탈로그를 DB 에서 다시 읽음 (요청을 받은 워커 프로세스만 갱신)."""
+    catalog = reload_catalog()
+    return {"entries": catalog.size, "version": catalog.version}
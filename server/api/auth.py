@@ -5,21 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
-from core.auth import get_current_user
+from core.auth import get_current_user, invalidate_principal
 from core.config import settings
 from core.security import create_token, hash_password, verify_password
 from db.session import get_db
-from models.ChargingRecord import ChargingRecord
-from models.ConsumableItem import Consumable, ConsumableItem
-from models.Expense import Expense
-from models.FuelRecord import FuelRecord
-from models.MaintenanceRecord import MaintenanceRecord
-from models.Notification import Notification
-from models.Tire import TireMeasurement, TireServiceRecord, VehicleTire
+from jobs.account_deletion import request_account_deletion
 from models.User import User
-from models.Vehicle import Vehicle
-from models.VehicleOdometerLog import VehicleOdometerLog
-from models.legalinfo import LegalInfo, LegalNotification
 from schemas.auth import GuestResumeIn, LoginIn, RegisterIn, TokenOut
 
 router = APIRouter(tags=["auth"])
@@ -60,29 +51,6 @@ def generate_guest_username(db: Session) -> str:
             return candidate
 
 
-def delete_user_account(db: Session, user: User) -> None:
-    user_id = user.id
-    vehicle_ids = [vehicle.id for vehicle in db.query(Vehicle.id).filter(Vehicle.user_id == user_id).all()]
-
-    db.query(Notification).filter(Notification.user_id == user_id).delete(synchronize_session=False)
-    db.query(MaintenanceRecord).filter(MaintenanceRecord.user_id == user_id).delete(synchronize_session=False)
-    db.query(Consumable).filter(Consumable.user_id == user_id).delete(synchronize_session=False)
-    db.query(ConsumableItem).filter(ConsumableItem.user_id == user_id).delete(synchronize_session=False)
-    db.query(TireMeasurement).filter(TireMeasurement.user_id == user_id).delete(synchronize_session=False)
-    db.query(TireServiceRecord).filter(TireServiceRecord.user_id == user_id).delete(synchronize_session=False)
-    db.query(VehicleTire).filter(VehicleTire.user_id == user_id).delete(synchronize_session=False)
-    db.query(LegalNotification).filter(LegalNotification.user_id == user_id).delete(synchronize_session=False)
-    db.query(LegalInfo).filter(LegalInfo.user_id == user_id).delete(synchronize_session=False)
-    if vehicle_ids:
-        db.query(FuelRecord).filter(FuelRecord.vehicle_id.in_(vehicle_ids)).delete(synchronize_session=False)
-        db.query(ChargingRecord).filter(ChargingRecord.vehicle_id.in_(vehicle_ids)).delete(synchronize_session=False)
-        db.query(Expense).filter(Expense.vehicle_id.in_(vehicle_ids)).delete(synchronize_session=False)
-        db.query(VehicleOdometerLog).filter(VehicleOdometerLog.vehicle_id.in_(vehicle_ids)).delete(synchronize_session=False)
-        db.query(Vehicle).filter(Vehicle.id.in_(vehicle_ids)).delete(synchronize_session=False)
-    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
-    db.commit()
-
-
 @router.post("/register", response_model=TokenOut)
 def register(body: RegisterIn, db: Session = Depends(get_db)):
     if db.query(User).filter(User.username == body.username).first():
@@ -92,13 +60,19 @@ def register(body: RegisterIn, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
     return build_token_response(user)
 
 
 @router.post("/login", response_model=TokenOut)
 def login(body: LoginIn, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == body.username).first()
-    if not user or account_type_for(user) == "guest" or not verify_password(body.password, user.password_hash):
+    if (
+        not user
+        or user.disabled_at is not None
+        or account_type_for(user) == "guest"
+        or not verify_password(body.password, user.password_hash)
+    ):
         raise HTTPException(401, "Invalid credentials")
     return build_token_response(user)
 
@@ -110,6 +84,7 @@ def guest_login(db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
     return build_token_response(user, include_guest_resume=True)
 
 
@@ -128,13 +103,14 @@ def resume_guest(body: GuestResumeIn, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="비회원 세션을 다시 확인할 수 없습니다.")
 
     user = db.query(User).filter(User.username == username).first()
-    if not user:
+    if not user or user.disabled_at is not None:
         raise HTTPException(status_code=404, detail="비회원 계정을 찾을 수 없습니다.")
 
     return build_token_response(user, include_guest_resume=True)
 
 
-@router.delete("/me")
+@router.delete("/me", status_code=202)
 def delete_me(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    delete_user_account(db, current_user)
-    return {"ok": True}
+    """계정을 바로 비활성화하고 데이터 삭제는 백그라운드 작업으로 진행 (GET /account-deletion/status/{job_id})."""
+    job_id = request_account_deletion(db, current_user.id)
+    return {"ok": True, "job_id": str(job_id)}
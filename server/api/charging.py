@@ -1,21 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import delete_owned, fetch_owned_page, insert_owned, owned_vehicle_select, update_owned, vehicle_not_found
+from db.pagination import MAX_PAGE_SIZE, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.ChargingRecord import ChargingRecord
 from models.User import User
 from models.Vehicle import Vehicle
 from schemas.charging import ChargingCreate, ChargingOut
 
-router = APIRouter()
-
-
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+router = APIRouter(route_class=DbRoute)
 
 
 def serialize_charging_record(record: ChargingRecord) -> dict:
@@ -38,23 +39,24 @@ def add_charging(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    ensure_vehicle(body.vehicle_id, current_user, db)
-    record = ChargingRecord(**body.model_dump())
-    db.add(record)
+    record = insert_owned(db, ChargingRecord, current_user.id, body.model_dump())
     db.commit()
-    db.refresh(record)
     return serialize_charging_record(record)
 
 
 @router.get("/list", response_model=list[ChargingOut])
-def list_charging(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    records = (
-        db.query(ChargingRecord)
-        .filter(ChargingRecord.vehicle_id == vehicleId)
-        .order_by(ChargingRecord.date.desc(), ChargingRecord.id.desc())
-        .all()
+def list_charging(
+    vehicleId: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    records, next_cursor = fetch_owned_page(
+        db, ChargingRecord, vehicleId, current_user.id, sort_column=ChargingRecord.date, cursor=cursor, limit=limit
     )
+    set_next_cursor(response, next_cursor)
     return [serialize_charging_record(record) for record in records]
 
 
@@ -65,54 +67,63 @@ def update_charging(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    ensure_vehicle(payload.vehicle_id, current_user, db)
-    record = (
-        db.query(ChargingRecord)
-        .filter(ChargingRecord.id == charging_id, ChargingRecord.vehicle_id == payload.vehicle_id)
-        .first()
+    record = update_owned(
+        db,
+        ChargingRecord,
+        current_user.id,
+        payload.model_dump(),
+        ChargingRecord.id == charging_id,
+        ChargingRecord.vehicle_id == payload.vehicle_id,
     )
     if not record:
         raise HTTPException(status_code=404, detail="Charging record not found")
-    for field, value in payload.model_dump().items():
-        setattr(record, field, value)
-    db.add(record)
     db.commit()
-    db.refresh(record)
     return serialize_charging_record(record)
 
 
 @router.delete("/{charging_id}")
 def delete_charging(charging_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    record = db.query(ChargingRecord).filter(ChargingRecord.id == charging_id).first()
-    if not record:
+    if not delete_owned(db, ChargingRecord, current_user.id, ChargingRecord.id == charging_id):
         raise HTTPException(status_code=404, detail="Charging record not found")
-    ensure_vehicle(record.vehicle_id, current_user, db)
-    db.delete(record)
     db.commit()
     return {"ok": True}
 
 
 @router.get("/stats")
 def charging_stats(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    rows = (
-        db.query(ChargingRecord)
-        .filter(ChargingRecord.vehicle_id == vehicleId)
-        .order_by(ChargingRecord.odo_km, ChargingRecord.date, ChargingRecord.id)
-        .all()
+    """
+    합계와 평균 전비를 집계 한 문장으로 계산.
+    - 평균 전비 = (마지막 주행거리 - 첫 주행거리) / 첫 충전을 제외한 충전량 합 ((odo_km, date, id) 순)
+    """
+    stmt = (
+        select(
+            func.count(ChargingRecord.id),
+            func.coalesce(func.sum(ChargingRecord.price_total), 0),
+            func.coalesce(func.sum(ChargingRecord.energy_kwh), 0),
+            func.max(ChargingRecord.odo_km) - func.min(ChargingRecord.odo_km),
+            func.array_agg(
+                aggregate_order_by(ChargingRecord.energy_kwh, ChargingRecord.odo_km, ChargingRecord.date, ChargingRecord.id)
+            )[1],
+        )
+        .select_from(Vehicle)
+        .outerjoin(ChargingRecord, ChargingRecord.vehicle_id == Vehicle.id)
+        .where(Vehicle.id == vehicleId, Vehicle.user_id == current_user.id)
+        .group_by(Vehicle.id)
     )
-    total_cost = float(sum(float(row.price_total or 0) for row in rows))
-    total_kwh = float(sum(float(row.energy_kwh or 0) for row in rows))
+    row = db.execute(stmt).first()
+    if row is None:
+        raise vehicle_not_found()
+    count, total_cost, total_kwh, distance_km, first_kwh = row
+    total_cost, total_kwh = float(total_cost), float(total_kwh)
     avg_cost_per_kwh = (total_cost / total_kwh) if total_kwh > 0 else None
-    if len(rows) < 2:
+    if count < 2:
         return {
             "avg_km_per_kwh": None,
             "total_cost": total_cost,
             "total_kwh": total_kwh,
             "avg_cost_per_kwh": avg_cost_per_kwh,
         }
-    distance_km = (rows[-1].odo_km or 0) - (rows[0].odo_km or 0)
-    consumed_kwh = sum(float(row.energy_kwh or 0) for row in rows[1:])
+    consumed_kwh = total_kwh - float(first_kwh)
     avg = (distance_km / consumed_kwh) if consumed_kwh > 0 else None
     return {
         "avg_km_per_kwh": avg,
@@ -120,3 +131,94 @@ def charging_stats(vehicleId: int, db: Session = Depends(get_db), current_user:
         "total_kwh": total_kwh,
         "avg_cost_per_kwh": avg_cost_per_kwh,
     }
+
+
+@router.get("/efficiency")
+def charging_efficiency(
+    vehicleId: int,
+    groupBy: Optional[Literal["charge_type"]] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    충전 사이 구간별 전비(km/kWh) 시리즈.
+    - 구간 = 직전 충전 ~ 이번 충전. 주행거리는 두 충전의 주행거리 차, 전력량은 이번 충전량 (/stats 와 같은 기준)
+    - groupBy=charge_type 이면 구간을 이번 충전의 충전 방식별로 묶어 합계 전비를 반환
+    - from/to 는 구간이 끝난(충전) 날짜 기준 필터이며, 구간 계산은 전체 기록으로 함
+    """
+    order = (ChargingRecord.odo_km, ChargingRecord.date, ChargingRecord.id)
+    chained = (
+        select(
+            ChargingRecord.id,
+            ChargingRecord.date,
+            ChargingRecord.charge_type,
+            ChargingRecord.odo_km.label("end_km"),
+            ChargingRecord.energy_kwh,
+            ChargingRecord.price_total,
+            func.lag(ChargingRecord.odo_km).over(order_by=order).label("start_km"),
+            func.row_number().over(order_by=order).label("position"),
+        )
+        .where(ChargingRecord.vehicle_id == vehicleId)
+        .subquery("chained")
+    )
+    criteria = [chained.c.start_km.isnot(None)]
+    if from_date is not None:
+        criteria.append(chained.c.date >= from_date)
+    if to_date is not None:
+        criteria.append(chained.c.date <= to_date)
+
+    if groupBy == "charge_type":
+        distance = chained.c.end_km - chained.c.start_km
+        series = (
+            select(
+                chained.c.charge_type,
+                func.count().label("segments"),
+                func.sum(distance).label("distance"),
+                func.sum(chained.c.energy_kwh).label("energy_kwh"),
+                func.sum(chained.c.price_total).label("cost"),
+            )
+            .where(*criteria)
+            .group_by(chained.c.charge_type)
+            .subquery("series")
+        )
+        order_by = [series.c.charge_type.nulls_last()]
+        present = series.c.segments
+    else:
+        series = select(chained).where(*criteria).subquery("series")
+        order_by = [series.c.position]
+        present = series.c.id
+
+    owned = owned_vehicle_select(vehicleId, current_user.id, Vehicle.id).subquery("owned")
+    stmt = select(series, present.label("present")).select_from(owned).outerjoin(series, true()).order_by(*order_by)
+    rows = db.execute(stmt).mappings().all()
+    if not rows:
+        raise vehicle_not_found()
+
+    items = []
+    for row in rows:
+        if row["present"] is None:
+            continue
+        energy_kwh = float(row["energy_kwh"])
+        if groupBy == "charge_type":
+            item = {
+                "charge_type": row["charge_type"],
+                "segments": row["segments"],
+                "distance": row["distance"],
+                "energy_kwh": energy_kwh,
+                "cost": float(row["cost"]),
+            }
+        else:
+            item = {
+                "charge_type": row["charge_type"],
+                "date": row["date"].isoformat(),
+                "start_km": row["start_km"],
+                "end_km": row["end_km"],
+                "distance": row["end_km"] - row["start_km"],
+                "energy_kwh": energy_kwh,
+                "cost": float(row["price_total"]),
+            }
+        item["km_per_kwh"] = (item["distance"] / energy_kwh) if energy_kwh > 0 else None
+        items.append(item)
+    return {"group_by": groupBy, "items": items}
@@ -1,14 +1,21 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+﻿from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import DateTime, Integer, String, any_, column, delete, exists, func, literal, select, true, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional
 from datetime import datetime
 
+from db.pagination import MAX_PAGE_SIZE, fetch_limit, keyset, page, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.ConsumableItem import Consumable, ConsumableItem
-from schemas.consumables import Consumable as ConsumableSchema, ConsumableCreate, BulkDeleteRequest, ConsumableItemCreate
-from core.security import get_current_user_id
+from models.Vehicle import Vehicle
+from schemas.consumables import Consumable as ConsumableSchema, ConsumableCreate, ConsumableUsage, BulkDeleteRequest, ConsumableItemCreate
+from core.ownership import insert_owned
+from core.auth import get_current_user_id
 
-router = APIRouter()
+router = APIRouter(route_class=DbRoute)
 
 # -----------------------------
 # History APIs (public.consumables)
@@ -20,38 +27,55 @@ def add_consumable(
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id)  # JWT에서 추출
 ):
+    """
+    교체 이력 저장과 설정 항목(consumable_items)의 최근 교체 정보 갱신을 한 트랜잭션으로 처리.
+    - 이력은 INSERT ... SELECT (소유 차량) RETURNING, 설정 항목은 UPDATE 로 각각 한 문장
+    """
     data = item.dict()
     data["user_id"] = current_user_id   # 세션에 담지 않고 호출자 기반으로 보정
-    db_item = Consumable(**data)
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db_item = insert_owned(db, Consumable, current_user_id, data)
 
     # consumable_items 테이블 최신 교체 정보 업데이트
-    s = (
-        db.query(ConsumableItem)
-        .filter(
-            ConsumableItem.user_id == current_user_id,
-            ConsumableItem.vehicle_id == item.vehicle_id,
-            ConsumableItem.category == item.category,
-            ConsumableItem.kind == item.kind,
+    changes = {}
+    if item.date:
+        changes["last_date"] = item.date
+    if item.odo_km is not None:
+        changes["last_odo_km"] = item.odo_km
+    if changes:
+        db.execute(
+            update(ConsumableItem)
+            .where(
+                ConsumableItem.user_id == current_user_id,
+                ConsumableItem.vehicle_id == item.vehicle_id,
+                ConsumableItem.category == item.category,
+                ConsumableItem.kind == item.kind,
+            )
+            .values(**changes, updated_at=datetime.utcnow())
         )
-        .first()
-    )
-    if s:
-        if item.date:
-            s.last_date = item.date
-        if item.odo_km is not None:
-            s.last_odo_km = item.odo_km
-        s.updated_at = datetime.utcnow()
-        db.add(s)
-        db.commit()
+    db.commit()
 
     return db_item
 
 @router.get("/list", response_model=List[ConsumableSchema])
-def list_consumables(vehicleId: int, db: Session = Depends(get_db), current_user_id: int = Depends(get_current_user_id)):
-    return db.query(Consumable).filter(Consumable.vehicle_id == vehicleId, Consumable.user_id == current_user_id).all()
+def list_consumables(
+    vehicleId: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    after, order_by = keyset(Consumable.date, Consumable.id, cursor)
+    rows = (
+        db.query(Consumable)
+        .filter(Consumable.vehicle_id == vehicleId, Consumable.user_id == current_user_id, *after)
+        .order_by(*order_by)
+        .limit(fetch_limit(limit))
+        .all()
+    )
+    rows, next_cursor = page(rows, limit, "date")
+    set_next_cursor(response, next_cursor)
+    return rows
 
 @router.get("/search", response_model=List[ConsumableSchema])
 def search_consumables(
@@ -78,6 +102,40 @@ def search_consumables(
         q = q.order_by(Consumable.id.desc() if order == "desc" else Consumable.id.asc())
     return q.all()
 
+@router.get("/usage", response_model=List[ConsumableUsage])
+def consumable_usage(
+    vehicleId: int,
+    category: str,
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+):
+    """
+    카테고리 이력을 종류별로 요약 (패널에서 전체 이력을 받아 계산하던 것을 대체).
+    - DISTINCT ON (kind) + 윈도 집계로 한 번의 스캔에서 최근 기록(id 최대)과 max/count 를 함께 계산
+    - ix_consumables_user_vehicle_category_kind_date 인덱스 사용
+    """
+    by_kind = {"partition_by": Consumable.kind}
+    stmt = (
+        select(
+            Consumable,
+            func.max(Consumable.odo_km).over(**by_kind).label("max_odo_km"),
+            func.max(Consumable.date).over(**by_kind).label("max_date"),
+            func.count().over(**by_kind).label("count"),
+        )
+        .where(
+            Consumable.user_id == current_user_id,
+            Consumable.vehicle_id == vehicleId,
+            Consumable.category == category,
+            Consumable.kind.isnot(None),
+        )
+        .distinct(Consumable.kind)
+        .order_by(Consumable.kind, Consumable.id.desc())
+    )
+    return [
+        ConsumableUsage(kind=latest.kind, latest=latest, max_odo_km=max_odo_km, max_date=max_date, count=count)
+        for latest, max_odo_km, max_date, count in db.execute(stmt).all()
+    ]
+
 @router.get("/latest", response_model=ConsumableSchema)
 def get_latest_consumable(vehicleId: int, kind: str, db: Session = Depends(get_db)):
     item = db.query(Consumable).filter(
@@ -98,16 +156,26 @@ def delete_consumable(consumable_id: int, db: Session = Depends(get_db)):
     return {"ok": True}
 
 @router.post("/bulk-delete")
-def bulk_delete_items(req: BulkDeleteRequest, db: Session = Depends(get_db)):
+def bulk_delete_items(
+    req: BulkDeleteRequest,
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+):
     if not req.ids:
         raise HTTPException(status_code=400, detail="ids가 비어 있습니다.")
-    rows = db.query(Consumable).filter(Consumable.id.in_(req.ids)).all()
-    if not rows:
+    # id 개수와 상관없이 같은 문장(= ANY(배열 파라미터))이 되도록 IN 목록 대신 배열로 바인딩
+    deleted = db.scalars(
+        delete(Consumable)
+        .where(
+            Consumable.id == any_(literal(req.ids, ARRAY(Integer))),
+            Consumable.user_id == current_user_id,
+        )
+        .returning(Consumable.id)
+    ).all()
+    if not deleted:
         raise HTTPException(status_code=404, detail="삭제할 데이터를 찾지 못했습니다.")
-    for row in rows:
-        db.delete(row)
     db.commit()
-    return {"ok": True, "deleted": len(rows)}
+    return {"ok": True, "deleted": len(deleted)}
 
 # -----------------------------
 # Settings APIs (public.consumable_items)
@@ -139,42 +207,79 @@ DEFAULT_CONSUMABLE_ITEMS = [
 ]
 
 
-def _ensure_seed(db: Session, user_id: int, vehicle_id: int, category: str):
-    if category == "오일":
-        defaults = DEFAULT_OIL_ITEMS
-    elif category == "필터":
-        defaults = DEFAULT_FILTER_ITEMS
-    elif category == "소모품":
-        defaults = DEFAULT_CONSUMABLE_ITEMS
-    else:
-        defaults = []
+DEFAULT_ITEMS_BY_CATEGORY = {
+    "오일": DEFAULT_OIL_ITEMS,
+    "필터": DEFAULT_FILTER_ITEMS,
+    "소모품": DEFAULT_CONSUMABLE_ITEMS,
+}
 
-    exist = (
-        db.query(ConsumableItem)
-        .filter(
-            ConsumableItem.user_id == user_id,
-            ConsumableItem.vehicle_id == vehicle_id,
-            ConsumableItem.category == category,
+
+def seed_default_items(
+    db: Session,
+    vehicle_ids: Optional[List[int]] = None,
+    user_id: Optional[int] = None,
+    categories: Optional[List[str]] = None,
+) -> int:
+    """
+    기본 설정 항목을 한 문장(INSERT ... SELECT ... ON CONFLICT DO NOTHING)으로 채우고 삽입 행 수를 반환.
+    - 항목이 하나도 없는 (차량, 카테고리) 에만 넣음 (사용자가 일부러 지운 기본 항목은 되살리지 않음)
+    - vehicle_ids 가 None 이면 전체 차량 대상 (백필)
+    - user_id 를 주면 그 사용자 소유 차량만, categories 를 주면 해당 카테고리만
+    - 커밋은 호출 측에서
+    """
+    rows = [
+        (category, d["kind"], d["mode"], d.get("cycle_km"), d.get("cycle_months"))
+        for category, items in DEFAULT_ITEMS_BY_CATEGORY.items()
+        if categories is None or category in categories
+        for d in items
+    ]
+    if not rows:
+        return 0
+    defaults = values(
+        column("category", String),
+        column("kind", String),
+        column("mode", String),
+        column("cycle_km", Integer),
+        column("cycle_months", Integer),
+        name="defaults",
+    ).data(rows)
+    existing = aliased(ConsumableItem)
+    now = literal(datetime.utcnow(), DateTime)
+    source = (
+        select(
+            Vehicle.user_id,
+            Vehicle.id,
+            defaults.c.category,
+            defaults.c.kind,
+            defaults.c.mode,
+            defaults.c.cycle_km,
+            defaults.c.cycle_months,
+            now,
+            now,
         )
-        .count()
-    )
-    if exist == 0 and defaults:
-        now = datetime.utcnow()
-        for d in defaults:
-            db.add(
-                ConsumableItem(
-                    user_id=user_id,
-                    vehicle_id=vehicle_id,
-                    category=category,
-                    kind=d["kind"],
-                    mode=d["mode"],
-                    cycle_km=d.get("cycle_km"),
-                    cycle_months=d.get("cycle_months"),
-                    created_at=now,
-                    updated_at=now,
-                )
+        .select_from(Vehicle)
+        .join(defaults, true())
+        .where(
+            ~exists().where(
+                existing.user_id == Vehicle.user_id,
+                existing.vehicle_id == Vehicle.id,
+                existing.category == defaults.c.category,
             )
-        db.commit()
+        )
+    )
+    if vehicle_ids is not None:
+        source = source.where(Vehicle.id.in_(vehicle_ids))
+    if user_id is not None:
+        source = source.where(Vehicle.user_id == user_id)
+    stmt = (
+        pg_insert(ConsumableItem)
+        .from_select(
+            ["user_id", "vehicle_id", "category", "kind", "mode", "cycle_km", "cycle_months", "created_at", "updated_at"],
+            source,
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "vehicle_id", "category", "kind"])
+    )
+    return db.execute(stmt).rowcount
 
 @router.get("/items")
 def get_items(
@@ -183,8 +288,6 @@ def get_items(
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id),
 ):
-    _ensure_seed(db, current_user_id, vehicleId, category)
-
     rows = (
         db.query(ConsumableItem)
         .filter(
@@ -195,18 +298,66 @@ def get_items(
         .order_by(ConsumableItem.id.asc())
         .all()
     )
-    return [
-        {
-            "id": r.id,
-            "kind": r.kind,
-            "mode": r.mode or "distance",
-            "cycleKm": r.cycle_km,
-            "cycleMonths": r.cycle_months,
-            "lastOdo": r.last_odo_km,
-            "lastDate": r.last_date.isoformat() if r.last_date else None,
-        }
-        for r in rows
-    ]
+    return [serialize_item(r) for r in rows]
+
+
+def serialize_item(r: ConsumableItem) -> dict:
+    return {
+        "id": r.id,
+        "kind": r.kind,
+        "mode": r.mode or "distance",
+        "cycleKm": r.cycle_km,
+        "cycleMonths": r.cycle_months,
+        "lastOdo": r.last_odo_km,
+        "lastDate": r.last_date.isoformat() if r.last_date else None,
+    }
+
+
+def load_dashboard_consumables(db: Session, user_id: int, vehicle_id: int) -> dict:
+    """
+    기본 카테고리 전체의 설정 항목(/items)과 교체 이력(/search sort=id desc)을 카테고리별로 반환.
+    - 카테고리마다 두 번씩 호출하던 것을 설정/이력 각각 한 번의 쿼리로 조회
+    """
+    items = (
+        db.query(ConsumableItem)
+        .filter(ConsumableItem.user_id == user_id, ConsumableItem.vehicle_id == vehicle_id)
+        .order_by(ConsumableItem.id.asc())
+        .all()
+    )
+    history = (
+        db.query(Consumable)
+        .filter(
+            Consumable.user_id == user_id,
+            Consumable.vehicle_id == vehicle_id,
+            Consumable.category.in_(list(DEFAULT_ITEMS_BY_CATEGORY)),
+        )
+        .order_by(Consumable.id.desc())
+        .all()
+    )
+    sections = {category: {"items": [], "history": []} for category in DEFAULT_ITEMS_BY_CATEGORY}
+    for item in items:
+        if item.category in sections:
+            sections[item.category]["items"].append(serialize_item(item))
+    for row in history:
+        sections[row.category]["history"].append(ConsumableSchema.model_validate(row).model_dump(mode="json"))
+    return sections
+
+DUPLICATE_ITEM_DETAIL = "같은 항목이 이미 존재합니다."
+
+
+def commit_item(db: Session) -> None:
+    """
+    설정 항목 커밋. (user, vehicle, category, kind) 유니크 인덱스 위반은 500 대신 기존과 같은 400 으로 응답
+    (수정으로 종류/카테고리가 겹치거나, 중복 확인 후 INSERT 사이에 같은 항목이 먼저 생긴 경우)
+    """
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if "uq_consumable_items_user_vehicle_category_kind" in str(exc.orig):
+            raise HTTPException(status_code=400, detail=DUPLICATE_ITEM_DETAIL)
+        raise
+
 
 @router.put("/items/{item_id}")
 def update_item(item_id: int, payload: dict, db: Session = Depends(get_db)):
@@ -218,7 +369,7 @@ def update_item(item_id: int, payload: dict, db: Session = Depends(get_db)):
             setattr(row, k, payload[k])
     row.updated_at = datetime.utcnow()
     db.add(row)
-    db.commit()
+    commit_item(db)
     return {"ok": True}
 
 @router.delete("/items/{item_id}")
@@ -247,7 +398,7 @@ def create_item(
         .first()
     )
     if existing:
-        raise HTTPException(status_code=400, detail="같은 항목이 이미 존재합니다.")
+        raise HTTPException(status_code=400, detail=DUPLICATE_ITEM_DETAIL)
 
     now = datetime.utcnow()
     db_item = ConsumableItem(
@@ -264,7 +415,7 @@ def create_item(
         updated_at=now,
     )
     db.add(db_item)
-    db.commit()
+    commit_item(db)
     db.refresh(db_item)
     return db_item
 
@@ -275,36 +426,15 @@ def reset_items(
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id),
 ):
-    db.query(ConsumableItem).filter(
-        ConsumableItem.user_id == current_user_id,
-        ConsumableItem.vehicle_id == vehicleId,
-        ConsumableItem.category == category,
-    ).delete()
-    db.commit()
-
-    if category == "오일":
-        defaults = DEFAULT_OIL_ITEMS
-    elif category == "필터":
-        defaults = DEFAULT_FILTER_ITEMS
-    elif category == "소모품":
-        defaults = DEFAULT_CONSUMABLE_ITEMS
-    else:
-        defaults = []
-
-    now = datetime.utcnow()
-    for base in defaults:
-        db_item = ConsumableItem(
-            user_id=current_user_id,
-            vehicle_id=vehicleId,
-            category=category,
-            kind=base["kind"],
-            mode=base["mode"],
-            cycle_km=base.get("cycle_km"),
-            cycle_months=base.get("cycle_months"),
-            created_at=now,
-            updated_at=now,
+    # 삭제와 기본 항목 재생성을 한 트랜잭션으로 (중간에 실패해도 항목이 비지 않음)
+    db.execute(
+        delete(ConsumableItem).where(
+            ConsumableItem.user_id == current_user_id,
+            ConsumableItem.vehicle_id == vehicleId,
+            ConsumableItem.category == category,
         )
-        db.add(db_item)
+    )
+    seed_default_items(db, [vehicleId], user_id=current_user_id, categories=[category])
     db.commit()
 
     return {"ok": True, "message": f"{category} 기본 항목으로 초기화되었습니다."}
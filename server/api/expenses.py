@@ -1,20 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned_page, insert_owned
+from db.pagination import MAX_PAGE_SIZE, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.Expense import Expense
 from models.User import User
-from models.Vehicle import Vehicle
-
-router = APIRouter()
-
 
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+router = APIRouter(route_class=DbRoute)
 
 
 @router.post("/add")
@@ -22,15 +19,22 @@ def add_expense(body: dict, db: Session = Depends(get_db), current_user: User =
     vehicle_id = body.get("vehicle_id")
     if not vehicle_id:
         raise HTTPException(status_code=400, detail="vehicle_id is required")
-    ensure_vehicle(int(vehicle_id), current_user, db)
-    item = Expense(**body)
-    db.add(item)
+    item = insert_owned(db, Expense, current_user.id, {**body, "vehicle_id": int(vehicle_id)})
     db.commit()
-    db.refresh(item)
     return item
 
 
 @router.get("/list")
-def list_expenses(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    return db.query(Expense).filter(Expense.vehicle_id == vehicleId).all()
+def list_expenses(
+    vehicleId: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    records, next_cursor = fetch_owned_page(
+        db, Expense, vehicleId, current_user.id, sort_column=Expense.date, cursor=cursor, limit=limit
+    )
+    set_next_cursor(response, next_cursor)
+    return records
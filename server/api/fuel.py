@@ -1,21 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import delete_owned, fetch_owned_page, insert_owned, owned_vehicle_select, update_owned, vehicle_not_found
+from db.pagination import MAX_PAGE_SIZE, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.FuelRecord import FuelRecord
 from models.User import User
 from models.Vehicle import Vehicle
 from schemas.fuel import FuelCreate, FuelOut
 
-router = APIRouter()
-
-
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+router = APIRouter(route_class=DbRoute)
 
 
 def serialize_fuel_record(record: FuelRecord) -> dict:
@@ -32,57 +33,166 @@ def serialize_fuel_record(record: FuelRecord) -> dict:
 
 @router.post("/add", response_model=FuelOut)
 def add_fuel(body: FuelCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(body.vehicle_id, current_user, db)
-    record = FuelRecord(**body.model_dump())
-    db.add(record)
+    record = insert_owned(db, FuelRecord, current_user.id, body.model_dump())
     db.commit()
-    db.refresh(record)
     return serialize_fuel_record(record)
 
 
 @router.get("/list", response_model=list[FuelOut])
-def list_fuel(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    records = db.query(FuelRecord).filter(FuelRecord.vehicle_id == vehicleId).order_by(FuelRecord.date.desc()).all()
+def list_fuel(
+    vehicleId: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    records, next_cursor = fetch_owned_page(
+        db, FuelRecord, vehicleId, current_user.id, sort_column=FuelRecord.date, cursor=cursor, limit=limit
+    )
+    set_next_cursor(response, next_cursor)
     return [serialize_fuel_record(r) for r in records]
 
 
 @router.put("/{fuel_id}", response_model=FuelOut)
 def update_fuel(fuel_id: int, payload: FuelCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(payload.vehicle_id, current_user, db)
-    record = db.query(FuelRecord).filter(FuelRecord.id == fuel_id, FuelRecord.vehicle_id == payload.vehicle_id).first()
+    record = update_owned(
+        db,
+        FuelRecord,
+        current_user.id,
+        payload.model_dump(),
+        FuelRecord.id == fuel_id,
+        FuelRecord.vehicle_id == payload.vehicle_id,
+    )
     if not record:
         raise HTTPException(status_code=404, detail="Fuel record not found")
-    for field, value in payload.model_dump().items():
-        setattr(record, field, value)
-    db.add(record)
     db.commit()
-    db.refresh(record)
     return serialize_fuel_record(record)
 
 
 @router.delete("/{fuel_id}")
 def delete_fuel(fuel_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    record = db.query(FuelRecord).filter(FuelRecord.id == fuel_id).first()
-    if not record:
-      raise HTTPException(status_code=404, detail="Fuel record not found")
-    ensure_vehicle(record.vehicle_id, current_user, db)
-    db.delete(record)
+    if not delete_owned(db, FuelRecord, current_user.id, FuelRecord.id == fuel_id):
+        raise HTTPException(status_code=404, detail="Fuel record not found")
     db.commit()
     return {"ok": True}
 
 
 @router.get("/stats")
 def fuel_stats(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    all_rows = db.query(FuelRecord).filter(FuelRecord.vehicle_id == vehicleId).all()
-    rows = db.query(FuelRecord).filter(FuelRecord.vehicle_id == vehicleId, FuelRecord.is_full == True).order_by(FuelRecord.odo_km).all()
-    total_cost = float(sum(float(r.price_total or 0) for r in all_rows))
-    total_liters = float(sum(float(r.liters or 0) for r in all_rows))
+    """
+    합계와 평균 연비를 집계 한 문장으로 계산.
+    - 평균 연비 = (마지막 만땅 주행거리 - 첫 만땅 주행거리) / 첫 만땅을 제외한 만땅 주유량 합
+    """
+    full = FuelRecord.is_full.is_(True)
+    stmt = (
+        select(
+            func.coalesce(func.sum(FuelRecord.price_total), 0),
+            func.coalesce(func.sum(FuelRecord.liters), 0),
+            func.count(FuelRecord.id).filter(full),
+            (func.max(FuelRecord.odo_km).filter(full) - func.min(FuelRecord.odo_km).filter(full)),
+            func.sum(FuelRecord.liters).filter(full),
+            func.array_agg(aggregate_order_by(FuelRecord.liters, FuelRecord.odo_km, FuelRecord.date, FuelRecord.id))
+            .filter(full)[1],
+        )
+        .select_from(Vehicle)
+        .outerjoin(FuelRecord, FuelRecord.vehicle_id == Vehicle.id)
+        .where(Vehicle.id == vehicleId, Vehicle.user_id == current_user.id)
+        .group_by(Vehicle.id)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        raise vehicle_not_found()
+    total_cost, total_liters, full_count, km, full_liters, first_liters = row
+    total_cost, total_liters = float(total_cost), float(total_liters)
     avg_cost_per_l = (total_cost / total_liters) if total_liters > 0 else None
-    if len(rows) < 2:
+    if full_count < 2:
         return {"avg_km_per_l": None, "total_cost": total_cost, "avg_cost_per_l": avg_cost_per_l}
-    km = rows[-1].odo_km - rows[0].odo_km
-    liters = sum(float(r.liters or 0) for r in rows[1:])
+    liters = float(full_liters - first_liters)
     avg = (km / liters) if liters > 0 else None
     return {"avg_km_per_l": avg, "total_cost": total_cost, "avg_cost_per_l": avg_cost_per_l}
+
+
+@router.get("/efficiency")
+def fuel_efficiency(
+    vehicleId: int,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    만땅 주유 사이 구간별 연비(km/L) 시리즈.
+    - 구간 = 직전 만땅 ~ 이번 만땅. 연료량은 그 사이 부분 주유 + 이번 만땅 주유량의 합 (만땅법)
+    - 첫 만땅 이전 주유와 아직 만땅으로 닫히지 않은 마지막 부분 주유들은 구간에 포함되지 않음
+    - from/to 는 구간이 끝난(만땅) 날짜 기준 필터이며, 구간 계산은 전체 기록으로 함
+    """
+    order = (FuelRecord.odo_km, FuelRecord.date, FuelRecord.id)
+    # 각 주유 이전까지의 만땅 횟수 = 그 주유가 속한 구간 번호 (만땅 주유는 자신이 닫는 구간에 속함)
+    fills = (
+        select(
+            FuelRecord,
+            func.coalesce(
+                func.count()
+                .filter(FuelRecord.is_full.is_(True))
+                .over(order_by=order, rows=(None, -1)),
+                0,
+            ).label("segment"),
+        )
+        .where(FuelRecord.vehicle_id == vehicleId)
+        .subquery("fills")
+    )
+    full = fills.c.is_full.is_(True)
+    segments = (
+        select(
+            fills.c.segment,
+            func.max(fills.c.date).filter(full).label("date"),
+            func.max(fills.c.odo_km).filter(full).label("end_km"),
+            func.sum(fills.c.liters).label("liters"),
+            func.sum(fills.c.price_total).label("cost"),
+            func.count().label("fills"),
+        )
+        .group_by(fills.c.segment)
+        .subquery("segments")
+    )
+    chained = select(
+        segments,
+        func.lag(segments.c.end_km).over(order_by=segments.c.segment).label("start_km"),
+    ).subquery("chained")
+    criteria = [chained.c.start_km.isnot(None), chained.c.end_km.isnot(None)]
+    if from_date is not None:
+        criteria.append(chained.c.date >= from_date)
+    if to_date is not None:
+        criteria.append(chained.c.date <= to_date)
+    series = select(chained).where(*criteria).subquery("series")
+
+    owned = owned_vehicle_select(vehicleId, current_user.id, Vehicle.id).subquery("owned")
+    stmt = (
+        select(series.c.date, series.c.start_km, series.c.end_km, series.c.liters, series.c.cost, series.c.fills)
+        .select_from(owned)
+        .outerjoin(series, true())
+        .order_by(series.c.segment)
+    )
+    rows = db.execute(stmt).all()
+    if not rows:
+        raise vehicle_not_found()
+
+    items = []
+    for segment_date, start_km, end_km, liters, cost, fill_count in rows:
+        if segment_date is None:
+            continue
+        distance = end_km - start_km
+        liters = float(liters)
+        items.append(
+            {
+                "date": segment_date.isoformat(),
+                "start_km": start_km,
+                "end_km": end_km,
+                "distance": distance,
+                "liters": liters,
+                "cost": float(cost),
+                "fills": fill_count,
+                "km_per_l": (distance / liters) if liters > 0 else None,
+            }
+        )
+    return {"items": items}
@@ -1,62 +1,78 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned, fetch_owned_page, insert_owned, owned_by, update_owned
+from db.pagination import MAX_PAGE_SIZE, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.User import User
-from models.Vehicle import Vehicle
 from models.legalinfo import LegalInfo
 from schemas.legalinfo import LegalInfoCreate, LegalInfoResponse, LegalInfoUpdate, LegalSummaryItem, LegalSummaryResponse
 
-router = APIRouter(tags=["legal"])
-
-
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+router = APIRouter(tags=["legal"], route_class=DbRoute)
 
 
 @router.get("/list", response_model=List[LegalInfoResponse])
-def list_legal(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    return db.query(LegalInfo).filter(LegalInfo.vehicle_id == vehicleId, LegalInfo.user_id == current_user.id).all()
+def list_legal(
+    vehicleId: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    records, next_cursor = fetch_owned_page(
+        db,
+        LegalInfo,
+        vehicleId,
+        current_user.id,
+        LegalInfo.user_id == current_user.id,
+        sort_column=LegalInfo.created_at,
+        cursor=cursor,
+        limit=limit,
+    )
+    set_next_cursor(response, next_cursor)
+    return records
 
 
 @router.post("/add", response_model=LegalInfoResponse)
 def add_legal(info: LegalInfoCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(info.vehicle_id, current_user, db)
-    new_record = LegalInfo(**{**info.model_dump(), "user_id": current_user.id})
-    db.add(new_record)
+    new_record = insert_owned(db, LegalInfo, current_user.id, {**info.model_dump(), "user_id": current_user.id})
     db.commit()
-    db.refresh(new_record)
     return new_record
 
 
 @router.put("/update/{id}", response_model=LegalInfoResponse)
 def update_legal(id: int, info: LegalInfoUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(info.vehicle_id, current_user, db)
-    record = db.query(LegalInfo).filter(LegalInfo.id == id, LegalInfo.user_id == current_user.id).first()
+    values = {key: value for key, value in info.model_dump(exclude_unset=True).items() if key not in ("id", "user_id")}
+    values["user_id"] = current_user.id
+    record = update_owned(
+        db,
+        LegalInfo,
+        current_user.id,
+        values,
+        LegalInfo.id == id,
+        LegalInfo.user_id == current_user.id,
+        owned_by(info.vehicle_id, current_user.id),
+    )
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
-    for key, value in info.model_dump(exclude_unset=True).items():
-        if key != "user_id":
-            setattr(record, key, value)
-    record.user_id = current_user.id
     db.commit()
-    db.refresh(record)
     return record
 
 
 @router.delete("/delete/{id}")
 def delete_legal(id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    record = db.query(LegalInfo).filter(LegalInfo.id == id, LegalInfo.user_id == current_user.id).first()
-    if not record:
+    deleted = (
+        db.query(LegalInfo)
+        .filter(LegalInfo.id == id, LegalInfo.user_id == current_user.id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Record not found")
-    db.delete(record)
     db.commit()
     return {"message": "Deleted successfully"}
 
@@ -122,6 +138,5 @@ def build_legal_summary_response(records):
 
 @router.get("/summary", response_model=LegalSummaryResponse)
 def legal_summary(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    records = db.query(LegalInfo).filter(LegalInfo.vehicle_id == vehicleId, LegalInfo.user_id == current_user.id).all()
+    records = fetch_owned(db, LegalInfo, vehicleId, current_user.id, LegalInfo.user_id == current_user.id)
     return build_legal_summary_response(records)
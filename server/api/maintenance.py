@@ -1,95 +1,192 @@
 
+import html
+import re
 from datetime import date
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from sqlalchemy import Date, and_, case, cast, delete, func, literal_column, select, true, update
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned_page, insert_owned, owned_vehicle_select, vehicle_not_found
+from db.batch import Rows, fetch_batch
+from db.pagination import MAX_PAGE_SIZE, set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
-from models.MaintenanceRecord import MaintenanceRecord
+from models.MaintenanceRecord import SEARCH_CONFIG, MaintenanceRecord
 from models.User import User
 from models.Vehicle import Vehicle
 from schemas.maintenance import (
     MaintenanceCreate,
     MaintenanceOut,
+    MaintenanceMonthSummary,
     MaintenanceOverview,
+    MaintenanceOverviewSeries,
+    MaintenanceSearchHit,
+    MaintenanceSearchResponse,
     MaintenanceUpdate,
 )
-router = APIRouter(tags=["maintenance"])
+router = APIRouter(tags=["maintenance"], route_class=DbRoute)
 
+SEARCH_PAGE_SIZE = 20
+SNIPPET_CONTEXT = 30
+SNIPPET_LENGTH = 120
+# 스니펫의 일치 구간은 본문에 없는 제어 문자로 표시하고, HTML 이스케이프한 뒤에 <mark> 로 바꿈 (render_snippet)
+MARK_START = "\x02"
+MARK_END = "\x03"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=20, MinWords=5, MaxFragments=2"
 
-def ensure_vehicle(vehicle_id: int, user: User, db: Session) -> Vehicle:
-    vehicle = (
-        db.query(Vehicle)
-        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == user.id)
-        .first()
+
+def search_query(term: str):
+    return func.plainto_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), term)
+
+
+def search_condition(term: str):
+    """
+    단어 일치(tsvector GIN) 또는 부분 문자열 일치(pg_trgm GIN) 조건.
+    - 한국어는 조사가 붙어 단어 일치가 잘 안 되므로 기존 ILIKE '%검색어%' 의미를 trigram 인덱스로 유지
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return MaintenanceRecord.search_vector.op("@@")(search_query(term)) | MaintenanceRecord.search_text.ilike(
+        f"%{escaped}%", escape="\\"
     )
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+
+
+def render_snippet(raw: Optional[str]) -> str:
+    """DB 에서 만든 스니펫을 HTML 로: 사용자 입력은 이스케이프하고 일치 표시만 <mark> 태그로."""
+    return html.escape(raw or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
 
 
 @router.get("/records", response_model=List[MaintenanceOut])
 def list_records(
+    response: Response,
     vehicleId: int = Query(..., alias="vehicleId"),
     serviceType: Optional[str] = Query(None, alias="serviceType"),
     fromDate: Optional[date] = Query(None, alias="fromDate"),
     toDate: Optional[date] = Query(None, alias="toDate"),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    ensure_vehicle(vehicleId, current_user, db)
-
-    query = (
-        db.query(MaintenanceRecord)
-        .filter(MaintenanceRecord.vehicle_id == vehicleId)
-        .order_by(MaintenanceRecord.service_date.desc(), MaintenanceRecord.created_at.desc())
-    )
-
+    criteria = []
     if serviceType:
-        query = query.filter(MaintenanceRecord.service_type == serviceType)
+        criteria.append(MaintenanceRecord.service_type == serviceType)
     if fromDate:
-        query = query.filter(MaintenanceRecord.service_date >= fromDate)
+        criteria.append(MaintenanceRecord.service_date >= fromDate)
     if toDate:
-        query = query.filter(MaintenanceRecord.service_date <= toDate)
+        criteria.append(MaintenanceRecord.service_date <= toDate)
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            (MaintenanceRecord.title.ilike(like))
-            | (MaintenanceRecord.shop_name.ilike(like))
-            | (MaintenanceRecord.notes.ilike(like))
-        )
+        criteria.append(search_condition(search))
 
-    records = query.all()
+    records, next_cursor = fetch_owned_page(
+        db,
+        MaintenanceRecord,
+        vehicleId,
+        current_user.id,
+        *criteria,
+        sort_column=MaintenanceRecord.service_date,
+        cursor=cursor,
+        limit=limit,
+    )
+    set_next_cursor(response, next_cursor)
     return [MaintenanceOut.model_validate(rec) for rec in records]
 
 
+@router.get("/search", response_model=MaintenanceSearchResponse)
+def search_records(
+    vehicleId: int = Query(..., alias="vehicleId"),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    정비 기록 검색 (관련도순).
+    - 관련도 = 단어 일치 순위(ts_rank_cd) + 부분 일치 유사도(word_similarity)
+    - 스니펫: 단어 일치면 ts_headline, 부분 일치만 있으면 첫 일치 위치 주변을 잘라 <mark> 로 감쌈
+      (본문은 HTML 이스케이프, 표시용 제어 문자가 본문에 있으면 미리 제거)
+    """
+    term = q.strip()
+    if not term:
+        raise HTTPException(status_code=400, detail="검색어를 입력해주세요.")
+    query = search_query(term)
+    matched_words = MaintenanceRecord.search_vector.op("@@")(query)
+    rank = func.ts_rank_cd(MaintenanceRecord.search_vector, query) + func.word_similarity(term, MaintenanceRecord.search_text)
+    source = func.translate(MaintenanceRecord.search_text, MARK_START + MARK_END, "")
+    start = func.greatest(func.strpos(func.lower(source), term.lower()) - SNIPPET_CONTEXT, 1)
+    snippet = case(
+        (
+            matched_words,
+            func.ts_headline(literal_column(f"'{SEARCH_CONFIG}'"), source, query, HEADLINE_OPTIONS),
+        ),
+        else_=func.regexp_replace(
+            func.substr(source, start, SNIPPET_LENGTH),
+            re.escape(term),
+            f"{MARK_START}\\&{MARK_END}",
+            "gi",
+        ),
+    )
+    hits = (
+        select(MaintenanceRecord.id, rank.label("rank"), snippet.label("snippet"))
+        .where(MaintenanceRecord.vehicle_id == vehicleId, search_condition(term))
+        .order_by(rank.desc(), MaintenanceRecord.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
+        .subquery("hits")
+    )
+    # 차량 1행 LEFT JOIN 검색 결과: 행이 아예 없으면 차량이 없거나 남의 차량 → 404
+    owned = owned_vehicle_select(vehicleId, current_user.id, Vehicle.id).subquery("owned")
+    rows = db.execute(
+        select(MaintenanceRecord, hits.c.rank, hits.c.snippet)
+        .select_from(owned)
+        .outerjoin(hits, true())
+        .outerjoin(MaintenanceRecord, MaintenanceRecord.id == hits.c.id)
+        .order_by(hits.c.rank.desc(), hits.c.id.desc())
+    ).all()
+    if not rows:
+        raise vehicle_not_found()
+
+    hits = [row for row in rows if row[0] is not None]
+    next_offset = offset + limit if len(hits) > limit else None
+    items = [
+        MaintenanceSearchHit(
+            **MaintenanceOut.model_validate(record).model_dump(),
+            rank=float(hit_rank),
+            snippet=render_snippet(hit_snippet),
+        )
+        for record, hit_rank, hit_snippet in hits[:limit]
+    ]
+    return MaintenanceSearchResponse(items=items, next_offset=next_offset)
+
+
 @router.post("/records", response_model=MaintenanceOut)
 def create_record(
     payload: MaintenanceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(payload.vehicle_id, current_user, db)
-
-    record = MaintenanceRecord(
-        user_id=current_user.id,
-        vehicle_id=vehicle.id,
-        service_date=payload.service_date,
-        title=payload.title,
-        service_type=payload.service_type,
-        cost=payload.cost,
-        odometer_km=payload.odometer_km,
-        shop_name=payload.shop_name,
-        notes=payload.notes,
+    record = insert_owned(
+        db,
+        MaintenanceRecord,
+        current_user.id,
+        {
+            "user_id": current_user.id,
+            "vehicle_id": payload.vehicle_id,
+            "service_date": payload.service_date,
+            "title": payload.title,
+            "service_type": payload.service_type,
+            "cost": payload.cost,
+            "odometer_km": payload.odometer_km,
+            "shop_name": payload.shop_name,
+            "notes": payload.notes,
+        },
     )
-    db.add(record)
     db.commit()
-    db.refresh(record)
     return MaintenanceOut.model_validate(record)
 
 
@@ -100,31 +197,17 @@ def update_record(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    record = (
-        db.query(MaintenanceRecord)
-        .filter(MaintenanceRecord.id == record_id, MaintenanceRecord.user_id == current_user.id)
-        .first()
-    )
+    owner_filter = (MaintenanceRecord.id == record_id, MaintenanceRecord.user_id == current_user.id)
+    changes = payload.model_dump(exclude_none=True)
+    if changes:
+        record = db.scalars(
+            update(MaintenanceRecord).where(*owner_filter).values(**changes).returning(MaintenanceRecord)
+        ).first()
+    else:
+        record = db.query(MaintenanceRecord).filter(*owner_filter).first()
     if not record:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
-
-    if payload.service_date is not None:
-        record.service_date = payload.service_date
-    if payload.title is not None:
-        record.title = payload.title
-    if payload.service_type is not None:
-        record.service_type = payload.service_type
-    if payload.cost is not None:
-        record.cost = payload.cost
-    if payload.odometer_km is not None:
-        record.odometer_km = payload.odometer_km
-    if payload.shop_name is not None:
-        record.shop_name = payload.shop_name
-    if payload.notes is not None:
-        record.notes = payload.notes
-    db.add(record)
     db.commit()
-    db.refresh(record)
     return MaintenanceOut.model_validate(record)
 
 
@@ -134,19 +217,35 @@ def delete_record(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    record = (
-        db.query(MaintenanceRecord)
-        .filter(MaintenanceRecord.id == record_id, MaintenanceRecord.user_id == current_user.id)
-        .first()
-    )
-    if not record:
+    deleted = db.execute(
+        delete(MaintenanceRecord)
+        .where(MaintenanceRecord.id == record_id, MaintenanceRecord.user_id == current_user.id)
+        .returning(MaintenanceRecord.id)
+    ).first()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
-
-    db.delete(record)
     db.commit()
     return {"ok": True}
 
 
+SERIES_MAX_MONTHS = 120
+
+
+def month_totals() -> list:
+    """월 집계 컬럼 (합계/건수/정기/비정기). 한 번의 집계에서 FILTER 로 나눠 셈."""
+    return [
+        func.coalesce(func.sum(MaintenanceRecord.cost), 0).label("total_cost"),
+        func.count(MaintenanceRecord.id).label("total_count"),
+        func.count(MaintenanceRecord.id).filter(MaintenanceRecord.service_type == "scheduled").label("scheduled_count"),
+        func.count(MaintenanceRecord.id).filter(MaintenanceRecord.service_type == "unscheduled").label("unscheduled_count"),
+    ]
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
 @router.get("/overview", response_model=MaintenanceOverview)
 def maintenance_overview(
     vehicleId: int = Query(..., alias="vehicleId"),
@@ -155,44 +254,104 @@ def maintenance_overview(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    ensure_vehicle(vehicleId, current_user, db)
-
     today = date.today()
     target_year = year or today.year
     target_month = month or today.month
 
     start_date = date(target_year, target_month, 1)
-    if target_month == 12:
-        end_date = date(target_year + 1, 1, 1)
-    else:
-        end_date = date(target_year, target_month + 1, 1)
+    end_date = add_months(start_date, 1)
 
-    base_query = db.query(MaintenanceRecord).filter(MaintenanceRecord.vehicle_id == vehicleId)
-    month_query = base_query.filter(
+    in_month = and_(
         MaintenanceRecord.service_date >= start_date,
         MaintenanceRecord.service_date < end_date,
     )
-    total_cost_month = (
-        month_query.with_entities(func.coalesce(func.sum(MaintenanceRecord.cost), 0)).scalar()
-    )
-    total_count_month = month_query.count()
-    scheduled_count_month = month_query.filter(MaintenanceRecord.service_type == "scheduled").count()
-    unscheduled_count_month = month_query.filter(MaintenanceRecord.service_type == "unscheduled").count()
-
-    last_service = base_query.order_by(MaintenanceRecord.service_date.desc()).first()
-    recent = (
-        base_query.order_by(MaintenanceRecord.service_date.desc(), MaintenanceRecord.created_at.desc())
-        .limit(5)
-        .all()
+    # 월 집계 + 최근 5건을 소유 검사와 함께 한 번의 왕복으로 조회
+    batch = fetch_batch(
+        db,
+        owned_vehicle_select(vehicleId, current_user.id, Vehicle.id),
+        month=select(*month_totals()).where(MaintenanceRecord.vehicle_id == vehicleId, in_month),
+        recent=Rows(
+            select(MaintenanceRecord)
+            .where(MaintenanceRecord.vehicle_id == vehicleId)
+            .order_by(MaintenanceRecord.service_date.desc(), MaintenanceRecord.created_at.desc())
+            .limit(5),
+            order_by=[MaintenanceRecord.service_date.desc(), MaintenanceRecord.created_at.desc()],
+        ),
     )
+    if batch is None:
+        raise vehicle_not_found()
+    _, parts = batch
+    month_stats, recent = parts["month"], parts["recent"]
 
     overview = MaintenanceOverview(
         vehicle_id=vehicleId,
-        total_cost_month=Decimal(total_cost_month or 0),
-        total_count_month=total_count_month,
-        scheduled_count_month=scheduled_count_month,
-        unscheduled_count_month=unscheduled_count_month,
-        last_service_date=last_service.service_date if last_service else None,
+        total_cost_month=Decimal(month_stats["total_cost"] or 0),
+        total_count_month=month_stats["total_count"],
+        scheduled_count_month=month_stats["scheduled_count"],
+        unscheduled_count_month=month_stats["unscheduled_count"],
+        # 최근 목록의 첫 항목이 가장 최근 정비일
+        last_service_date=recent[0].service_date if recent else None,
         recent=[MaintenanceOut.model_validate(item) for item in recent],
     )
     return overview
+
+
+@router.get("/overview/series", response_model=MaintenanceOverviewSeries)
+def maintenance_overview_series(
+    vehicleId: int = Query(..., alias="vehicleId"),
+    months: int = Query(12, ge=1, le=SERIES_MAX_MONTHS),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    (year, month) 까지 연속 N개월의 /overview 월 집계를 한 문장으로 조회 (오래된 달부터).
+    - 월 목록(generate_series)에 해당 월 기록을 LEFT JOIN 해 월별로 FILTER 집계하므로 기록 없는 달도 0 으로 포함
+    """
+    today = date.today()
+    last_month = date(year or today.year, month or today.month, 1)
+    first_month = add_months(last_month, 1 - months)
+
+    buckets = select(
+        func.generate_series(first_month, last_month, literal_column("interval '1 month'")).label("month")
+    ).subquery("buckets")
+    bucket_start = cast(buckets.c.month, Date)
+    owned = owned_vehicle_select(vehicleId, current_user.id, Vehicle.id).subquery("owned")
+    stmt = (
+        select(
+            bucket_start.label("month"),
+            *month_totals(),
+            func.max(MaintenanceRecord.service_date).label("last_service_date"),
+        )
+        .select_from(owned)
+        .join(buckets, true())
+        .outerjoin(
+            MaintenanceRecord,
+            and_(
+                MaintenanceRecord.vehicle_id == owned.c.id,
+                MaintenanceRecord.service_date >= bucket_start,
+                MaintenanceRecord.service_date < cast(buckets.c.month + literal_column("interval '1 month'"), Date),
+            ),
+        )
+        .group_by(buckets.c.month)
+        .order_by(buckets.c.month)
+    )
+    rows = db.execute(stmt).mappings().all()
+    if not rows:
+        raise vehicle_not_found()
+
+    return MaintenanceOverviewSeries(
+        vehicle_id=vehicleId,
+        items=[
+            MaintenanceMonthSummary(
+                month=row["month"],
+                total_cost_month=Decimal(row["total_cost"] or 0),
+                total_count_month=row["total_count"],
+                scheduled_count_month=row["scheduled_count"],
+                unscheduled_count_month=row["unscheduled_count"],
+                last_service_date_month=row["last_service_date"],
+            )
+            for row in rows
+        ],
+    )
@@ -2,52 +2,68 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned, insert_owned, update_owned
+from db.routing import DbRoute
 from db.session import get_db
 from models.Notification import Notification
 from models.User import User
-from models.Vehicle import Vehicle
 from schemas.notification import NotificationUpdateSchema
 
-router = APIRouter()
-
-
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+router = APIRouter(route_class=DbRoute)
 
 
 @router.get("")
 def list_notifications(userId: int, vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.id != userId:
         raise HTTPException(status_code=403, detail="Forbidden")
-    ensure_vehicle(vehicleId, current_user, db)
-    return db.query(Notification).filter(Notification.user_id == userId, Notification.vehicle_id == vehicleId).all()
+    return fetch_owned(
+        db, Notification, vehicleId, current_user.id, Notification.user_id == userId, Notification.item_id.is_(None)
+    )
+
+
+@router.get("/due")
+def list_due_items(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    소모품 항목별 교체 예정 (jobs/consumable_due.py 가 계산한 결과).
+    - status: ok | due | overdue (주기/마지막 교체 정보가 없으면 null)
+    """
+    return fetch_owned(
+        db,
+        Notification,
+        vehicleId,
+        current_user.id,
+        Notification.user_id == current_user.id,
+        Notification.item_id.isnot(None),
+        order_by=(Notification.item_id,),
+    )
 
 
 @router.put("")
 def update_notification(payload: NotificationUpdateSchema, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if current_user.id != payload.user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    ensure_vehicle(payload.vehicle_id, current_user, db)
-    notif = (
-        db.query(Notification)
-        .filter(Notification.user_id == payload.user_id, Notification.vehicle_id == payload.vehicle_id, Notification.type == payload.type)
-        .first()
+    notif = update_owned(
+        db,
+        Notification,
+        current_user.id,
+        {"enabled": payload.enabled},
+        Notification.user_id == payload.user_id,
+        Notification.vehicle_id == payload.vehicle_id,
+        Notification.type == payload.type,
+        Notification.item_id.is_(None),
     )
-
-    if notif:
-        notif.enabled = payload.enabled
-    else:
-        notif = Notification(
-            user_id=payload.user_id,
-            vehicle_id=payload.vehicle_id,
-            type=payload.type,
-            enabled=payload.enabled,
+    if not notif:
+        notif = insert_owned(
+            db,
+            Notification,
+            current_user.id,
+            {
+                "user_id": payload.user_id,
+                "vehicle_id": payload.vehicle_id,
+                "type": payload.type,
+                "enabled": payload.enabled,
+            },
         )
-        db.add(notif)
 
     db.commit()
-    db.refresh(notif)
     return notif
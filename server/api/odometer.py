@@ -1,17 +1,25 @@
-from datetime import date
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
+from sqlalchemy import TIMESTAMP, Date, and_, cast, delete, func, insert, literal, literal_column, select, true, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.orm import Session
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned_page, owned_vehicle_select, vehicle_not_found
+from db.batch import fetch_batch
+from db.pagination import set_next_cursor
+from db.routing import DbRoute
 from db.session import get_db
 from models.User import User
 from models.Vehicle import Vehicle
 from models.VehicleOdometerLog import VehicleOdometerLog
+from models.VehicleOdometerSummary import VehicleOdometerMonthly, VehicleOdometerSummary
 from schemas.OdometerUpdate import OdometerUpdate
 
-router = APIRouter()
+router = APIRouter(route_class=DbRoute)
 
 
 class OdometerLogUpdate(BaseModel):
@@ -29,180 +37,387 @@ def serialize_log(log: VehicleOdometerLog) -> dict:
     }
 
 
-def ensure_vehicle(vehicle_id: int, current_user: User, db: Session) -> Vehicle:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
-
-
-def ensure_log(log_id: int, current_user: User, db: Session) -> VehicleOdometerLog:
-    log = (
-        db.query(VehicleOdometerLog)
+def ensure_log(log_id: int, current_user: User, db: Session) -> tuple[VehicleOdometerLog, Vehicle]:
+    row = (
+        db.query(VehicleOdometerLog, Vehicle)
         .join(Vehicle, Vehicle.id == VehicleOdometerLog.vehicle_id)
         .filter(VehicleOdometerLog.id == log_id, Vehicle.user_id == current_user.id)
+        # 요약 갱신이 끝날 때까지 같은 차량의 다른 쓰기를 막음
+        .with_for_update(of=Vehicle)
         .first()
     )
-    if not log:
+    if not row:
         raise HTTPException(status_code=404, detail="Odometer log not found")
-    return log
-
+    return row[0], row[1]
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def refresh_odometer_summary(db: Session, vehicle_id: int, months: set[date] | None = None) -> VehicleOdometerSummary:
+    """
+    vehicle_odometer_monthly 의 지정 월(None 이면 전체)을 로그에서 다시 집계하고, 차량 요약을 월 요약으로부터 갱신.
+    - 로그 쓰기와 같은 트랜잭션에서 호출 (차량 행 잠금을 잡은 뒤 호출해야 동시 쓰기에도 어긋나지 않음)
+    - 월 재집계는 (vehicle_id, date) 인덱스 범위 한 달분만 읽고, 차량 요약은 월 요약 행(월 수만큼)만 읽음
+    """
+    month = func.date_trunc("month", VehicleOdometerLog.date).cast(Date)
+    scope = [VehicleOdometerLog.vehicle_id == vehicle_id]
+    monthly_scope = [VehicleOdometerMonthly.vehicle_id == vehicle_id]
+    if months is not None:
+        scope.append(month.in_(sorted(months)))
+        monthly_scope.append(VehicleOdometerMonthly.month.in_(sorted(months)))
+
+    db.execute(delete(VehicleOdometerMonthly).where(*monthly_scope))
+    oldest_first = (VehicleOdometerLog.date.asc(), VehicleOdometerLog.id.asc())
+    latest_first = (VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
+    db.execute(
+        insert(VehicleOdometerMonthly).from_select(
+            ["vehicle_id", "month", "first_date", "first_km", "last_date", "last_km", "max_km", "log_count"],
+            select(
+                VehicleOdometerLog.vehicle_id,
+                month,
+                func.min(VehicleOdometerLog.date),
+                func.array_agg(aggregate_order_by(VehicleOdometerLog.odo_km, *oldest_first))[1],
+                func.max(VehicleOdometerLog.date),
+                func.array_agg(aggregate_order_by(VehicleOdometerLog.odo_km, *latest_first))[1],
+                func.max(VehicleOdometerLog.odo_km),
+                func.count(),
+            )
+            .where(*scope)
+            .group_by(VehicleOdometerLog.vehicle_id, month),
+        )
+    )
 
-def refresh_vehicle_current_odo(vehicle: Vehicle, db: Session) -> int | None:
-    latest_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicle.id)
-        .order_by(VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
-        .first()
+    monthly = select(VehicleOdometerMonthly).where(VehicleOdometerMonthly.vehicle_id == vehicle_id)
+    first = monthly.order_by(VehicleOdometerMonthly.month.asc()).limit(1).subquery()
+    last = monthly.order_by(VehicleOdometerMonthly.month.desc()).limit(1).subquery()
+    totals = (
+        select(func.coalesce(func.sum(VehicleOdometerMonthly.log_count), 0))
+        .where(VehicleOdometerMonthly.vehicle_id == vehicle_id)
+        .scalar_subquery()
     )
-    vehicle.odo_km = latest_log.odo_km if latest_log else None
+    values = {
+        "first_date": select(first.c.first_date).scalar_subquery(),
+        "first_km": select(first.c.first_km).scalar_subquery(),
+        "last_date": select(last.c.last_date).scalar_subquery(),
+        "last_km": select(last.c.last_km).scalar_subquery(),
+        "log_count": totals,
+    }
+    stmt = pg_insert(VehicleOdometerSummary).values(vehicle_id=vehicle_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VehicleOdometerSummary.vehicle_id],
+        set_={**{name: getattr(stmt.excluded, name) for name in values}, "updated_at": func.now()},
+    ).returning(VehicleOdometerSummary)
+    return db.scalars(stmt).one()
+
+
+def refresh_vehicle_current_odo(vehicle: Vehicle, db: Session, months: set[date]) -> int | None:
+    summary = refresh_odometer_summary(db, vehicle.id, months)
+    vehicle.odo_km = summary.last_km
     return vehicle.odo_km
 
 
 @router.post("/update")
 def update_odometer(data: OdometerUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    vehicle = ensure_vehicle(data.vehicleId, current_user, db)
     if data.date > date.today():
         raise HTTPException(status_code=400, detail="올바른 날짜를 선택해주세요.")
-    log = VehicleOdometerLog(vehicle_id=data.vehicleId, date=data.date, odo_km=data.odo_km)
-    db.add(log)
-    vehicle.odo_km = data.odo_km
+    # 소유 차량의 현재 주행거리 갱신과 로그 추가를 한 문장(WITH ... UPDATE → INSERT ... SELECT)으로 처리
+    owned_vehicle = (
+        update(Vehicle)
+        .where(Vehicle.id == data.vehicleId, Vehicle.user_id == current_user.id)
+        .values(odo_km=data.odo_km)
+        .returning(Vehicle.id)
+        .cte("owned_vehicle")
+    )
+    stmt = (
+        insert(VehicleOdometerLog)
+        .from_select(
+            ["vehicle_id", "date", "odo_km"],
+            select(owned_vehicle.c.id, cast(literal(data.date), Date), literal(data.odo_km)),
+        )
+        .returning(VehicleOdometerLog)
+    )
+    log = db.scalars(stmt).first()
+    if not log:
+        raise vehicle_not_found()
+    # 위 UPDATE 가 차량 행을 잠근 상태이므로 같은 차량의 요약 갱신은 직렬화됨
+    refresh_odometer_summary(db, log.vehicle_id, {month_start(log.date)})
     db.commit()
-    db.refresh(log)
-    return {"success": True, "log": serialize_log(log), "current_odo_km": vehicle.odo_km}
+    return {"success": True, "log": serialize_log(log), "current_odo_km": data.odo_km}
 
 
 @router.get("/current")
 def get_current(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    return {"odo_km": vehicle.odo_km}
+    odo_km = (
+        db.query(Vehicle.odo_km)
+        .filter(Vehicle.id == vehicleId, Vehicle.user_id == current_user.id)
+        .first()
+    )
+    if not odo_km:
+        raise vehicle_not_found()
+    return {"odo_km": odo_km[0]}
 
 
 @router.get("/history")
-def get_history(vehicleId: int, limit: int = 50, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    logs = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId)
-        .order_by(VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
-        .limit(min(max(limit, 1), 200))
-        .all()
+def get_history(
+    vehicleId: int,
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    logs, next_cursor = fetch_owned_page(
+        db,
+        VehicleOdometerLog,
+        vehicleId,
+        current_user.id,
+        sort_column=VehicleOdometerLog.date,
+        cursor=cursor,
+        limit=min(max(limit, 1), 200),
     )
-    return {"items": [serialize_log(log) for log in logs]}
+    set_next_cursor(response, next_cursor)
+    return {"items": [serialize_log(log) for log in logs], "next_cursor": next_cursor}
 
 
 @router.get("/overall")
 def get_overall(vehicleId: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
-    first_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId)
-        .order_by(VehicleOdometerLog.date.asc(), VehicleOdometerLog.id.asc())
+    row = (
+        db.query(Vehicle.id, VehicleOdometerSummary)
+        .outerjoin(VehicleOdometerSummary, VehicleOdometerSummary.vehicle_id == Vehicle.id)
+        .filter(Vehicle.id == vehicleId, Vehicle.user_id == current_user.id)
         .first()
     )
-    last_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId)
-        .order_by(VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
-        .first()
-    )
-    count = db.query(VehicleOdometerLog).filter(VehicleOdometerLog.vehicle_id == vehicleId).count()
+    if row is None:
+        raise vehicle_not_found()
+    summary = row[1]
 
-    if not first_log or not last_log:
+    if summary is None or not summary.log_count:
         return {"distance": 0, "start_km": None, "end_km": None, "start_date": None, "end_date": None, "count": 0}
 
     return {
-        "distance": max(0, last_log.odo_km - first_log.odo_km),
-        "start_km": first_log.odo_km,
-        "end_km": last_log.odo_km,
-        "start_date": first_log.date.isoformat() if first_log.date else None,
-        "end_date": last_log.date.isoformat() if last_log.date else None,
-        "count": count,
+        "distance": max(0, summary.last_km - summary.first_km),
+        "start_km": summary.first_km,
+        "end_km": summary.last_km,
+        "start_date": summary.first_date.isoformat() if summary.first_date else None,
+        "end_date": summary.last_date.isoformat() if summary.last_date else None,
+        "count": summary.log_count,
     }
 
 
 @router.get("/monthly")
 def get_monthly(vehicleId: int, year: int, month: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    ensure_vehicle(vehicleId, current_user, db)
     start_date = date(year, month, 1)
-    end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
-    logs = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date >= start_date, VehicleOdometerLog.date < end_date)
-        .order_by(VehicleOdometerLog.date.asc())
-        .all()
+    monthly = select(VehicleOdometerMonthly).where(VehicleOdometerMonthly.vehicle_id == vehicleId)
+    batch = fetch_batch(
+        db,
+        owned_vehicle_select(vehicleId, current_user.id, Vehicle.id),
+        current=monthly.where(VehicleOdometerMonthly.month == start_date),
+        previous=monthly.where(VehicleOdometerMonthly.month < start_date)
+        .order_by(VehicleOdometerMonthly.month.desc())
+        .limit(1),
     )
+    if batch is None:
+        raise vehicle_not_found()
+    _, parts = batch
+    current, previous = parts["current"], parts["previous"]
 
-    if not logs:
+    if not current:
         return {"distance": 0}
 
-    prev_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date < start_date)
-        .order_by(VehicleOdometerLog.date.desc())
-        .first()
-    )
-
-    start_km = prev_log.odo_km if prev_log else logs[0].odo_km
-    end_km = max(log.odo_km for log in logs)
+    start_km = previous.last_km if previous else current.first_km
+    end_km = current.max_km
     distance = max(0, end_km - start_km)
-    return {"distance": distance, "start_km": start_km, "end_km": end_km, "count": len(logs)}
+    return {"distance": distance, "start_km": start_km, "end_km": end_km, "count": current.log_count}
+
+
+SERIES_MAX_BUCKETS = 400
+
+
+def bucket_start(value: date, granularity: str) -> date:
+    if granularity == "month":
+        return value.replace(day=1)
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())  # date_trunc('week') 와 같은 월요일 시작
+    return value
+
+
+def next_bucket(value: date, granularity: str) -> date:
+    if granularity == "month":
+        return date(value.year + 1, 1, 1) if value.month == 12 else date(value.year, value.month + 1, 1)
+    return value + timedelta(days=7 if granularity == "week" else 1)
+
+
+@router.get("/series")
+def get_series(
+    vehicleId: int,
+    granularity: Literal["month", "week", "day"] = "month",
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    기간 내 모든 구간(월/주/일)의 시작·끝 주행거리와 주행 거리를 한 문장으로 계산.
+    - 구간별 값은 /monthly 와 같음: 시작 = 구간 이전 마지막 기록(없으면 구간 첫 기록), 끝 = 구간 내 최대값
+    - 기록이 없는 구간은 거리 0, 시작/끝은 직전 기록을 이어받음
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="날짜 범위를 확인해주세요.")
+    first_bucket = bucket_start(from_date, granularity)
+    last_bucket = bucket_start(to_date, granularity)
+    end_exclusive = next_bucket(last_bucket, granularity)
+    bucket_count = {
+        "month": (last_bucket.year - first_bucket.year) * 12 + last_bucket.month - first_bucket.month + 1,
+        "week": (last_bucket - first_bucket).days // 7 + 1,
+        "day": (last_bucket - first_bucket).days + 1,
+    }[granularity]
+    if bucket_count > SERIES_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"구간은 최대 {SERIES_MAX_BUCKETS}개까지 조회할 수 있습니다.")
+
+    # granularity 는 Literal 로 검증된 값이므로 SQL 리터럴로 넣어 GROUP BY 식이 바인드 파라미터 없이 일치하도록 함
+    unit = literal_column(f"'{granularity}'")
+    step = literal_column(f"interval '1 {granularity}'")
+    log_bucket = func.date_trunc(unit, cast(VehicleOdometerLog.date, TIMESTAMP))
+    buckets = select(
+        func.generate_series(
+            literal(datetime.combine(first_bucket, datetime.min.time())),
+            literal(datetime.combine(last_bucket, datetime.min.time())),
+            step,
+        ).label("bucket")
+    ).subquery("buckets")
+    logs = (
+        select(
+            log_bucket.label("bucket"),
+            func.count().label("count"),
+            func.max(VehicleOdometerLog.odo_km).label("max_km"),
+            func.array_agg(
+                aggregate_order_by(VehicleOdometerLog.odo_km, VehicleOdometerLog.date.asc(), VehicleOdometerLog.id.asc())
+            )[1].label("first_km"),
+            func.array_agg(
+                aggregate_order_by(VehicleOdometerLog.odo_km, VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
+            )[1].label("last_km"),
+        )
+        .where(
+            VehicleOdometerLog.vehicle_id == vehicleId,
+            VehicleOdometerLog.date >= first_bucket,
+            VehicleOdometerLog.date < end_exclusive,
+        )
+        .group_by(log_bucket)
+        .subquery("logs")
+    )
+    before = (
+        select(VehicleOdometerLog.odo_km)
+        .where(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date < first_bucket)
+        .order_by(VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    owned = owned_vehicle_select(vehicleId, current_user.id, Vehicle.id).subquery("owned")
+    # 기록이 있는 구간마다 그룹 번호가 1씩 늘어나므로, 그룹 내 last_km 가 곧 "그 시점까지의 마지막 기록"
+    grouped = (
+        select(
+            buckets.c.bucket,
+            logs.c.count,
+            logs.c.max_km,
+            logs.c.first_km,
+            logs.c.last_km,
+            func.count(logs.c.last_km).over(order_by=buckets.c.bucket).label("reading_group"),
+        )
+        .select_from(buckets)
+        .join(owned, true())
+        .outerjoin(logs, logs.c.bucket == buckets.c.bucket)
+        .subquery("grouped")
+    )
+    carried = (
+        select(
+            grouped,
+            func.coalesce(func.max(grouped.c.last_km).over(partition_by=grouped.c.reading_group), before).label("reading"),
+        )
+        .subquery("carried")
+    )
+    stmt = select(
+        carried.c.bucket,
+        carried.c.count,
+        carried.c.max_km,
+        carried.c.first_km,
+        func.lag(carried.c.reading, 1, before).over(order_by=carried.c.bucket).label("previous_km"),
+    ).order_by(carried.c.bucket)
+    rows = db.execute(stmt).all()
+    if not rows:
+        raise vehicle_not_found()
+
+    items = []
+    for bucket, count, max_km, first_km, previous_km in rows:
+        if count:
+            start_km = previous_km if previous_km is not None else first_km
+            end_km = max_km
+        else:
+            start_km = end_km = previous_km
+        items.append(
+            {
+                "start": bucket.date().isoformat(),
+                "start_km": start_km,
+                "end_km": end_km,
+                "distance": max(0, end_km - start_km) if count else 0,
+                "count": count or 0,
+            }
+        )
+    return {"granularity": granularity, "items": items}
 
 
 @router.get("/range")
 def get_range(vehicleId: int, fromDate: date, toDate: date, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
     if fromDate > toDate:
         raise HTTPException(status_code=400, detail="날짜 범위를 확인해주세요.")
 
-    logs = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date >= fromDate, VehicleOdometerLog.date <= toDate)
-        .order_by(VehicleOdometerLog.date.asc())
-        .all()
-    )
-    start_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date <= fromDate)
-        .order_by(VehicleOdometerLog.date.desc())
-        .first()
-    )
-    end_log = (
-        db.query(VehicleOdometerLog)
-        .filter(VehicleOdometerLog.vehicle_id == vehicleId, VehicleOdometerLog.date <= toDate)
-        .order_by(VehicleOdometerLog.date.desc())
-        .first()
+    logs = select(VehicleOdometerLog).where(VehicleOdometerLog.vehicle_id == vehicleId)
+    latest_first = (VehicleOdometerLog.date.desc(), VehicleOdometerLog.id.desc())
+    in_range = and_(VehicleOdometerLog.date >= fromDate, VehicleOdometerLog.date <= toDate)
+    batch = fetch_batch(
+        db,
+        owned_vehicle_select(vehicleId, current_user.id),
+        start=logs.where(VehicleOdometerLog.date <= fromDate).order_by(*latest_first).limit(1),
+        end=logs.where(VehicleOdometerLog.date <= toDate).order_by(*latest_first).limit(1),
+        first_in_range=logs.where(in_range).order_by(VehicleOdometerLog.date.asc(), VehicleOdometerLog.id.asc()).limit(1),
+        in_range=select(func.count().label("count")).where(VehicleOdometerLog.vehicle_id == vehicleId, in_range),
     )
+    if batch is None:
+        raise vehicle_not_found()
+    vehicle, parts = batch
+    start_log, end_log, first_in_range = parts["start"], parts["end"], parts["first_in_range"]
+    count = parts["in_range"]["count"]
 
     if not end_log:
         fallback_end_km = vehicle.odo_km if vehicle.odo_km is not None and toDate >= date.today() else 0
         return {"distance": 0, "start_km": fallback_end_km, "end_km": fallback_end_km, "count": 0}
 
-    start_km = start_log.odo_km if start_log else logs[0].odo_km if logs else end_log.odo_km
+    start_km = start_log.odo_km if start_log else first_in_range.odo_km if first_in_range else end_log.odo_km
     end_km = end_log.odo_km
-    return {"distance": max(0, end_km - start_km), "start_km": start_km, "end_km": end_km, "count": len(logs)}
+    return {"distance": max(0, end_km - start_km), "start_km": start_km, "end_km": end_km, "count": count}
 
 
 @router.put("/{log_id}")
 def update_log(log_id: int, data: OdometerLogUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    log = ensure_log(log_id, current_user, db)
+    log, vehicle = ensure_log(log_id, current_user, db)
     if data.date > date.today():
         raise HTTPException(status_code=400, detail="올바른 날짜를 선택해주세요.")
+    months = {month_start(log.date), month_start(data.date)}
     log.date = data.date
     log.odo_km = data.odo_km
-    vehicle = ensure_vehicle(log.vehicle_id, current_user, db)
-    current_odo = refresh_vehicle_current_odo(vehicle, db)
+    db.flush()
+    current_odo = refresh_vehicle_current_odo(vehicle, db, months)
     db.commit()
-    db.refresh(log)
     return {"success": True, "log": serialize_log(log), "current_odo_km": current_odo}
 
 
 @router.delete("/{log_id}")
 def delete_log(log_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    log = ensure_log(log_id, current_user, db)
-    vehicle = ensure_vehicle(log.vehicle_id, current_user, db)
+    log, vehicle = ensure_log(log_id, current_user, db)
+    months = {month_start(log.date)}
     db.delete(log)
     db.flush()
-    current_odo = refresh_vehicle_current_odo(vehicle, db)
+    current_odo = refresh_vehicle_current_odo(vehicle, db, months)
     db.commit()
     return {"success": True, "current_odo_km": current_odo}
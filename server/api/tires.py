@@ -1,10 +1,14 @@
 ﻿from datetime import date, datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, true
+from sqlalchemy.orm import Session, aliased
 
 from core.auth import get_current_user
+from core.ownership import fetch_owned, insert_owned, owned_by, vehicle_not_found
+from db.pagination import MAX_PAGE_SIZE, fetch_limit, keyset, page
+from db.routing import DbRoute
 from db.session import get_db
 from models.User import User
 from models.Vehicle import Vehicle
@@ -21,7 +25,7 @@ from schemas.tires import (
     TireSummaryResponse,
 )
 
-router = APIRouter(prefix="/tires", tags=["tires"])
+router = APIRouter(prefix="/tires", tags=["tires"], route_class=DbRoute)
 
 STATUS_ORDER = {"ok": 0, "warning": 1, "critical": 2}
 POSITION_ORDER = [pos for pos in TirePosition]
@@ -30,16 +34,7 @@ TIRE_AGE_WARN_DAYS = 5 * 365
 TIRE_DISTANCE_WARN_KM = 60000
 TIRE_AGE_WARN_YEARS = 5
 
-
-def ensure_vehicle(vehicle_id: int, user: User, db: Session) -> Vehicle:
-    vehicle = (
-        db.query(Vehicle)
-        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == user.id)
-        .first()
-    )
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+TireState = Tuple[VehicleTire, Optional[TireMeasurement], Optional[TireServiceRecord]]
 
 
 def get_or_create_tire(
@@ -69,6 +64,122 @@ def get_or_create_tire(
     return tire
 
 
+def parse_position(position: str) -> TirePosition:
+    try:
+        return TirePosition(position)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid tire position")
+
+
+def get_owned_tire(
+    db: Session,
+    vehicle_id: int,
+    user: User,
+    position: TirePosition,
+) -> Tuple[Vehicle, VehicleTire]:
+    """소유 차량과 해당 위치의 타이어를 한 번에 조회하고, 타이어가 없으면 생성."""
+    row = (
+        db.query(Vehicle, VehicleTire)
+        .outerjoin(
+            VehicleTire,
+            and_(VehicleTire.vehicle_id == Vehicle.id, VehicleTire.position == position.value),
+        )
+        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == user.id)
+        .first()
+    )
+    if not row:
+        raise vehicle_not_found()
+    vehicle, tire = row
+    if tire is None:
+        tire = get_or_create_tire(vehicle, position, db, create=True)
+    return vehicle, tire
+
+
+def find_owned_measurement(
+    db: Session,
+    measurement_id: int,
+    vehicle_id: int,
+    user: User,
+    position: TirePosition,
+) -> Optional[TireMeasurement]:
+    return (
+        db.query(TireMeasurement)
+        .join(VehicleTire, VehicleTire.id == TireMeasurement.tire_id)
+        .filter(
+            TireMeasurement.id == measurement_id,
+            TireMeasurement.vehicle_id == vehicle_id,
+            VehicleTire.position == position.value,
+            owned_by(TireMeasurement.vehicle_id, user.id),
+        )
+        .first()
+    )
+
+
+def load_tire_states(
+    db: Session,
+    vehicle_id: int,
+    user: User,
+    position: Optional[TirePosition] = None,
+) -> Tuple[Vehicle, Dict[str, TireState]]:
+    """
+    소유 차량, 타이어, 위치별 최신 계측/정비 기록을 한 번의 쿼리로 조회.
+    - LATERAL 조인으로 타이어마다 최신 1건만 붙이므로 계측 건수와 무관하게 쿼리 수가 고정됨
+    - vehicles 기준 LEFT JOIN 이므로 소유 검사도 같은 쿼리에서 처리 (없으면 404)
+    - position 을 지정하면 해당 위치만 조회
+    """
+    latest_measurement = (
+        select(TireMeasurement)
+        .where(TireMeasurement.tire_id == VehicleTire.id)
+        .order_by(TireMeasurement.measured_at.desc(), TireMeasurement.id.desc())
+        .limit(1)
+        .lateral("latest_measurement")
+    )
+    latest_service = (
+        select(TireServiceRecord)
+        .where(TireServiceRecord.tire_id == VehicleTire.id)
+        .order_by(TireServiceRecord.performed_at.desc(), TireServiceRecord.id.desc())
+        .limit(1)
+        .lateral("latest_service")
+    )
+    measurement_entity = aliased(TireMeasurement, latest_measurement)
+    service_entity = aliased(TireServiceRecord, latest_service)
+
+    tire_join = [VehicleTire.vehicle_id == Vehicle.id]
+    if position is not None:
+        tire_join.append(VehicleTire.position == position.value)
+
+    rows = (
+        db.query(Vehicle, VehicleTire, measurement_entity, service_entity)
+        .select_from(Vehicle)
+        .outerjoin(VehicleTire, and_(*tire_join))
+        .outerjoin(measurement_entity, true())
+        .outerjoin(service_entity, true())
+        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == user.id)
+        .all()
+    )
+    if not rows:
+        raise vehicle_not_found()
+    states = {
+        tire.position: (tire, measurement, service)
+        for _, tire, measurement, service in rows
+        if tire is not None
+    }
+    return rows[0][0], states
+
+
+def get_or_create_tire_state(
+    db: Session,
+    vehicle_id: int,
+    user: User,
+    position: TirePosition,
+) -> Tuple[Vehicle, TireState]:
+    vehicle, states = load_tire_states(db, vehicle_id, user, position)
+    state = states.get(position.value)
+    if state:
+        return vehicle, state
+    return vehicle, (get_or_create_tire(vehicle, position, db, create=True), None, None)
+
+
 def escalate_status(current: str, candidate: str) -> str:
     if STATUS_ORDER[candidate] > STATUS_ORDER[current]:
         return candidate
@@ -232,33 +343,11 @@ def get_tire_summary(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-
-    tires = (
-        db.query(VehicleTire)
-        .filter(VehicleTire.vehicle_id == vehicle.id)
-        .all()
-    )
-    tire_map: Dict[str, VehicleTire] = {t.position: t for t in tires}
+    vehicle, tire_states = load_tire_states(db, vehicleId, current_user)
 
     summary_items: List[TireSummaryItem] = []
     for position in POSITION_ORDER:
-        tire = tire_map.get(position.value)
-        last_measurement = None
-        last_service = None
-        if tire:
-            last_measurement = (
-                db.query(TireMeasurement)
-                .filter(TireMeasurement.tire_id == tire.id)
-                .order_by(TireMeasurement.measured_at.desc())
-                .first()
-            )
-            last_service = (
-                db.query(TireServiceRecord)
-                .filter(TireServiceRecord.tire_id == tire.id)
-                .order_by(TireServiceRecord.performed_at.desc())
-                .first()
-            )
+        tire, last_measurement, last_service = tire_states.get(position.value, (None, None, None))
         summary_items.append(
             compute_summary_item(vehicle, position, tire, last_measurement, last_service)
         )
@@ -280,43 +369,50 @@ def get_tire_summary(
 def get_tire_history(
     position: str = Path(...),
     vehicleId: int = Query(..., alias="vehicleId"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    measurementsCursor: Optional[str] = None,
+    servicesCursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
+    """측정/정비 이력은 각각 (일시 DESC, id DESC) 키셋 페이지. limit 이 없으면 전체."""
+    pos_enum = parse_position(position)
+    vehicle, (tire, last_measurement, last_service) = get_or_create_tire_state(db, vehicleId, current_user, pos_enum)
 
-    measurements = (
+    after, order_by = keyset(TireMeasurement.measured_at, TireMeasurement.id, measurementsCursor)
+    measurements, measurements_next = page(
         db.query(TireMeasurement)
-        .filter(TireMeasurement.tire_id == tire.id)
-        .order_by(TireMeasurement.measured_at.desc())
-        .all()
+        .filter(TireMeasurement.tire_id == tire.id, *after)
+        .order_by(*order_by)
+        .limit(fetch_limit(limit))
+        .all(),
+        limit,
+        "measured_at",
     )
 
-    services = (
+    after, order_by = keyset(TireServiceRecord.performed_at, TireServiceRecord.id, servicesCursor)
+    services, services_next = page(
         db.query(TireServiceRecord)
-        .filter(TireServiceRecord.tire_id == tire.id)
-        .order_by(TireServiceRecord.performed_at.desc())
-        .all()
+        .filter(TireServiceRecord.tire_id == tire.id, *after)
+        .order_by(*order_by)
+        .limit(fetch_limit(limit))
+        .all(),
+        limit,
+        "performed_at",
     )
 
-    summary_item = compute_summary_item(
-        vehicle,
-        pos_enum,
-        tire,
-        measurements[0] if measurements else None,
-        services[0] if services else None,
-    )
+    summary_item = compute_summary_item(vehicle, pos_enum, tire, last_measurement, last_service)
 
     measurement_out = [TireMeasurementOut.model_validate(m) for m in measurements]
     service_out = [TireServiceRecordOut.model_validate(s) for s in services]
 
-    return TireHistoryResponse(tire=summary_item, measurements=measurement_out, services=service_out)
+    return TireHistoryResponse(
+        tire=summary_item,
+        measurements=measurement_out,
+        services=service_out,
+        measurements_next_cursor=measurements_next,
+        services_next_cursor=services_next,
+    )
 
 
 @router.put("/{position}", response_model=TireSummaryItem)
@@ -327,32 +423,13 @@ def update_tire_meta(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
+    pos_enum = parse_position(position)
+    vehicle, (tire, last_measurement, last_service) = get_or_create_tire_state(db, vehicleId, current_user, pos_enum)
 
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(tire, field, value)
     db.add(tire)
     db.commit()
-    db.refresh(tire)
-
-    last_measurement = (
-        db.query(TireMeasurement)
-        .filter(TireMeasurement.tire_id == tire.id)
-        .order_by(TireMeasurement.measured_at.desc())
-        .first()
-    )
-    last_service = (
-        db.query(TireServiceRecord)
-        .filter(TireServiceRecord.tire_id == tire.id)
-        .order_by(TireServiceRecord.performed_at.desc())
-        .first()
-    )
 
     return compute_summary_item(vehicle, pos_enum, tire, last_measurement, last_service)
 
@@ -364,13 +441,8 @@ def reset_tire_meta(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
+    pos_enum = parse_position(position)
+    vehicle, (tire, last_measurement, last_service) = get_or_create_tire_state(db, vehicleId, current_user, pos_enum)
     for field in [
         "brand",
         "model",
@@ -389,20 +461,7 @@ def reset_tire_meta(
     tire.pressure_unit = "kPa"
     db.add(tire)
     db.commit()
-    db.refresh(tire)
 
-    last_measurement = (
-        db.query(TireMeasurement)
-        .filter(TireMeasurement.tire_id == tire.id)
-        .order_by(TireMeasurement.measured_at.desc())
-        .first()
-    )
-    last_service = (
-        db.query(TireServiceRecord)
-        .filter(TireServiceRecord.tire_id == tire.id)
-        .order_by(TireServiceRecord.performed_at.desc())
-        .first()
-    )
     return compute_summary_item(vehicle, pos_enum, tire, last_measurement, last_service)
 
 
@@ -414,13 +473,8 @@ def create_tire_measurement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
+    pos_enum = parse_position(position)
+    vehicle, tire = get_owned_tire(db, vehicleId, current_user, pos_enum)
 
     measured_at = payload.measured_at or datetime.now(timezone.utc)
     measured_date = measured_at.date() if hasattr(measured_at, "date") else None
@@ -441,7 +495,6 @@ def create_tire_measurement(
     )
     db.add(measurement)
     db.commit()
-    db.refresh(measurement)
     return TireMeasurementOut.model_validate(measurement)
 
 
@@ -454,22 +507,8 @@ def update_tire_measurement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
-    measurement = (
-        db.query(TireMeasurement)
-        .filter(
-            TireMeasurement.id == measurement_id,
-            TireMeasurement.vehicle_id == vehicle.id,
-            TireMeasurement.tire_id == tire.id,
-        )
-        .first()
-    )
+    pos_enum = parse_position(position)
+    measurement = find_owned_measurement(db, measurement_id, vehicleId, current_user, pos_enum)
     if not measurement:
         raise HTTPException(status_code=404, detail="Measurement not found")
 
@@ -483,7 +522,6 @@ def update_tire_measurement(
     measurement.measured_at = measured_at
     db.add(measurement)
     db.commit()
-    db.refresh(measurement)
     return TireMeasurementOut.model_validate(measurement)
 
 
@@ -495,21 +533,8 @@ def delete_tire_measurement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
-    measurement = (
-        db.query(TireMeasurement)
-        .filter(
-            TireMeasurement.id == measurement_id,
-            TireMeasurement.vehicle_id == vehicle.id,
-            TireMeasurement.tire_id == tire.id,
-        )
-        .first()
-    )
+    pos_enum = parse_position(position)
+    measurement = find_owned_measurement(db, measurement_id, vehicleId, current_user, pos_enum)
     if not measurement:
         raise HTTPException(status_code=404, detail="Measurement not found")
     db.delete(measurement)
@@ -525,15 +550,10 @@ def record_tire_replacement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    try:
-        pos_enum = TirePosition(position)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid tire position")
-
-    tire = get_or_create_tire(vehicle, pos_enum, db, create=True)
+    pos_enum = parse_position(position)
     if payload.performed_at > date.today():
         raise HTTPException(status_code=400, detail="올바른 날짜를 선택해주세요.")
+    vehicle, tire = get_owned_tire(db, vehicleId, current_user, pos_enum)
 
     field_values = payload.model_dump(exclude_unset=True)
     service_payload = {key: field_values.pop(key) for key in ["performed_at", "odo_km", "provider", "cost"] if key in field_values}
@@ -541,8 +561,6 @@ def record_tire_replacement(
     for field, value in field_values.items():
         setattr(tire, field, value)
     db.add(tire)
-    db.commit()
-    db.refresh(tire)
 
     service = TireServiceRecord(
         user_id=current_user.id,
@@ -562,7 +580,6 @@ def record_tire_replacement(
     )
     db.add(service)
     db.commit()
-    db.refresh(service)
 
     return TireServiceRecordOut.model_validate(service)
 
@@ -573,26 +590,28 @@ def record_rotation(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(payload.vehicle_id, current_user, db)
     if payload.performed_at > date.today():
         raise HTTPException(status_code=400, detail="올바른 날짜를 선택해주세요.")
 
-    service = TireServiceRecord(
-        user_id=current_user.id,
-        vehicle_id=vehicle.id,
-        tire_id=None,
-        positions="front_left,front_right,rear_left,rear_right",
-        service_type="rotation",
-        performed_at=payload.performed_at,
-        odo_km=payload.odo_km,
-        provider=payload.provider,
-        cost=payload.cost,
-        pattern=payload.pattern,
-        notes=payload.notes,
+    service = insert_owned(
+        db,
+        TireServiceRecord,
+        current_user.id,
+        {
+            "user_id": current_user.id,
+            "vehicle_id": payload.vehicle_id,
+            "tire_id": None,
+            "positions": "front_left,front_right,rear_left,rear_right",
+            "service_type": "rotation",
+            "performed_at": payload.performed_at,
+            "odo_km": payload.odo_km,
+            "provider": payload.provider,
+            "cost": payload.cost,
+            "pattern": payload.pattern,
+            "notes": payload.notes,
+        },
     )
-    db.add(service)
     db.commit()
-    db.refresh(service)
 
     return TireServiceRecordOut.model_validate(service)
 
@@ -604,13 +623,13 @@ def list_service_records(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = ensure_vehicle(vehicleId, current_user, db)
-    services = (
-        db.query(TireServiceRecord)
-        .filter(TireServiceRecord.vehicle_id == vehicle.id)
-        .order_by(TireServiceRecord.performed_at.desc())
-        .limit(limit)
-        .all()
+    services = fetch_owned(
+        db,
+        TireServiceRecord,
+        vehicleId,
+        current_user.id,
+        order_by=[TireServiceRecord.performed_at.desc()],
+        limit=limit,
     )
     return [TireServiceRecordOut.model_validate(s) for s in services]
 
@@ -1,29 +1,28 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete
 from sqlalchemy.orm import Session, load_only
 
+from api.charging import charging_stats
+from api.consumables import load_dashboard_consumables, seed_default_items
+from api.fuel import fuel_stats
 from api.legal import build_legal_summary_response
+from api.tires import get_tire_summary
 from core.auth import get_current_user
+from core.catalog import EMPTY_LIST, CachedBody, cached_body, get_catalog
+from core.ownership import vehicle_not_found
+from db.routing import DbRoute
 from db.session import get_db
-from models.CarMaker import CarMaker
-from models.CarMakerAbroad import CarMakerAbroad
-from models.CarModel import CarModel
-from models.CarModelAbroad import CarModelAbroad
-from models.ChargingRecord import ChargingRecord
-from models.ConsumableItem import Consumable, ConsumableItem
-from models.Expense import Expense
-from models.FuelRecord import FuelRecord
-from models.MaintenanceRecord import MaintenanceRecord
-from models.Notification import Notification
-from models.Tire import TireMeasurement, TireServiceRecord, VehicleTire
 from models.User import User
 from models.Vehicle import Vehicle
-from models.VehicleOdometerLog import VehicleOdometerLog
-from models.legalinfo import LegalInfo, LegalNotification
+from models.legalinfo import LegalInfo
 from schemas.vehicle import VehicleCreate
 
-router = APIRouter(tags=["vehicles"])
+router = APIRouter(tags=["vehicles"], route_class=DbRoute)
+# 제조사/모델 카탈로그: 메모리 스냅샷만 읽으므로 DbRoute 가 아닌 일반 라우트 (스레드풀).
+# 스냅샷이 없을 때의 지연 로드(동기 psycopg2)가 DB_ASYNC_ENABLED 에서도 이벤트 루프를 막지 않도록
+catalog_router = APIRouter(tags=["vehicles"])
 
 
 @router.post("/add")
@@ -44,8 +43,10 @@ def add_vehicle(
         owner_name=vehicle.owner_name,
     )
     db.add(new_vehicle)
+    db.flush()
+    # 소모품 기본 설정 항목은 차량 생성과 같은 트랜잭션에서 한 번에 생성
+    seed_default_items(db, [new_vehicle.id])
     db.commit()
-    db.refresh(new_vehicle)
     return {"success": True, "vehicle": new_vehicle.id, "id": new_vehicle.id}
 
 
@@ -85,74 +86,109 @@ def bootstrap(vehicleId: int | None = None, db: Session = Depends(get_db), curre
     return {"vehicles": vehicles, "legalSummary": legal_summary}
 
 
+DASHBOARD_SECTIONS = ("fuel", "charging", "odometer", "consumables", "tires", "legal")
+
+
+@router.get("/{vehicle_id}/dashboard")
+def vehicle_dashboard(
+    vehicle_id: int,
+    include: str | None = Query(None, description="쉼표로 구분한 섹션 목록 (기본: 전체)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    홈 화면에 필요한 데이터를 한 번의 요청으로 반환.
+    - fuel/charging: /fuel/stats, /charging/stats 와 동일
+    - odometer: /odometer/current 와 동일
+    - consumables: 카테고리별 {items: /consumables/items, history: /consumables/search?sort=id&order=desc}
+    - tires: /tires/summary 와 동일
+    - legal: /legal/summary 와 동일
+    - 모든 섹션이 같은 세션(커넥션)에서 섹션당 1~2개의 쿼리로 처리됨
+    - 차량 조회로 먼저 404 를 판단하지만 fuel/charging/tires 는 단독 엔드포인트 함수를 그대로 쓰므로
+      각자의 쿼리 안에서 소유 조건(vehicles PK 조인)을 한 번 더 확인함
+    """
+    sections = DASHBOARD_SECTIONS
+    if include:
+        sections = tuple(dict.fromkeys(part.strip() for part in include.split(",") if part.strip()))
+        unknown = [name for name in sections if name not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown dashboard section: {', '.join(unknown)}")
+
+    vehicle = (
+        db.query(Vehicle)
+        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id)
+        .first()
+    )
+    if not vehicle:
+        raise vehicle_not_found()
+
+    result: dict = {"vehicle_id": vehicle.id}
+    if "fuel" in sections:
+        result["fuel"] = fuel_stats(vehicle.id, db, current_user)
+    if "charging" in sections:
+        result["charging"] = charging_stats(vehicle.id, db, current_user)
+    if "odometer" in sections:
+        result["odometer"] = {"odo_km": vehicle.odo_km}
+    if "consumables" in sections:
+        result["consumables"] = load_dashboard_consumables(db, current_user.id, vehicle.id)
+    if "tires" in sections:
+        result["tires"] = get_tire_summary(vehicleId=vehicle.id, db=db, current_user=current_user)
+    if "legal" in sections:
+        records = db.query(LegalInfo).filter(LegalInfo.vehicle_id == vehicle.id, LegalInfo.user_id == current_user.id).all()
+        result["legal"] = build_legal_summary_response(records)
+    return result
+
+
 @router.delete("/{vehicle_id}")
 def delete_vehicle(
     vehicle_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).first()
-    if not vehicle:
+    # 자식 테이블은 모두 vehicle_id FK 의 ON DELETE CASCADE 로 함께 삭제됨 (db/migrations.py 8)
+    deleted = db.execute(
+        delete(Vehicle).where(Vehicle.id == vehicle_id, Vehicle.user_id == current_user.id).returning(Vehicle.id)
+    ).first()
+    if not deleted:
         raise HTTPException(status_code=404, detail="차량을 찾을 수 없습니다.")
-
-    db.query(Notification).filter(Notification.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(MaintenanceRecord).filter(MaintenanceRecord.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(Consumable).filter(Consumable.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(ConsumableItem).filter(ConsumableItem.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(TireMeasurement).filter(TireMeasurement.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(TireServiceRecord).filter(TireServiceRecord.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(VehicleTire).filter(VehicleTire.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(LegalNotification).filter(LegalNotification.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(LegalInfo).filter(LegalInfo.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(FuelRecord).filter(FuelRecord.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(ChargingRecord).filter(ChargingRecord.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(Expense).filter(Expense.vehicle_id == vehicle_id).delete(synchronize_session=False)
-    db.query(VehicleOdometerLog).filter(VehicleOdometerLog.vehicle_id == vehicle_id).delete(synchronize_session=False)
-
-    db.delete(vehicle)
     db.commit()
     return {"success": True, "ok": True}
 
 
-@router.get("/makers/domestic", response_model=List[str])
-def get_domestic_makers(db: Session = Depends(get_db)):
-    makers = db.query(CarMaker).all()
-    return [maker.name for maker in makers]
-
-
-@router.get("/models/domestic")
-def list_domestic_models(maker: str, db: Session = Depends(get_db)):
-    maker_obj = db.query(CarMaker).filter_by(name=maker).first()
-    if not maker_obj:
-        return []
-    models = db.query(CarModel).filter_by(maker_id=maker_obj.id).all()
-    return [
-        {
-            "id": model.id,
-            "name": model.name,
-            "displacement_cc": model.displacement_cc,
-        }
-        for model in models
-    ]
-
-
-@router.get("/makers/abroad", response_model=List[str])
-def get_abroad_makers(db: Session = Depends(get_db)):
-    makers = db.query(CarMakerAbroad).all()
-    return [maker.name for maker in makers]
-
-
-@router.get("/models/abroad")
-def list_abroad_models(maker: str, db: Session = Depends(get_db)):
-    maker_obj = db.query(CarMakerAbroad).filter_by(name=maker).first()
-    if not maker_obj:
-        return []
-    models = db.query(CarModelAbroad).filter_by(maker_id=maker_obj.id).all()
-    return [
-        {
-            "id": model.id,
-            "name": model.name,
-            "displacement_cc": model.displacement_cc,
-        }
-        for model in models
-    ]
+CATALOG_CACHE_CONTROL = "public, max-age=86400"
+
+
+def catalog_response(request: Request, cached: CachedBody) -> Response:
+    """미리 만들어 둔 JSON 본문 + 강한 ETag. If-None-Match 가 일치하면 본문 없이 304."""
+    headers = {"ETag": cached.etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or cached.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@catalog_router.get("/makers/domestic", response_model=List[str])
+def get_domestic_makers(request: Request):
+    return catalog_response(request, get_catalog().makers["domestic"])
+
+
+@catalog_router.get("/models/domestic")
+def list_domestic_models(maker: str, request: Request):
+    return catalog_response(request, get_catalog().models.get(("domestic", maker), EMPTY_LIST))
+
+
+@catalog_router.get("/makers/abroad", response_model=List[str])
+def get_abroad_makers(request: Request):
+    return catalog_response(request, get_catalog().makers["abroad"])
+
+
+@catalog_router.get("/models/abroad")
+def list_abroad_models(maker: str, request: Request):
+    return catalog_response(request, get_catalog().models.get(("abroad", maker), EMPTY_LIST))
+
+
+@catalog_router.get("/catalog/search")
+def search_catalog(request: Request, q: str = Query(..., min_length=1, max_length=50), limit: int = Query(20, ge=1, le=50)):
+    """국산/수입 제조사·모델 자동완성 (prefix, 자모 단위 부분 입력, 초성 검색). DB 조회 없음."""
+    catalog = get_catalog()
+    return catalog_response(request, cached_body([entry.as_dict() for entry in catalog.search(q, limit)]))
@@ -1,20 +1,29 @@
 import logging
+import uuid
 from urllib.parse import urlparse
 
 from pathlib import Path
 
-from fastapi import FastAPI, Request, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from api import ai_dashboard, auth, charging, consumables, expenses, fuel, legal, maintenance, notifications, odometer, tires, vehicles
+from api import admin, ai_dashboard, auth, charging, consumables, expenses, fuel, legal, maintenance, notifications, odometer, tires, vehicles
+from core.catalog import reload_catalog
 from core.config import settings
-from core.security import verify_password
-from db.instrumentation import begin_request, end_request, setup_db_timing_logging
-from db.session import engine, get_db
+from core.middleware import TimingMiddleware
+from core.security import shutdown_password_pool, verify_password
+from db import instrumentation
+from db.instrumentation import measure_db_rtt, setup_db_timing_logging
+from db.pagination import NEXT_CURSOR_HEADER
+from db.session import async_engine, engine, get_db
+from jobs.account_deletion import KIND as ACCOUNT_DELETION_KIND, request_account_deletion
+from jobs.consumable_due import start_due_scheduler
+from jobs.guest_gc import start_guest_gc_scheduler
+from jobs.queue import start_job_worker, stop_job_worker
+from models.Job import Job
 from models.User import User
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -47,9 +56,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", NEXT_CURSOR_HEADER],
 )
+app.add_middleware(TimingMiddleware)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+app.include_router(vehicles.catalog_router, prefix="/api/vehicles")
 app.include_router(vehicles.router, prefix="/api/vehicles")
 app.include_router(maintenance.router, prefix="/api/maintenance", tags=["maintenance"])
 app.include_router(consumables.router, prefix="/api/consumables", tags=["consumables"])
@@ -61,7 +73,10 @@ app.include_router(legal.router, prefix="/api/legal", tags=["legal"])
 app.include_router(ai_dashboard.router, prefix="/api/ai_dashboard", tags=["ai_dashboard"])
 app.include_router(odometer.router, prefix="/api/odometer", tags=["odometer"])
 app.include_router(tires.router, prefix="/api")
+app.include_router(admin.router)
 setup_db_timing_logging(engine)
+if async_engine is not None:
+    setup_db_timing_logging(async_engine.sync_engine, "async")
 
 
 def _extract_db_region_hint() -> str:
@@ -81,20 +96,42 @@ def startup_diagnostics():
     elif db_region:
         logger.info("db_region_hint=%s", db_region)
 
+    if settings.DUE_ENGINE_INTERVAL_MINUTES > 0:
+        start_due_scheduler(engine, settings.DUE_ENGINE_INTERVAL_MINUTES)
+    if settings.GUEST_GC_INTERVAL_MINUTES > 0:
+        start_guest_gc_scheduler(engine, settings.GUEST_GC_INTERVAL_MINUTES)
+    if settings.JOB_WORKER_ENABLED:
+        start_job_worker(engine, settings.JOB_POLL_SECONDS)
 
-@app.middleware("http")
-async def timing_middleware(request: Request, call_next):
-    begin_request(request.url.path)
-    response = await call_next(request)
-    end_request(response.status_code)
-    return response
+    try:
+        reload_catalog()
+    except Exception:
+        # 실패해도 첫 카탈로그 요청에서 다시 로드
+        logger.warning("catalog_load_failed", exc_info=True)
+
+    try:
+        rtt_ms = measure_db_rtt(engine)
+    except Exception:
+        logger.warning("db_rtt_measure_failed", exc_info=True)
+        return
+    if rtt_ms > settings.DB_RTT_WARN_MS:
+        logger.warning("db_rtt_high rtt_ms=%.1f app_region=%s db_region=%s", rtt_ms, app_region, db_region)
+    else:
+        logger.info("db_rtt_ms=%.1f", rtt_ms)
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    stop_job_worker()
+    shutdown_password_pool()
 
 
 @app.get("/api/health")
 def health_check():
-    with engine.connect() as conn:
-        conn.execute(text("SELECT 1"))
-    return {"ok": True}
+    # Render 헬스체크/keepalive 용이라 DB 에 접속하지 않음 (DB 장애로 인스턴스가 재시작되지 않도록).
+    # db_rtt_ms 는 시작 시 마지막으로 측정한 값 (측정 실패 시 null)
+    rtt_ms = instrumentation.last_db_rtt_ms
+    return {"ok": True, "db_rtt_ms": None if rtt_ms is None else round(rtt_ms, 1)}
 
 
 @app.get("/api/ping")
@@ -138,8 +175,27 @@ def account_deletion_request(payload: dict, db: Session = Depends(get_db)):
     if not verify_password(password, user.password_hash):
         raise HTTPException(status_code=401, detail="아이디 또는 비밀번호가 올바르지 않습니다.")
 
-    auth.delete_user_account(db, user)
-    return {"ok": True, "message": "계정 및 관련 데이터 삭제가 완료되었습니다."}
+    job_id = request_account_deletion(db, user.id)
+    return {
+        "ok": True,
+        "job_id": str(job_id),
+        "message": "삭제 요청이 접수되었습니다. 계정은 바로 비활성화되며 관련 데이터는 순차적으로 삭제됩니다.",
+    }
+
+
+@app.get("/account-deletion/status/{job_id}", response_class=JSONResponse, include_in_schema=False)
+def account_deletion_status(job_id: uuid.UUID, db: Session = Depends(get_db)):
+    job = db.get(Job, job_id)
+    if not job or job.kind != ACCOUNT_DELETION_KIND:
+        raise HTTPException(status_code=404, detail="삭제 요청을 찾을 수 없습니다.")
+    return {
+        "status": job.status,
+        "done": job.status == "done",
+        "vehicles_total": job.progress.get("vehicles_total"),
+        "vehicles_done": job.progress.get("vehicles_done"),
+        "deleted_rows": job.progress.get("deleted", 0),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
 
 
 app.mount("/images", StaticFiles(directory=str(IMAGES_DIR)), name="images")
@@ -1,25 +1,32 @@
+from datetime import datetime, timedelta
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
+from core.cache import TTLCache
 from core.config import settings
-from db.session import get_db
+from db.session import COMMIT_ON_CLOSE, get_db
 from models.User import User
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+# (user_id, iat) -> 세션에서 분리된 User 스냅샷
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def decode_access_token(token: str) -> tuple[int, int | None]:
     """
-    JWT 토큰을 검증하고 DB의 User 객체를 반환.
-    - 토큰은 Authorization: Bearer <token> 헤더에서 추출됨
+    액세스 토큰을 검증하고 (user_id, iat) 를 반환.
     - JWT_SECRET / JWT_ALG 기준으로 디코딩
     - sub(claim) 값 = user_id 로 간주
     """
-    token = credentials.credentials
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
         sub = payload.get("sub")
@@ -28,9 +35,75 @@ def get_current_user(
         user_id = int(sub)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id, payload.get("iat")
+
+
+def _snapshot(user: User) -> User:
+    snapshot = User(
+        id=user.id,
+        username=user.username,
+        password_hash=user.password_hash,
+        created_at=user.created_at,
+        disabled_at=user.disabled_at,
+        last_active_at=user.last_active_at,
+    )
+    make_transient_to_detached(snapshot)
+    return snapshot
 
-    user = db.query(User).get(user_id)
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
 
+def _touch_last_active(user: User, db: Session) -> None:
+    """
+    users.last_active_at 갱신 (비회원 정리 기준). 캐시 미스 때만 불리고 LAST_ACTIVE_TOUCH_MINUTES 안에는 다시 쓰지 않으므로
+    사용자당 쓰기는 그 간격에 한 번 정도. 요청 세션에서 실행해 요청의 commit 으로 반영되고,
+    commit 하지 않는 조회 요청은 get_db 가 정상 종료 시 commit (COMMIT_ON_CLOSE).
+    """
+    now = datetime.utcnow()
+    if user.last_active_at is not None and now - user.last_active_at < timedelta(minutes=settings.LAST_ACTIVE_TOUCH_MINUTES):
+        return
+    db.execute(update(User).where(User.id == user.id).values(last_active_at=now))
+    db.info[COMMIT_ON_CLOSE] = True
+    set_committed_value(user, "last_active_at", now)  # 세션에서 다시 UPDATE 되지 않도록
+
+
+def _load_principal(user_id: int, issued_at: int | None, db: Session) -> User:
+    user = db.get(User, user_id)
+    if not user or user.disabled_at is not None:
+        raise HTTPException(status_code=401, detail="User not found")
+    _touch_last_active(user, db)
+    principal_cache.set((user_id, issued_at), _snapshot(user))
     return user
+
+
+def invalidate_principal(user_id: int) -> None:
+    """계정 생성/비활성화/삭제 시 해당 사용자의 캐시된 인증 정보를 모두 제거."""
+    principal_cache.discard_where(lambda key: key[0] == user_id)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    JWT 토큰을 검증하고 DB의 User 객체를 반환.
+    - 토큰은 Authorization: Bearer <token> 헤더에서 추출됨
+    - 캐시에 있으면 DB 조회 없이 현재 세션에 붙여서 반환 (merge load=False)
+    """
+    user_id, issued_at = decode_access_token(credentials.credentials)
+    cached = principal_cache.get((user_id, issued_at))
+    if cached is not None:
+        return db.merge(cached, load=False)
+    return _load_principal(user_id, issued_at, db)
+
+
+def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> int:
+    """
+    검증된 user_id 만 필요한 엔드포인트용 경량 의존성.
+    - 캐시 적중 시 DB 왕복 없음, 미스 시에만 사용자 존재 여부를 한 번 확인
+    """
+    user_id, issued_at = decode_access_token(credentials.credentials)
+    if principal_cache.get((user_id, issued_at)) is None:
+        _load_principal(user_id, issued_at, db)
+    return user_id
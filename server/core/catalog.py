@@ -0,0 +1,203 @@
+"""
+제조사/모델 카탈로그 (car_makers, car_models, car_makers_abroad, car_models_abroad) 프로세스 내 캐시.
+- 거의 바뀌지 않는 참조 데이터이므로 시작 시 한 번 읽어 불변 스냅샷으로 보관하고, 갱신은 reload_catalog() 로만 함
+- 목록 응답은 JSON 바이트로 미리 만들어 두고 본문 해시를 강한 ETag 로 사용
+- 자동완성 검색은 이름을 자모 단위로 풀어 정렬한 키 목록을 bisect 로 찾으므로 DB 를 전혀 조회하지 않음
+  (예: "아바" → 아반떼, "ㅇㅂㄸ" → 아반떼, "그랜ㅈ" → 그랜저)
+- 워커 프로세스마다 따로 들고 있으므로 데이터를 바꾼 뒤에는 워커별로 reload 필요 (POST /debug/catalog/reload)
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import logging
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db.session import SessionLocal
+from models.CarMaker import CarMaker
+from models.CarMakerAbroad import CarMakerAbroad
+from models.CarModel import CarModel
+from models.CarModelAbroad import CarModelAbroad
+
+logger = logging.getLogger("carcare.app")
+
+ORIGINS = {"domestic": (CarMaker, CarModel), "abroad": (CarMakerAbroad, CarModelAbroad)}
+
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+# 입력 중에는 겹모음/겹받침이 두 번에 나눠 입력되므로 나눠진 형태로 비교 ("고" 까지 입력해도 "과" 와 일치)
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+SEPARATORS = " -_/.()·"
+
+
+def _split(jamo: str) -> str:
+    return COMPOUND_JAMO.get(jamo, jamo)
+
+
+def to_jamo(text: str) -> str:
+    """소문자 + 구분자 제거 + 한글 음절을 (겹자모까지 나눈) 호환 자모열로 분해."""
+    out: list[str] = []
+    for char in text.lower():
+        if char in SEPARATORS:
+            continue
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            index = code - HANGUL_BASE
+            out.append(CHOSEONG[index // 588])
+            out.append(_split(JUNGSEONG[index % 588 // 28]))
+            out.append(_split(JONGSEONG[index % 28]))
+        else:
+            out.append(_split(char))
+    return "".join(out)
+
+
+def to_choseong(text: str) -> str:
+    """한글 음절은 초성만, 그 외 문자는 그대로 (구분자 제거). "아반떼 N" → "ㅇㅂㄸn"."""
+    out: list[str] = []
+    for char in text.lower():
+        if char in SEPARATORS:
+            continue
+        code = ord(char)
+        out.append(CHOSEONG[(code - HANGUL_BASE) // 588] if HANGUL_BASE <= code <= HANGUL_LAST else char)
+    return "".join(out)
+
+
+def _words(text: str) -> list[str]:
+    """단어 시작 위치마다 그 뒤 전체 문자열 (두 번째 단어부터 시작하는 입력도 prefix 로 찾기 위함)."""
+    starts = [0]
+    for i, char in enumerate(text):
+        if char in SEPARATORS and i + 1 < len(text) and text[i + 1] not in SEPARATORS:
+            starts.append(i + 1)
+    return [text[start:] for start in starts]
+
+
+class CatalogEntry(NamedTuple):
+    kind: str  # maker | model
+    origin: str  # domestic | abroad
+    maker: str
+    name: str
+    id: int
+    displacement_cc: Optional[int]
+
+    def as_dict(self) -> dict:
+        return {
+            "type": self.kind,
+            "origin": self.origin,
+            "maker": self.maker,
+            "name": self.name,
+            "id": self.id,
+            "displacement_cc": self.displacement_cc,
+        }
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def cached_body(payload) -> CachedBody:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    return CachedBody(body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+
+
+EMPTY_LIST = cached_body([])
+
+# 검색 순위: 이름 전체 prefix < 단어 prefix < "제조사 모델" prefix < 초성 prefix
+RANK_NAME, RANK_WORD, RANK_MAKER_MODEL, RANK_CHOSEONG = range(4)
+
+
+class Catalog:
+    """불변 스냅샷. 다시 읽을 때는 새 인스턴스로 통째로 교체."""
+
+    def __init__(self, rows: dict[str, list[tuple[int, str, list[tuple[int, str, Optional[int]]]]]]):
+        self.makers: dict[str, CachedBody] = {}
+        self.models: dict[tuple[str, str], CachedBody] = {}
+        self.entries: list[CatalogEntry] = []
+        keys: list[tuple[str, int, int]] = []
+        for origin, makers in rows.items():
+            self.makers[origin] = cached_body([name for _, name, _ in makers])
+            for maker_id, maker_name, models in makers:
+                self.models[(origin, maker_name)] = cached_body(
+                    [{"id": model_id, "name": name, "displacement_cc": cc} for model_id, name, cc in models]
+                )
+                self._add(keys, CatalogEntry("maker", origin, maker_name, maker_name, maker_id, None))
+                for model_id, name, cc in models:
+                    entry = CatalogEntry("model", origin, maker_name, name, model_id, cc)
+                    index = self._add(keys, entry)
+                    keys.append((to_jamo(f"{maker_name}{name}"), RANK_MAKER_MODEL, index))
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._refs = [(rank, index) for _, rank, index in keys]
+        self.size = len(self.entries)
+        self.version = hashlib.blake2b(
+            b"".join(body.etag.encode() for body in [*self.makers.values(), *self.models.values()]), digest_size=8
+        ).hexdigest()
+
+    def _add(self, keys: list, entry: CatalogEntry) -> int:
+        index = len(self.entries)
+        self.entries.append(entry)
+        lowered = entry.name.lower()
+        for position, word in enumerate(_words(lowered)):
+            keys.append((to_jamo(word), RANK_NAME if position == 0 else RANK_WORD, index))
+        keys.append((to_choseong(lowered), RANK_CHOSEONG, index))
+        return index
+
+    def search(self, query: str, limit: int = 20) -> list[CatalogEntry]:
+        """prefix 일치 항목을 순위 → 이름 길이 → 이름 순으로 반환 (한 항목은 가장 좋은 순위로 한 번만)."""
+        prefix = to_jamo(query.strip())
+        if not prefix:
+            return []
+        # 초성 키는 자음만 있으므로 모음이 들어간 입력과는 겹치지 않고, 자음만 입력하면 초성 키와 일치
+        best: dict[int, int] = {}
+        position = bisect.bisect_left(self._keys, prefix)
+        while position < len(self._keys) and self._keys[position].startswith(prefix):
+            rank, index = self._refs[position]
+            if rank < best.get(index, RANK_CHOSEONG + 1):
+                best[index] = rank
+            position += 1
+        ordered = sorted(best, key=lambda index: (best[index], len(self.entries[index].name), self.entries[index].name))
+        return [self.entries[index] for index in ordered[:limit]]
+
+
+def load_catalog(db: Session) -> Catalog:
+    """제조사/모델 4개 테이블을 테이블당 한 번씩 읽어 스냅샷 생성 (id 순으로 고정해 ETag 가 안정적이도록)."""
+    rows = {}
+    for origin, (maker_model, car_model) in ORIGINS.items():
+        models_by_maker: dict[int, list[tuple[int, str, Optional[int]]]] = {}
+        for model_id, maker_id, name, cc in db.execute(
+            select(car_model.id, car_model.maker_id, car_model.name, car_model.displacement_cc).order_by(car_model.id)
+        ):
+            models_by_maker.setdefault(maker_id, []).append((model_id, name, cc))
+        rows[origin] = [
+            (maker_id, name, models_by_maker.get(maker_id, []))
+            for maker_id, name in db.execute(select(maker_model.id, maker_model.name).order_by(maker_model.id))
+        ]
+    return Catalog(rows)
+
+
+_catalog: Optional[Catalog] = None
+
+
+def reload_catalog() -> Catalog:
+    global _catalog
+    with SessionLocal() as db:
+        catalog = load_catalog(db)
+    _catalog = catalog  # 참조 교체만 하므로 읽는 쪽은 잠금 없이 이전/새 스냅샷 중 하나를 봄
+    logger.info("catalog_loaded entries=%s version=%s", catalog.size, catalog.version)
+    return catalog
+
+
+def get_catalog() -> Catalog:
+    """현재 스냅샷. 시작 시 로드에 실패했으면 첫 요청에서 로드."""
+    catalog = _catalog
+    return catalog if catalog is not None else reload_catalog()
@@ -0,0 +1,37 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.instrumentation import begin_request, end_request, server_timing
+
+
+class TimingMiddleware:
+    """
+    요청 시간/DB 시간 집계 + Server-Timing 헤더 (순수 ASGI 미들웨어).
+    - BaseHTTPMiddleware 와 달리 하위 앱을 별도 태스크로 돌리지 않아 스트리밍 응답도 그대로 통과
+    - 통계 객체는 contextvar 로 공유되고, 스레드풀/greenlet 에는 컨텍스트 복사로 같은 객체가 전달됨
+    - 집계는 응답 본문 전송이 끝난 뒤(또는 예외 시) 한 번만 수행
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = begin_request(scope["method"], scope["path"])
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            end_request(stats, status_code, getattr(route, "path", None))
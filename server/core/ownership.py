@@ -1,16 +1,129 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
+
 from fastapi import HTTPException
+from sqlalchemy import cast, delete, exists, insert, literal, select, update
 from sqlalchemy.orm import Session
 
-from models.User import User
+from db.batch import Rows, fetch_batch
+from db.pagination import fetch_limit, keyset, page
 from models.Vehicle import Vehicle
 
+# 차량 소유 검사를 별도 SELECT 없이 실제 쿼리 안에 포함시키기 위한 헬퍼 모음.
+# 차량이 없거나 다른 사용자 소유인 경우 모두 404 로 응답한다.
+
+
+def vehicle_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Vehicle not found")
+
+
+def owned_by(vehicle_id_column, user_id: int):
+    """vehicle_id 컬럼이 user_id 소유 차량을 가리키는지 검사하는 EXISTS 조건."""
+    return exists().where(Vehicle.id == vehicle_id_column, Vehicle.user_id == user_id)
+
 
-def ensure_vehicle_owned(vehicle_id: int, user: User, db: Session) -> Vehicle:
-    vehicle = (
-        db.query(Vehicle)
-        .filter(Vehicle.id == vehicle_id, Vehicle.user_id == user.id)
-        .first()
+def owned_vehicle_select(vehicle_id: int, user_id: int, *columns):
+    """소유 차량 1행 select. fetch_batch 의 anchor 로 사용 (columns 생략 시 Vehicle 엔티티)."""
+    return select(*(columns or (Vehicle,))).where(Vehicle.id == vehicle_id, Vehicle.user_id == user_id)
+
+
+def fetch_owned(
+    db: Session,
+    model,
+    vehicle_id: int,
+    user_id: int,
+    *criteria,
+    order_by=(),
+    limit: Optional[int] = None,
+) -> list:
+    """
+    소유 차량의 레코드를 소유 검사와 함께 한 번의 쿼리로 조회.
+    - 소유 차량 1행에 레코드 조회를 LEFT JOIN LATERAL 로 붙임 (db.batch.fetch_batch)
+      → 조건/정렬/LIMIT 이 lateral 안에서 (vehicle_id, 날짜, id) 인덱스에 적용되어 limit 행에서 읽기를 멈춤
+    - 차량 행이 없으면 차량이 없거나 남의 차량 → 404
+    """
+    records = select(model).where(model.vehicle_id == vehicle_id, *criteria).order_by(*order_by).limit(limit)
+    batch = fetch_batch(
+        db,
+        owned_vehicle_select(vehicle_id, user_id, Vehicle.id),
+        records=Rows(records, order_by=order_by),
     )
-    if not vehicle:
-        raise HTTPException(status_code=404, detail="Vehicle not found")
-    return vehicle
+    if batch is None:
+        raise vehicle_not_found()
+    return batch[1]["records"]
+
+
+def fetch_owned_page(
+    db: Session,
+    model,
+    vehicle_id: int,
+    user_id: int,
+    *criteria,
+    sort_column,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> tuple[list, Optional[str]]:
+    """fetch_owned 의 (날짜 DESC, id DESC) 키셋 페이지 버전. (레코드 목록, 다음 커서) 를 반환."""
+    after, order_by = keyset(sort_column, model.id, cursor)
+    records = fetch_owned(db, model, vehicle_id, user_id, *criteria, *after, order_by=order_by, limit=fetch_limit(limit))
+    return page(records, limit, sort_column.key)
+
+
+# 요청 본문의 문자열 값을 컬럼 타입의 파이썬 값으로 변환.
+# psycopg2 는 문자열을 그대로 보내 서버가 변환하지만 asyncpg(DB_ASYNC_ENABLED) 는 타입이 맞지 않으면 바인딩 단계에서 실패함
+_PARSERS = {date: date.fromisoformat, datetime: datetime.fromisoformat, int: int, float: float, Decimal: Decimal}
+
+
+def _bind_values(model, values: dict[str, Any]) -> dict[str, Any]:
+    table_columns = model.__table__.c
+    bound = {}
+    for name, value in values.items():
+        if isinstance(value, str) and name in table_columns:
+            try:
+                parser = _PARSERS.get(table_columns[name].type.python_type)
+            except NotImplementedError:
+                parser = None
+            if parser is not None:
+                try:
+                    value = parser(value)
+                except (ValueError, InvalidOperation):
+                    raise HTTPException(status_code=422, detail=f"Invalid value for {name}")
+        bound[name] = value
+    return bound
+
+
+def insert_owned(db: Session, model, user_id: int, values: dict[str, Any]):
+    """
+    INSERT ... SELECT ... FROM vehicles WHERE 소유 조건 RETURNING *
+    - 소유 차량이 아니면 아무 행도 삽입되지 않으므로 404
+    """
+    values = _bind_values(model, values)
+    columns = [name for name in values if name != "vehicle_id"]
+    table_columns = model.__table__.c
+    source = select(
+        Vehicle.id,
+        *[cast(literal(values[name], table_columns[name].type), table_columns[name].type) for name in columns],
+    ).where(Vehicle.id == values["vehicle_id"], Vehicle.user_id == user_id)
+    stmt = insert(model).from_select(["vehicle_id", *columns], source).returning(model)
+    record = db.scalars(stmt).first()
+    if record is None:
+        raise vehicle_not_found()
+    return record
+
+
+def update_owned(db: Session, model, user_id: int, values: dict[str, Any], *criteria):
+    """UPDATE ... WHERE criteria AND 소유 조건 RETURNING *. 대상이 없으면 None."""
+    stmt = (
+        update(model)
+        .where(*criteria, owned_by(model.vehicle_id, user_id))
+        .values(**_bind_values(model, values))
+        .returning(model)
+    )
+    return db.scalars(stmt).first()
+
+
+def delete_owned(db: Session, model, user_id: int, *criteria) -> bool:
+    """DELETE ... WHERE criteria AND 소유 조건 RETURNING id. 삭제된 행이 있으면 True."""
+    stmt = delete(model).where(*criteria, owned_by(model.vehicle_id, user_id)).returning(model.id)
+    return db.execute(stmt).first() is not None
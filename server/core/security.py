@@ -1,44 +1,145 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
 from core.config import settings
-from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from core.metrics import registry
+from fastapi import HTTPException, status
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-# 1) 토큰 스킴 정의 (로그인 토큰 발급 엔드포인트 경로에 맞춰 수정)
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-# 2) 시크릿/알고리즘 설정 (config에 이미 존재하는 키 사용)
-SECRET_KEY = getattr(settings, "JWT_SECRET", None) or settings.SECRET_KEY
-ALGORITHM = getattr(settings, "JWT_ALG", "HS256")
+logger = logging.getLogger("carcare.app")
 
-def hash_password(pw: str) -> str:
+# bcrypt 는 한 번에 100~300ms 동안 GIL 을 잡고 CPU 를 쓰므로, 요청 스레드풀이 아닌 별도 프로세스 풀에서 실행.
+# 요청 스레드는 결과를 기다리는 동안 GIL 을 놓으므로 같은 워커의 다른 API 가 계속 처리됨.
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify latency including queue wait.",
+    ("op",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0),
+)
+PASSWORD_HASH_REJECTED = registry.counter(
+    "password_hash_rejected_total", "bcrypt jobs rejected because the pool queue was full or timed out.", ("op", "reason")
+)
+_pending = 0
+_pending_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+registry.gauge("password_hash_pending", "bcrypt jobs running or queued on the process pool.", collect=lambda: {(): _pending})
+
+
+def _hash_in_worker(pw: str) -> str:
     return pwd_context.hash(pw)
 
+
+def _verify_in_worker(pw: str, hashed: str) -> bool:
+    return pwd_context.verify(pw, hashed)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 스레드가 여러 개인 프로세스에서 fork 하면 잠금 상태가 복사될 수 있으므로 spawn 사용
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_password_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="요청이 많아 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _job_done(_future) -> None:
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _run_password_job(op: str, job: Callable, *args):
+    """
+    프로세스 풀에서 bcrypt 작업 실행 (PASSWORD_HASH_WORKERS=0 이면 현재 스레드에서 실행).
+    - 실행 중 + 대기 중 작업이 PASSWORD_HASH_MAX_PENDING 이상이면 기다리지 않고 503
+    - PASSWORD_HASH_TIMEOUT_SECONDS 안에 끝나지 않아도 503
+    """
+    global _pending
+    started = time.perf_counter()
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        try:
+            return job(*args)
+        finally:
+            PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, op=op)
+
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            PASSWORD_HASH_REJECTED.inc(op=op, reason="queue_full")
+            raise _overloaded()
+        _pending += 1
+    pool = None
+    try:
+        try:
+            pool = _get_pool()
+            future = pool.submit(job, *args)
+        except BaseException:
+            _job_done(None)
+            raise
+        # 대기 수는 요청이 포기했을 때가 아니라 작업이 실제로 끝나거나 취소됐을 때 줄임 (타임아웃 뒤에도 실행 중이면 계속 집계)
+        future.add_done_callback(_job_done)
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            # 아직 시작하지 않은 작업은 취소해 쌓이지 않도록 (이미 실행 중이면 끝날 때까지 대기 수에 포함)
+            future.cancel()
+            PASSWORD_HASH_REJECTED.inc(op=op, reason="timeout")
+            raise _overloaded()
+    except BrokenProcessPool:
+        logger.warning("password_hash_pool_broken; recreating", exc_info=True)
+        if pool is not None:
+            _reset_pool(pool)
+        PASSWORD_HASH_REJECTED.inc(op=op, reason="broken_pool")
+        raise _overloaded()
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, op=op)
+
+
+def hash_password(pw: str) -> str:
+    return _run_password_job("hash", _hash_in_worker, pw)
+
 def verify_password(pw: str, hashed: str) -> bool:
     if not hashed or not str(hashed).startswith("$2"):
         return False
-    return pwd_context.verify(pw, hashed)
+    return _run_password_job("verify", _verify_in_worker, pw, hashed)
 
 def create_token(sub: str, minutes: int = 60*24) -> str:
     now = datetime.utcnow()
     payload = {"sub": sub, "iat": now, "exp": now + timedelta(minutes=minutes)}
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
-
-def get_current_user_id(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    return int(user_id)
@@ -0,0 +1,91 @@
+"""
+서로 독립적인 조회 여러 개를 한 문장(한 번의 왕복)으로 묶어 실행하는 헬퍼.
+
+anchor (보통 소유 차량 1행) 에 각 조회를 LEFT JOIN LATERAL ... ON TRUE 로 붙인다.
+- Select 파트: 최대 1행 (limit(1) 또는 집계). 없으면 None
+- Rows 파트: 여러 행. 한 번의 호출에 하나만 허용 (행 수만큼 결과가 늘어나므로)
+- 엔티티 select(Model) 은 Model 객체로, 컬럼 select 는 {컬럼 이름: 값} dict 로 돌려준다
+- anchor 행이 없으면 None (소유하지 않은 차량 → 호출 측에서 404)
+"""
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Select, func, literal, true
+from sqlalchemy.orm import Session, aliased
+
+PRESENT = "batch_present"
+ORDINAL = "batch_ordinal"
+
+
+class Rows(NamedTuple):
+    statement: Select
+    order_by: Sequence[Any] = ()
+
+
+def _entity(statement: Select):
+    descriptions = statement.column_descriptions
+    if len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]:
+        return descriptions[0]["entity"]
+    return None
+
+
+def _lateral_part(name: str, statement: Select, extra: Sequence[Any]):
+    """lateral 서브쿼리를 만들고 (결과 컬럼들, join 대상, 존재 표시 컬럼) 을 반환."""
+    model = _entity(statement)
+    lateral = statement.add_columns(literal(True).label(PRESENT), *extra).lateral(name)
+    if model is not None:
+        target = aliased(model, lateral)
+        return [target], target, lateral
+    columns = [column for column in lateral.c if column.key not in (PRESENT, ORDINAL)]
+    return columns, lateral, lateral
+
+
+def fetch_batch(db: Session, anchor: Select, **parts: Select | Rows) -> Optional[tuple[Any, dict[str, Any]]]:
+    """anchor 와 parts 를 한 문장으로 실행하고 (anchor 결과, {이름: 결과}) 를 반환."""
+    many = [name for name, part in parts.items() if isinstance(part, Rows)]
+    if len(many) > 1:
+        raise ValueError("fetch_batch supports at most one Rows part")
+
+    anchor_model = _entity(anchor)
+    anchor_width = 1 if anchor_model is not None else len(anchor.selected_columns)
+    anchor_from = anchor.get_final_froms()[0]
+    stmt = anchor
+    layout: list[tuple[str, list[str] | None, bool]] = []
+    ordinal = None
+    for name, part in parts.items():
+        is_many = isinstance(part, Rows)
+        statement = part.statement if is_many else part
+        extra = [func.row_number().over(order_by=list(part.order_by)).label(ORDINAL)] if is_many else []
+        columns, target, lateral = _lateral_part(name, statement, extra)
+        if is_many:
+            ordinal = lateral.c[ORDINAL]
+        stmt = stmt.add_columns(*columns, lateral.c[PRESENT]).join_from(anchor_from, target, true(), isouter=True)
+        keys = None if _entity(statement) is not None else [column.key for column in columns]
+        layout.append((name, keys, is_many))
+    if ordinal is not None:
+        stmt = stmt.order_by(ordinal)
+
+    rows = db.execute(stmt).all()
+    if not rows:
+        return None
+
+    first = rows[0]
+    anchor_value = first[0] if anchor_model is not None else first[:anchor_width]
+    results: dict[str, Any] = {}
+    offset = anchor_width
+    for name, keys, is_many in layout:
+        width = 1 if keys is None else len(keys)
+        present = offset + width
+
+        def value_of(row, offset=offset, present=present, keys=keys):
+            if not row[present]:
+                return None
+            return row[offset] if keys is None else dict(zip(keys, row[offset:present]))
+
+        if is_many:
+            results[name] = [value for value in map(value_of, rows) if value is not None]
+        else:
+            results[name] = value_of(first)
+        offset = present + 1
+    return anchor_value, results
@@ -7,45 +7,158 @@ from typing import Any
 
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from core.config import settings
+from core.metrics import registry
+from db.query_stats import QueryStatsTable, fingerprint, redact_parameters
 
 logger = logging.getLogger("carcare.db")
 
-_request_meta: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar("request_meta", default=None)
-_query_stats: contextvars.ContextVar[dict[str, float | int] | None] = contextvars.ContextVar("query_stats", default=None)
+# 요청 단위 통계. 미들웨어가 만든 dict 를 스레드풀/greenlet 에서도 같은 객체로 공유하며 갱신
+_query_stats: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar("query_stats", default=None)
 
+# 마지막으로 측정한 DB 왕복 시간 (ms). 측정 전에는 None
+last_db_rtt_ms: float | None = None
 
-def begin_request(path: str) -> None:
-    if not settings.DB_TIMING_LOG_ENABLED:
-        return
-    _request_meta.set({"path": path, "started_at": time.perf_counter()})
-    _query_stats.set({"count": 0, "db_ms": 0.0})
+# 풀 게이지를 노출할 엔진 (이름 -> Engine)
+_engines: dict[str, Engine] = {}
+
+# 지문별 누적 실행 횟수/시간 (GET /debug/queries)
+query_stats = QueryStatsTable(settings.DB_QUERY_STATS_MAX_FINGERPRINTS)
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route")
+)
+HTTP_REQUESTS = registry.counter("http_requests_total", "Requests by route and status.", ("method", "route", "status"))
+HTTP_ERRORS = registry.counter("http_request_errors_total", "4xx/5xx responses by status.", ("route", "status"))
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_time_per_request_seconds", "Total time spent in DB cursor execution per request.", ("route",)
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request",
+    "Number of statements executed per request.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_N_PLUS_ONE = registry.counter(
+    "db_n_plus_one_total", "Requests that repeated one statement fingerprint above the threshold.", ("route",)
+)
+DB_SLOW_QUERIES = registry.counter("db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_MS.")
+
+
+def _pool_values(read) -> dict[tuple[str, ...], float]:
+    return {(name,): float(read(engine.pool)) for name, engine in _engines.items()}
+
+
+registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out.", ("pool",),
+    collect=lambda: _pool_values(lambda pool: pool.checkedout()),
+)
+registry.gauge(
+    "db_pool_overflow", "Connections open beyond pool_size (negative while the pool is not full).", ("pool",),
+    collect=lambda: _pool_values(lambda pool: pool.overflow()),
+)
+registry.gauge(
+    "db_pool_size", "Configured pool_size.", ("pool",),
+    collect=lambda: _pool_values(lambda pool: pool.size()),
+)
+registry.gauge(
+    "db_rtt_seconds", "Last measured SELECT 1 round trip.",
+    collect=lambda: {} if last_db_rtt_ms is None else {(): last_db_rtt_ms / 1000},
+)
+
+
+class _TimedCheckout:
+    """풀에서 커넥션을 얻기까지 기다린 시간을 기록 (빈 커넥션이 없을 때의 대기 + 새 연결 수립 포함)."""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started_at, pool=self.metrics_name)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_name = "sync"
 
 
-def end_request(status_code: int) -> None:
-    if not settings.DB_TIMING_LOG_ENABLED:
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def begin_request(method: str, path: str) -> dict[str, Any]:
+    stats: dict[str, Any] = {
+        "method": method,
+        "path": path,
+        "started_at": time.perf_counter(),
+        "count": 0,
+        "db_ms": 0.0,
+        "fingerprints": {},
+    }
+    _query_stats.set(stats)
+    return stats
+
+
+def server_timing(stats: dict[str, Any]) -> str:
+    """Server-Timing 헤더 값 (app: 응답 시작까지 걸린 시간, db: 쿼리 실행 합계, q: 쿼리 수)."""
+    app_ms = (time.perf_counter() - stats["started_at"]) * 1000
+    return f"app;dur={app_ms:.1f}, db;dur={float(stats['db_ms']):.1f}, q;desc={int(stats['count'])}"
+
+
+def _report_repeated_statements(route: str, path: str, fingerprints: dict[str, int]) -> None:
+    threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    if threshold <= 0:
         return
-    meta = _request_meta.get()
-    stats = _query_stats.get()
-    if not meta or not stats:
+    repeated = [(count, key) for key, count in fingerprints.items() if count > threshold]
+    if not repeated:
         return
-    total_ms = (time.perf_counter() - meta["started_at"]) * 1000
-    logger.info(
-        "request_timing path=%s status=%s total_ms=%.1f db_ms=%.1f query_count=%s",
-        meta["path"],
-        status_code,
-        total_ms,
-        stats["db_ms"],
-        stats["count"],
-    )
-    _request_meta.set(None)
+    DB_N_PLUS_ONE.inc(route=route)
+    for count, key in sorted(repeated, reverse=True):
+        logger.warning("n_plus_one route=%s path=%s count=%s fingerprint=%s", route, path, count, key)
+
+
+def end_request(stats: dict[str, Any], status_code: int, route: str | None) -> None:
+    """요청 메트릭을 집계하고, DB_TIMING_LOG_ENABLED 이면 request_timing 로그도 남김."""
+    elapsed = time.perf_counter() - stats["started_at"]
+    # 라벨 개수가 무한히 늘지 않도록 실제 경로 대신 라우트 템플릿만 사용
+    route_label = route or "<unmatched>"
+    status = str(status_code)
+    HTTP_REQUEST_DURATION.observe(elapsed, method=stats["method"], route=route_label)
+    HTTP_REQUESTS.inc(method=stats["method"], route=route_label, status=status)
+    if status_code >= 400:
+        HTTP_ERRORS.inc(route=route_label, status=status)
+    DB_TIME_PER_REQUEST.observe(float(stats["db_ms"]) / 1000, route=route_label)
+    DB_QUERIES_PER_REQUEST.observe(int(stats["count"]), route=route_label)
+    _report_repeated_statements(route_label, stats["path"], stats["fingerprints"])
+
+    if settings.DB_TIMING_LOG_ENABLED:
+        logger.info(
+            "request_timing path=%s status=%s total_ms=%.1f db_ms=%.1f query_count=%s",
+            stats["path"],
+            status_code,
+            elapsed * 1000,
+            stats["db_ms"],
+            stats["count"],
+        )
     _query_stats.set(None)
 
 
-def setup_db_timing_logging(engine: Engine) -> None:
-    if not settings.DB_TIMING_LOG_ENABLED:
-        return
+def setup_db_timing_logging(engine: Engine, name: str = "sync") -> None:
+    """
+    엔진의 커서 실행 시간을 요청별 통계와 지문별 집계에 합산 (메트릭 집계를 위해 항상 활성화).
+    - 요청 밖(스케줄러/CLI) 쿼리도 지문 집계와 느린 쿼리 로그에는 포함
+    """
+    _engines[name] = engine
 
     @event.listens_for(engine, "before_cursor_execute")
     def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
@@ -57,9 +170,37 @@ def setup_db_timing_logging(engine: Engine) -> None:
         started_at = started_stack.pop() if started_stack else None
         if started_at is None:
             return
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        key = fingerprint(statement)
+        query_stats.record(key, elapsed_ms)
+        if 0 < settings.DB_SLOW_QUERY_MS <= elapsed_ms:
+            DB_SLOW_QUERIES.inc()
+            logger.warning(
+                "slow_query ms=%.1f fingerprint=%s params=%s",
+                elapsed_ms,
+                key,
+                redact_parameters(parameters),
+            )
         stats = _query_stats.get()
         if not stats:
             return
         stats["count"] = int(stats["count"]) + 1
-        stats["db_ms"] = float(stats["db_ms"]) + ((time.perf_counter() - started_at) * 1000)
-        _query_stats.set(stats)
+        stats["db_ms"] = float(stats["db_ms"]) + elapsed_ms
+        fingerprints = stats["fingerprints"]
+        fingerprints[key] = fingerprints.get(key, 0) + 1
+
+
+def measure_db_rtt(engine: Engine, samples: int = 3) -> float:
+    """
+    SELECT 1 왕복 시간을 samples 번 재서 최솟값(ms)을 반환.
+    - 첫 연결 수립 비용이 섞이지 않도록 같은 커넥션에서 반복 측정
+    """
+    global last_db_rtt_ms
+    timings: list[float] = []
+    with engine.connect() as conn:
+        for _ in range(max(1, samples)):
+            started_at = time.perf_counter()
+            conn.exec_driver_sql("SELECT 1")
+            timings.append((time.perf_counter() - started_at) * 1000)
+    last_db_rtt_ms = min(timings)
+    return last_db_rtt_ms
@@ -0,0 +1,377 @@
+"""
+버전 기반 스키마 마이그레이션.
+- create_all 은 없는 테이블만 만들기 때문에 기존 DB 에 필요한 인덱스/컬럼 변경은 여기에 버전으로 추가
+- 적용된 버전은 schema_migrations 테이블에 기록되어 한 번만 실행됨
+- online=True 인 마이그레이션은 트랜잭션 밖(AUTOCOMMIT)에서 문장 단위로 실행 (CREATE INDEX CONCURRENTLY)
+- 테이블을 다시 쓰는(ACCESS EXCLUSIVE) 변경은 online=False 로 한 트랜잭션에서 실행하고, 인덱스도 CONCURRENTLY 없이 만듦
+- 실행: python -m db.migrations [--status]
+"""
+from __future__ import annotations
+
+import argparse
+from typing import NamedTuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# 여러 인스턴스가 동시에 마이그레이션을 돌리지 않도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 73510002
+
+
+class ConcurrentIndex(NamedTuple):
+    name: str
+    table: str
+    columns: str
+    include: str = ""
+    where: str = ""
+    unique: bool = False
+    using: str = ""
+
+    def sql(self, concurrently: bool = True) -> str:
+        unique = "UNIQUE " if self.unique else ""
+        using = f" USING {self.using}" if self.using else ""
+        include = f" INCLUDE ({self.include})" if self.include else ""
+        where = f" WHERE {self.where}" if self.where else ""
+        mode = " CONCURRENTLY" if concurrently else ""
+        return (
+            f'CREATE {unique}INDEX{mode} IF NOT EXISTS "{self.name}" '
+            f'ON "{self.table}"{using} ({self.columns}){include}{where}'
+        )
+
+
+Operation = Union[str, ConcurrentIndex]
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    operations: tuple[Operation, ...]
+    online: bool = False
+
+
+# (테이블, 컬럼, 부모 테이블). 제약 이름은 create_all 기본 이름 (<table>_<column>_fkey)
+CASCADE_FOREIGN_KEYS = (
+    ("fuel_records", "vehicle_id", "vehicles"),
+    ("charging_records", "vehicle_id", "vehicles"),
+    ("expenses", "vehicle_id", "vehicles"),
+    ("maintenance_records", "vehicle_id", "vehicles"),
+    ("notifications", "vehicle_id", "vehicles"),
+    ("consumables", "vehicle_id", "vehicles"),
+    ("consumable_items", "vehicle_id", "vehicles"),
+    ("vehicle_tires", "vehicle_id", "vehicles"),
+    ("tire_measurements", "vehicle_id", "vehicles"),
+    ("tire_measurements", "tire_id", "vehicle_tires"),
+    ("tire_service_records", "vehicle_id", "vehicles"),
+    ("tire_service_records", "tire_id", "vehicle_tires"),
+)
+
+
+def _cascade_foreign_key(table: str, column: str, parent: str) -> tuple[str, str]:
+    """
+    FK 를 ON DELETE CASCADE 로 교체.
+    - NOT VALID 로 추가하면 기존 행 검사 없이 짧은 잠금만 걸림
+    - VALIDATE 는 쓰기를 막지 않는 잠금(SHARE UPDATE EXCLUSIVE)으로 기존 행을 검사
+    """
+    name = f"{table}_{column}_fkey"
+    return (
+        f'ALTER TABLE "{table}" DROP CONSTRAINT IF EXISTS "{name}", '
+        f'ADD CONSTRAINT "{name}" FOREIGN KEY ({column}) REFERENCES "{parent}" (id) ON DELETE CASCADE NOT VALID',
+        f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"',
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        version=1,
+        description="per-vehicle time-series composite indexes",
+        online=True,
+        operations=(
+            ConcurrentIndex("ix_vehicle_odometer_logs_vehicle_date_id", "vehicle_odometer_logs", "vehicle_id, date, id", include="odo_km"),
+            ConcurrentIndex("ix_fuel_records_vehicle_date_id", "fuel_records", "vehicle_id, date, id"),
+            ConcurrentIndex("ix_fuel_records_vehicle_odo", "fuel_records", "vehicle_id, odo_km"),
+            ConcurrentIndex("ix_charging_records_vehicle_odo_date_id", "charging_records", "vehicle_id, odo_km, date, id"),
+            ConcurrentIndex("ix_charging_records_vehicle_date_id", "charging_records", "vehicle_id, date, id"),
+            ConcurrentIndex("ix_tire_measurements_tire_measured_at", "tire_measurements", "tire_id, measured_at, id"),
+            ConcurrentIndex("ix_tire_service_records_tire_performed_at", "tire_service_records", "tire_id, performed_at, id"),
+            ConcurrentIndex("ix_tire_service_records_vehicle_performed_at", "tire_service_records", "vehicle_id, performed_at"),
+            ConcurrentIndex("ix_consumables_user_vehicle_category_kind", "consumables", "user_id, vehicle_id, category, kind"),
+            ConcurrentIndex("ix_consumable_items_user_vehicle_category_kind", "consumable_items", "user_id, vehicle_id, category, kind"),
+            ConcurrentIndex("ix_maintenance_records_vehicle_service_date", "maintenance_records", "vehicle_id, service_date, created_at"),
+            ConcurrentIndex("ix_expenses_vehicle_date", "expenses", "vehicle_id, date"),
+        ),
+    ),
+    Migration(
+        version=2,
+        description="consumables per-kind usage index (replaces category/kind prefix index)",
+        online=True,
+        operations=(
+            ConcurrentIndex(
+                "ix_consumables_user_vehicle_category_kind_date",
+                "consumables",
+                "user_id, vehicle_id, category, kind, date",
+            ),
+            'DROP INDEX CONCURRENTLY IF EXISTS "ix_consumables_user_vehicle_category_kind"',
+        ),
+    ),
+    Migration(
+        version=3,
+        description="unique consumable_items (user, vehicle, category, kind) for set-based default seeding",
+        online=True,
+        operations=(
+            # 중복 항목은 사용자가 마지막으로 수정한 행(updated_at, 같으면 id 가 큰 쪽)만 남김
+            # (주기/메모 등 PUT /items/{id} 로 바꾼 설정이 가장 최근 값으로 유지되도록)
+            "DELETE FROM consumable_items a USING consumable_items b "
+            "WHERE a.user_id = b.user_id AND a.vehicle_id = b.vehicle_id "
+            "AND a.category = b.category AND a.kind = b.kind "
+            "AND (coalesce(b.updated_at, b.created_at, '-infinity'), b.id) "
+            "> (coalesce(a.updated_at, a.created_at, '-infinity'), a.id)",
+            ConcurrentIndex(
+                "uq_consumable_items_user_vehicle_category_kind",
+                "consumable_items",
+                "user_id, vehicle_id, category, kind",
+                unique=True,
+            ),
+            'DROP INDEX CONCURRENTLY IF EXISTS "ix_consumable_items_user_vehicle_category_kind"',
+        ),
+    ),
+    Migration(
+        version=4,
+        description="per-item consumable due rows in notifications",
+        online=True,
+        operations=(
+            "ALTER TABLE notifications ADD COLUMN IF NOT EXISTS item_id INTEGER "
+            "REFERENCES consumable_items (id) ON DELETE CASCADE",
+            "ALTER TABLE notifications ADD COLUMN IF NOT EXISTS status VARCHAR(16)",
+            ConcurrentIndex("notifications_item_id_key", "notifications", "item_id", unique=True),
+        ),
+    ),
+    Migration(
+        version=5,
+        description="vehicle odometer summary and monthly tables",
+        operations=(
+            "CREATE TABLE IF NOT EXISTS vehicle_odometer_summary ("
+            " vehicle_id INTEGER PRIMARY KEY REFERENCES vehicles (id) ON DELETE CASCADE,"
+            " first_date DATE, first_km INTEGER, last_date DATE, last_km INTEGER,"
+            " log_count INTEGER NOT NULL DEFAULT 0,"
+            " updated_at TIMESTAMP DEFAULT now())",
+            "CREATE TABLE IF NOT EXISTS vehicle_odometer_monthly ("
+            " vehicle_id INTEGER NOT NULL REFERENCES vehicles (id) ON DELETE CASCADE,"
+            " month DATE NOT NULL,"
+            " first_date DATE NOT NULL, first_km INTEGER NOT NULL,"
+            " last_date DATE NOT NULL, last_km INTEGER NOT NULL,"
+            " max_km INTEGER NOT NULL, log_count INTEGER NOT NULL,"
+            " PRIMARY KEY (vehicle_id, month))",
+            # 기존 로그로 초기 채움 (이후 어긋나면 python -m jobs.rebuild_odometer_summary)
+            "INSERT INTO vehicle_odometer_monthly "
+            "SELECT vehicle_id, date_trunc('month', date)::date, min(date),"
+            " (array_agg(odo_km ORDER BY date, id))[1], max(date),"
+            " (array_agg(odo_km ORDER BY date DESC, id DESC))[1], max(odo_km), count(*) "
+            "FROM vehicle_odometer_logs GROUP BY 1, 2 "
+            "ON CONFLICT DO NOTHING",
+            "INSERT INTO vehicle_odometer_summary (vehicle_id, first_date, first_km, last_date, last_km, log_count) "
+            "SELECT DISTINCT ON (vehicle_id) vehicle_id,"
+            " first_value(first_date) OVER w, first_value(first_km) OVER w,"
+            " last_date, last_km, sum(log_count) OVER (PARTITION BY vehicle_id) "
+            "FROM vehicle_odometer_monthly "
+            "WINDOW w AS (PARTITION BY vehicle_id ORDER BY month) "
+            "ORDER BY vehicle_id, month DESC "
+            "ON CONFLICT DO NOTHING",
+        ),
+    ),
+    Migration(
+        version=6,
+        description="(vehicle, date, id) indexes for keyset-paginated lists",
+        online=True,
+        operations=(
+            ConcurrentIndex("ix_consumables_vehicle_date_id", "consumables", "vehicle_id, date, id"),
+            ConcurrentIndex("ix_maintenance_records_vehicle_service_date_id", "maintenance_records", "vehicle_id, service_date, id"),
+            ConcurrentIndex("ix_expenses_vehicle_date_id", "expenses", "vehicle_id, date, id"),
+            'DROP INDEX CONCURRENTLY IF EXISTS "ix_maintenance_records_vehicle_service_date"',
+            'DROP INDEX CONCURRENTLY IF EXISTS "ix_expenses_vehicle_date"',
+        ),
+    ),
+    Migration(
+        version=7,
+        description="maintenance_records full-text (tsvector) and trigram search columns and indexes",
+        operations=(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            # STORED 생성 컬럼 추가는 ACCESS EXCLUSIVE 잠금으로 테이블을 다시 쓰므로 온라인이 아님
+            # → 점검 시간에 한 트랜잭션으로 적용 (실패하면 통째로 롤백, 인덱스는 같은 트랜잭션에서 일반 CREATE INDEX)
+            "ALTER TABLE maintenance_records ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS "
+            "(coalesce(title, '') || ' ' || coalesce(shop_name, '') || ' ' || coalesce(notes, '')) STORED",
+            "ALTER TABLE maintenance_records ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS "
+            "(to_tsvector('simple'::regconfig, coalesce(title, '') || ' ' || coalesce(shop_name, '') || ' ' || coalesce(notes, ''))) STORED",
+            ConcurrentIndex("ix_maintenance_records_search_vector", "maintenance_records", "search_vector", using="gin"),
+            ConcurrentIndex(
+                "ix_maintenance_records_search_text_trgm",
+                "maintenance_records",
+                "search_text gin_trgm_ops",
+                using="gin",
+            ),
+        ),
+    ),
+    Migration(
+        version=8,
+        description="ON DELETE CASCADE on vehicle child foreign keys (single-statement vehicle deletion)",
+        online=True,
+        operations=(
+            # 부모 행 삭제 시 자식 테이블을 FK 컬럼으로 찾으므로 인덱스가 없던 FK 컬럼에 먼저 인덱스 생성
+            ConcurrentIndex("ix_consumable_items_vehicle_id", "consumable_items", "vehicle_id"),
+            ConcurrentIndex("ix_legal_info_vehicle_id", "legal_info", "vehicle_id"),
+            ConcurrentIndex("ix_legal_notifications_vehicle_id", "legal_notifications", "vehicle_id"),
+            ConcurrentIndex("ix_legal_notifications_legal_id", "legal_notifications", "legal_id"),
+            *(
+                step
+                for table, column, parent in CASCADE_FOREIGN_KEYS
+                for step in _cascade_foreign_key(table, column, parent)
+            ),
+        ),
+    ),
+    Migration(
+        version=9,
+        description="users.disabled_at and jobs table for background account deletion",
+        online=True,
+        operations=(
+            # NULL 기본값 컬럼 추가는 메타데이터만 바뀌므로 테이블을 다시 쓰지 않음
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS disabled_at TIMESTAMP",
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id UUID PRIMARY KEY,"
+            " kind VARCHAR(32) NOT NULL,"
+            " status VARCHAR(16) NOT NULL DEFAULT 'queued',"
+            " payload JSONB NOT NULL DEFAULT '{}',"
+            " progress JSONB NOT NULL DEFAULT '{}',"
+            " dedupe_key VARCHAR(64),"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " last_error TEXT,"
+            " run_after TIMESTAMPTZ NOT NULL DEFAULT now(),"
+            " heartbeat_at TIMESTAMPTZ,"
+            " created_at TIMESTAMPTZ NOT NULL DEFAULT now(),"
+            " started_at TIMESTAMPTZ,"
+            " finished_at TIMESTAMPTZ)",
+            ConcurrentIndex("ix_jobs_status_run_after", "jobs", "status, run_after"),
+            ConcurrentIndex(
+                "uq_jobs_active_dedupe_key",
+                "jobs",
+                "dedupe_key",
+                where="status IN ('queued', 'running')",
+                unique=True,
+            ),
+        ),
+    ),
+    Migration(
+        version=10,
+        description="users.last_active_at and stale guest index for guest account GC",
+        online=True,
+        operations=(
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_at TIMESTAMP",
+            ConcurrentIndex(
+                "ix_users_guest_last_active",
+                "users",
+                "(coalesce(last_active_at, created_at)), id",
+                where="username LIKE 'guest\\_%'",
+            ),
+        ),
+    ),
+]
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " description VARCHAR(255) NOT NULL,"
+            " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    _ensure_version_table(conn)
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+        {"version": migration.version, "description": migration.description},
+    )
+
+
+def _drop_invalid_index(conn: Connection, name: str) -> None:
+    # CONCURRENTLY 빌드가 중간에 실패하면 INVALID 인덱스가 남고, IF NOT EXISTS 때문에 재시도가 건너뛰어짐
+    invalid = conn.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        print(f"[MIGRATE] dropping invalid index {name}")
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def _apply_online(conn: Connection, migration: Migration) -> None:
+    for operation in migration.operations:
+        if isinstance(operation, ConcurrentIndex):
+            _drop_invalid_index(conn, operation.name)
+            conn.execute(text(operation.sql()))
+        else:
+            conn.execute(text(operation))
+    _record(conn, migration)
+
+
+def _apply_transactional(engine: Engine, migration: Migration) -> None:
+    with engine.begin() as tx:
+        for operation in migration.operations:
+            # 트랜잭션 안에서는 CONCURRENTLY 를 쓸 수 없음
+            tx.execute(text(operation.sql(concurrently=False) if isinstance(operation, ConcurrentIndex) else operation))
+        _record(tx, migration)
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    applied: list[int] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            done = applied_versions(conn)
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in done:
+                    continue
+                print(f"[MIGRATE] {migration.version:04d} {migration.description}")
+                if migration.online:
+                    _apply_online(conn, migration)
+                else:
+                    _apply_transactional(engine, migration)
+                applied.append(migration.version)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    return applied
+
+
+def print_status(engine: Engine) -> None:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+        conn.commit()
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        mark = "APPLIED" if migration.version in done else "PENDING"
+        print(f"[{mark}] {migration.version:04d} {migration.description}")
+
+
+def main():
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="Only list applied/pending versions")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status(engine)
+        return
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s).")
+
+
+if __name__ == "__main__":
+    main()
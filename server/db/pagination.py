@@ -0,0 +1,68 @@
+"""
+(날짜, id) 키셋 페이지네이션.
+- 정렬은 항상 (날짜 DESC, id DESC) 이므로 (vehicle_id|tire_id, 날짜, id) 인덱스를 역방향으로 읽다가 limit 에서 멈춤
+- 커서는 마지막 행의 (날짜, id) 를 base64url(JSON) 로 감싼 불투명 문자열. 클라이언트는 그대로 돌려주기만 하면 됨
+- 다음 페이지 커서는 응답 헤더 X-Next-Cursor 로 전달 (본문 형식은 기존 목록 그대로 유지)
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(sort_value: date | datetime | None, row_id: int) -> str:
+    payload = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, column: InstrumentedAttribute) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if sort_value is not None:
+            parse = datetime.fromisoformat if column.type.python_type is datetime else date.fromisoformat
+            sort_value = parse(sort_value)
+        return sort_value, int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(column: InstrumentedAttribute, id_column: InstrumentedAttribute, cursor: Optional[str]) -> tuple[list, list]:
+    """(커서 이후 조건 목록, 정렬 목록). 날짜가 NULL 인 행은 DESC 기본 정렬(NULLS FIRST)대로 맨 앞에 옴."""
+    order_by = [column.desc(), id_column.desc()]
+    if not cursor:
+        return [], order_by
+    sort_value, row_id = decode_cursor(cursor, column)
+    if sort_value is None:
+        return [or_(and_(column.is_(None), id_column < row_id), column.isnot(None))], order_by
+    # (NULL, id) < (값, id) 는 NULL 이 되어 제외되므로 이미 지나간 NULL 날짜 행은 다시 나오지 않음
+    return [tuple_(column, id_column) < (sort_value, row_id)], order_by
+
+
+def page(rows: Sequence, limit: Optional[int], column_name: str) -> tuple[list, Optional[str]]:
+    """limit + 1 개를 읽은 결과에서 한 페이지와 다음 커서를 잘라냄. limit 이 None 이면 전체 (기존 동작)."""
+    rows = list(rows)
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, column_name), last.id)
+
+
+def fetch_limit(limit: Optional[int]) -> Optional[int]:
+    return None if limit is None else limit + 1
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,80 @@
+"""
+SQL 문장 지문(fingerprint)과 프로세스 내 상위 N 집계 테이블.
+- 리터럴/바인드 파라미터를 ? 로 바꾸고 IN (...) 목록을 접어서 같은 모양의 쿼리를 하나로 묶음
+- 테이블 크기는 max_entries 로 제한하고, 넘치면 누적 시간이 가장 작은 지문부터 제거
+"""
+from __future__ import annotations
+
+import re
+import threading
+from functools import lru_cache
+from typing import Any
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\([^)]+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    normalized = _STRING.sub("?", statement)
+    normalized = _PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return _IN_LIST.sub("(?+)", normalized)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """값은 숨기고 이름과 타입만 남김 (느린 쿼리 로그용)."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} rows>"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryStatsTable:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, elapsed_ms: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    coldest = min(self._entries, key=lambda item: self._entries[item][1])
+                    del self._entries[coldest]
+                entry = self._entries[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += elapsed_ms
+            entry[2] = max(entry[2], elapsed_ms)
+
+    def top(self, by: str = "total", limit: int = 20) -> list[dict[str, Any]]:
+        index = {"count": 0, "total": 1, "max": 2}[by]
+        with self._lock:
+            items = sorted(self._entries.items(), key=lambda item: item[1][index], reverse=True)[:limit]
+        return [
+            {
+                "fingerprint": key,
+                "count": int(count),
+                "total_ms": round(total_ms, 1),
+                "mean_ms": round(total_ms / count, 2) if count else 0.0,
+                "max_ms": round(max_ms, 1),
+            }
+            for key, (count, total_ms, max_ms) in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
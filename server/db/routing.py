@@ -0,0 +1,63 @@
+"""
+DB 를 사용하는 라우터용 APIRoute.
+
+DB_ASYNC_ENABLED=false (기본): 일반 APIRoute 와 동일 (sync def → 스레드풀 + psycopg2).
+DB_ASYNC_ENABLED=true: 엔드포인트와 동기 의존성을 이벤트 루프 위의 greenlet 에서 실행.
+- get_db 대신 asyncpg 엔진의 AsyncSession.sync_session 을 주입
+- 쿼리 대기 중에는 greenlet 이 이벤트 루프에 제어를 돌려주므로 요청마다 스레드를 점유하지 않음
+- AsyncSession.run_sync 와 같은 방식이라 기존 db.query(...) 코드를 그대로 재사용
+- 응답 모델 검증도 greenlet 안에서 수행 (지연 로딩 속성 접근이 루프 밖에서 일어나지 않도록)
+
+bcrypt 처럼 CPU 를 오래 쓰는 엔드포인트는 이벤트 루프를 막으므로 이 라우트를 쓰지 않는다.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import is_async_gen_callable, is_coroutine_callable, is_gen_callable
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+from sqlalchemy.util import greenlet_spawn
+
+from core.config import settings
+from db.session import get_async_db, get_db
+
+
+def _run_in_greenlet(call: Callable[..., Any]) -> Callable[..., Any]:
+    async def call_in_greenlet(**kwargs: Any) -> Any:
+        return await greenlet_spawn(call, **kwargs)
+
+    return call_in_greenlet
+
+
+def _bridge_dependencies(dependant: Dependant) -> None:
+    for sub_dependant in dependant.dependencies:
+        _bridge_dependencies(sub_dependant)
+        call = sub_dependant.call
+        if call is get_db:
+            sub_dependant.call = get_async_db
+        elif call is not None and not (
+            is_coroutine_callable(call) or is_gen_callable(call) or is_async_gen_callable(call)
+        ):
+            sub_dependant.call = _run_in_greenlet(call)
+        # cache_key 는 원래 call 기준으로 유지되므로 get_db 는 요청당 한 세션만 생성됨
+
+
+class DbRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        if settings.DB_ASYNC_ENABLED and not getattr(self.dependant, "greenlet_bridged", False):
+            endpoint = self.dependant.call
+            if not is_coroutine_callable(endpoint):
+                _bridge_dependencies(self.dependant)
+                self.dependant.call = _run_in_greenlet(self._call_and_validate)
+                self.dependant.greenlet_bridged = True
+        return super().get_route_handler()
+
+    def _call_and_validate(self, **kwargs: Any) -> Any:
+        result = self.endpoint(**kwargs)
+        if self.response_field is None or isinstance(result, Response):
+            return result
+        value, errors = self.response_field.validate(result, {}, loc=("response",))
+        # 검증 오류는 FastAPI 가 원래 결과로 다시 검증하면서 ResponseValidationError 로 처리
+        return result if errors else value
@@ -1,21 +1,67 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import settings
+from db.instrumentation import TimedAsyncQueuePool, TimedQueuePool
 
-engine = create_engine(
-    settings.DATABASE_URL,
+ENGINE_OPTIONS = dict(
     pool_pre_ping=True,
     pool_recycle=1800,
     pool_use_lifo=True,
     pool_size=5,
     max_overflow=5,
 )
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **ENGINE_OPTIONS)
+# 커밋 후 객체를 만료시키지 않아 응답 직렬화 시 재조회(SELECT) 왕복이 생기지 않도록 함
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+# 의존성(예: core.auth 의 last_active_at 갱신)이 세션에 쓰기를 남겼을 때 session.info 에 설정.
+# 쓰기 엔드포인트는 자신의 commit 에 함께 반영하고, commit 하지 않는 조회 요청은 정상 종료 시 여기서 commit
+COMMIT_ON_CLOSE = "commit_on_close"
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
+        if db.info.get(COMMIT_ON_CLOSE) and db.in_transaction():
+            db.commit()
     finally:
         db.close()
+
+
+def async_database_url() -> str:
+    """
+    ASYNC_DATABASE_URL 이 비어 있으면 DATABASE_URL 에서 asyncpg 드라이버 URL 을 만든다.
+    - psycopg2 의 sslmode 쿼리 파라미터는 asyncpg 에서 ssl 로 이름이 다름
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(query=query).render_as_string(hide_password=False)
+
+
+# DB_ASYNC_ENABLED 일 때만 생성 (asyncpg 미설치 환경에서도 동기 모드는 그대로 동작)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(), poolclass=TimedAsyncQueuePool, **ENGINE_OPTIONS)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    비동기 모드용 get_db 대체 의존성.
+    - AsyncSession 의 sync_session 을 넘겨주므로 기존 db.query(...) 코드를 그대로 사용
+    - 반드시 db.routing.DbRoute 가 greenlet 안에서 실행하는 엔드포인트/의존성에서만 사용 가능
+    """
+    async with AsyncSessionLocal() as session:
+        yield session.sync_session
+        if session.info.get(COMMIT_ON_CLOSE) and session.in_transaction():
+            await session.commit()
@@ -1,12 +1,15 @@
 # server/init_db.py
+from db.migrations import run_migrations
 from db.session import Base, engine
 
 # models 패키지에서 모든 모델 import (필수!)
-from models import CarMaker, CarMakerAbroad, CarModel, CarModelAbroad, ChargingRecord, ConsumableItem, Expense, FuelRecord, MaintenanceRecord, Notification, User, Vehicle
+from models import CarMaker, CarMakerAbroad, CarModel, CarModelAbroad, ChargingRecord, ConsumableItem, Expense, FuelRecord, Job, MaintenanceRecord, Notification, Tire, User, Vehicle, VehicleOdometerLog, VehicleOdometerSummary, legalinfo
 def init():
     print("▶ Creating tables in database...")
     Base.metadata.create_all(bind=engine)
-    print("✅ Done.")
+    print("▶ Applying schema migrations...")
+    applied = run_migrations(engine)
+    print(f"✅ Done. ({len(applied)} migration(s) applied)")
 
 if __name__ == "__main__":
     init()
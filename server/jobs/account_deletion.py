@@ -0,0 +1,135 @@
+"""
+계정 삭제 작업 (jobs/queue.py 의 "account_deletion").
+- 요청 시에는 users.disabled_at 을 기록하고 작업만 넣으므로 HTTP 응답은 바로 반환되고, 그 즉시 로그인/인증이 막힘
+- 워커가 차량별 자식 테이블 → 차량 → 사용자 단위 나머지 → 사용자 순으로 ACCOUNT_DELETION_BATCH_SIZE 행씩 지움
+  (배치마다 별도 트랜잭션이라 긴 잠금/큰 WAL 없이 다른 요청과 섞여 진행됨)
+- 배치마다 진행 상황을 같은 트랜잭션에서 기록하므로 중간에 끊겨도 남은 행부터 다시 지우면 됨 (멱등)
+- 진행 상황: GET /account-deletion/status/{job_id}
+- 오래 사용하지 않은 비회원 계정 정리(jobs/guest_gc.py)도 같은 purge_user 로 삭제
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Any, Callable
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from core.auth import invalidate_principal
+from core.config import settings
+from jobs.queue import JobContext, enqueue, notify_worker, register
+from models.ChargingRecord import ChargingRecord
+from models.ConsumableItem import Consumable, ConsumableItem
+from models.Expense import Expense
+from models.FuelRecord import FuelRecord
+from models.MaintenanceRecord import MaintenanceRecord
+from models.Notification import Notification
+from models.Tire import TireMeasurement, TireServiceRecord, VehicleTire
+from models.User import User
+from models.Vehicle import Vehicle
+from models.VehicleOdometerLog import VehicleOdometerLog
+from models.legalinfo import LegalInfo, LegalNotification
+
+KIND = "account_deletion"
+
+Report = Callable[..., None]
+
+# 차량 하나에 딸린 행 (모두 vehicle_id 인덱스가 있음). 참조하는 쪽을 먼저 지워 CASCADE 로 한 배치가 커지지 않도록
+VEHICLE_TABLES = (
+    Notification,
+    LegalNotification,
+    LegalInfo,
+    TireMeasurement,
+    TireServiceRecord,
+    VehicleTire,
+    MaintenanceRecord,
+    Consumable,
+    ConsumableItem,
+    FuelRecord,
+    ChargingRecord,
+    Expense,
+    VehicleOdometerLog,
+)
+# users.id 를 직접 참조하는 행. 차량을 지운 뒤에는 보통 남지 않지만 사용자 삭제가 FK 에 막히지 않도록 확인
+USER_TABLES = (
+    Notification,
+    LegalNotification,
+    LegalInfo,
+    TireMeasurement,
+    TireServiceRecord,
+    VehicleTire,
+    MaintenanceRecord,
+    Consumable,
+    ConsumableItem,
+)
+
+
+def request_account_deletion(db: Session, user_id: int) -> uuid.UUID:
+    """계정을 바로 비활성화하고 삭제 작업을 넣음. 이미 진행 중인 요청이 있으면 그 작업 id 를 반환."""
+    db.execute(
+        update(User).where(User.id == user_id).values(disabled_at=func.coalesce(User.disabled_at, func.now()))
+    )
+    job_id = enqueue(db, KIND, {"user_id": user_id}, dedupe_key=f"{KIND}:{user_id}")
+    db.commit()
+    invalidate_principal(user_id)
+    notify_worker()
+    return job_id
+
+
+def _delete_batch(conn: Connection, model, criteria, batch_size: int) -> int:
+    batch = select(model.id).where(criteria).limit(batch_size).scalar_subquery()
+    return conn.execute(delete(model).where(model.id.in_(batch))).rowcount
+
+
+def _no_report(conn: Connection, **progress: Any) -> None:
+    pass
+
+
+def purge_user(engine: Engine, user_id: int, batch_size: int, report: Report = _no_report) -> int:
+    """
+    비활성화된 사용자의 데이터를 batch_size 행씩 별도 트랜잭션으로 지우고 사용자 행까지 삭제. 지운 행 수를 반환.
+    report(conn, **progress) 는 배치와 같은 트랜잭션 안에서 호출됨 (계정 삭제 작업의 진행 상황 기록).
+    """
+    with engine.connect() as conn:
+        disabled = conn.execute(select(User.disabled_at).where(User.id == user_id)).first()
+        vehicle_ids = list(conn.execute(select(Vehicle.id).where(Vehicle.user_id == user_id).order_by(Vehicle.id)).scalars())
+    if disabled is None:
+        return 0  # 이미 삭제됨 (재실행)
+    if disabled.disabled_at is None:
+        raise RuntimeError(f"user {user_id} is not disabled; refusing to purge")
+
+    total = 0
+
+    def purge(step: str, model, criteria) -> None:
+        nonlocal total
+        while True:
+            with engine.begin() as conn:
+                deleted = _delete_batch(conn, model, criteria, batch_size)
+                total += deleted
+                report(conn, step=step, deleted=total)
+            if deleted < batch_size:
+                return
+
+    with engine.begin() as conn:
+        report(conn, vehicles_total=len(vehicle_ids), vehicles_done=0, deleted=0)
+    for done, vehicle_id in enumerate(vehicle_ids, start=1):
+        for model in VEHICLE_TABLES:
+            purge(model.__tablename__, model, model.vehicle_id == vehicle_id)
+        with engine.begin() as conn:
+            total += conn.execute(delete(Vehicle).where(Vehicle.id == vehicle_id)).rowcount
+            report(conn, step="vehicles", vehicles_done=done, deleted=total)
+
+    for model in USER_TABLES:
+        purge(model.__tablename__, model, model.user_id == user_id)
+    with engine.begin() as conn:
+        # 그 사이 다른 경로로 차량이 생겼으면 FK 오류로 실패 → 재시도 때 다시 지움
+        total += conn.execute(delete(User).where(User.id == user_id, User.disabled_at.isnot(None))).rowcount
+        report(conn, step="done", deleted=total)
+    invalidate_principal(user_id)
+    return total
+
+
+@register(KIND)
+def purge_account(context: JobContext) -> None:
+    purge_user(context.engine, context.payload["user_id"], settings.ACCOUNT_DELETION_BATCH_SIZE, context.report)
@@ -0,0 +1,163 @@
+"""
+차량 삭제 벤치마크: 자식 테이블별 DELETE 13회(이전 방식) vs DELETE FROM vehicles 1회(ON DELETE CASCADE).
+- 한 트랜잭션 안에서 임시 사용자/차량과 N년치 기록을 만들고, 차량을 하나씩 지우며 시간을 잰 뒤 전부 ROLLBACK
+- 다른 차량 기록(--background)도 같이 만들어, 인덱스 없는 FK 컬럼 검색이 테이블 크기에 비례해 느려지는 것을 재현
+- cascade 방식은 마이그레이션 8 (ON DELETE CASCADE) 적용 후에만 측정 가능
+- 실행: python -m jobs.bench_vehicle_delete [--years 5] [--repeat 5] [--background 50]
+"""
+from __future__ import annotations
+
+import argparse
+import secrets
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# 이전 vehicles.delete_vehicle 의 삭제 순서
+LEGACY_DELETE_ORDER = (
+    "notifications",
+    "maintenance_records",
+    "consumables",
+    "consumable_items",
+    "tire_measurements",
+    "tire_service_records",
+    "vehicle_tires",
+    "legal_notifications",
+    "legal_info",
+    "fuel_records",
+    "charging_records",
+    "expenses",
+    "vehicle_odometer_logs",
+)
+
+# :vid, :uid, :days (= years * 365) 로 실행. 기록 간격은 실제 사용 패턴과 비슷하게 잡음
+SEED_STATEMENTS = (
+    "INSERT INTO vehicle_odometer_logs (vehicle_id, date, odo_km) "
+    "SELECT :vid, current_date - d, (:days - d) * 40 FROM generate_series(0, :days - 1) d",
+    "INSERT INTO fuel_records (vehicle_id, date, liters, price_total, odo_km, is_full) "
+    "SELECT :vid, current_date - d, 40, 70000, (:days - d) * 40, d % 14 = 0 FROM generate_series(0, :days - 1, 7) d",
+    "INSERT INTO charging_records (vehicle_id, date, energy_kwh, price_total, odo_km, charge_type) "
+    "SELECT :vid, current_date - d, 30, 9000, (:days - d) * 40, 'fast' FROM generate_series(0, :days - 1, 7) d",
+    "INSERT INTO maintenance_records (user_id, vehicle_id, service_date, title, service_type, cost, odometer_km) "
+    "SELECT :uid, :vid, current_date - d, '정기 점검', 'scheduled', 50000, (:days - d) * 40 "
+    "FROM generate_series(0, :days - 1, 30) d",
+    "INSERT INTO expenses (vehicle_id, date, type, amount) "
+    "SELECT :vid, current_date - d, 'parking', 3000 FROM generate_series(0, :days - 1, 15) d",
+    "INSERT INTO consumables (user_id, vehicle_id, category, kind, date, odo_km) "
+    "SELECT :uid, :vid, '오일', '엔진오일', current_date - d, (:days - d) * 40 FROM generate_series(0, :days - 1, 90) d",
+    "INSERT INTO consumable_items (user_id, vehicle_id, category, kind, mode, cycle_km) "
+    "SELECT :uid, :vid, '소모품', 'item' || i, 'distance', 10000 FROM generate_series(1, 8) i",
+    "INSERT INTO vehicle_tires (user_id, vehicle_id, position, pressure_unit) "
+    "SELECT :uid, :vid, p, 'kPa' FROM unnest(ARRAY['front_left', 'front_right', 'rear_left', 'rear_right']) p",
+    "INSERT INTO tire_measurements (user_id, vehicle_id, tire_id, measured_at, pressure_kpa) "
+    "SELECT :uid, :vid, t.id, now() - make_interval(days => d), 230 "
+    "FROM vehicle_tires t, generate_series(0, :days - 1, 30) d WHERE t.vehicle_id = :vid",
+    "INSERT INTO tire_service_records (user_id, vehicle_id, tire_id, service_type, performed_at) "
+    "SELECT :uid, :vid, t.id, 'rotation', current_date - d "
+    "FROM vehicle_tires t, generate_series(0, :days - 1, 180) d WHERE t.vehicle_id = :vid",
+    "INSERT INTO legal_info (user_id, vehicle_id, tax_year) "
+    "SELECT :uid, :vid, extract(year FROM current_date)::int - y FROM generate_series(0, :days / 365) y",
+    "INSERT INTO legal_notifications (legal_id, user_id, vehicle_id, type) "
+    "SELECT l.id, :uid, :vid, n FROM legal_info l, unnest(ARRAY['insurance', 'tax', 'inspection']) n "
+    "WHERE l.vehicle_id = :vid",
+    "INSERT INTO notifications (user_id, vehicle_id, type, enabled) "
+    "SELECT :uid, :vid, n, true FROM unnest(ARRAY['oil', 'filter', 'consumable', 'tire', 'legal']) n",
+)
+
+
+def seed_vehicle(conn: Connection, user_id: int, years: int) -> int:
+    vehicle_id = conn.execute(
+        text("INSERT INTO vehicles (user_id, plate_no) VALUES (:uid, :plate) RETURNING id"),
+        {"uid": user_id, "plate": f"BENCH-{secrets.token_hex(3)}"},
+    ).scalar_one()
+    params = {"vid": vehicle_id, "uid": user_id, "days": years * 365}
+    for statement in SEED_STATEMENTS:
+        conn.execute(text(statement), params)
+    return vehicle_id
+
+
+def delete_legacy(conn: Connection, vehicle_id: int) -> None:
+    for table in LEGACY_DELETE_ORDER:
+        conn.execute(text(f'DELETE FROM "{table}" WHERE vehicle_id = :id'), {"id": vehicle_id})
+    conn.execute(text("DELETE FROM vehicles WHERE id = :id"), {"id": vehicle_id})
+
+
+def delete_cascade(conn: Connection, vehicle_id: int) -> None:
+    conn.execute(text("DELETE FROM vehicles WHERE id = :id"), {"id": vehicle_id})
+
+
+def non_cascading_foreign_keys(conn: Connection) -> list[str]:
+    return list(
+        conn.execute(
+            text(
+                "SELECT conrelid::regclass::text FROM pg_constraint "
+                "WHERE contype = 'f' AND confrelid = 'vehicles'::regclass AND confdeltype <> 'c'"
+            )
+        ).scalars()
+    )
+
+
+def rows_per_vehicle(conn: Connection, vehicle_id: int) -> int:
+    return sum(
+        conn.execute(text(f'SELECT count(*) FROM "{table}" WHERE vehicle_id = :id'), {"id": vehicle_id}).scalar_one()
+        for table in LEGACY_DELETE_ORDER
+    )
+
+
+def run_benchmark(conn: Connection, years: int, repeat: int, background: int) -> dict[str, list[float]]:
+    """모든 변경은 호출 측 트랜잭션 안에서 일어나며 호출 측이 ROLLBACK 한다."""
+    modes = {"legacy": delete_legacy}
+    skipped = non_cascading_foreign_keys(conn)
+    if skipped:
+        print(f"cascade: skipped (FKs without ON DELETE CASCADE: {', '.join(sorted(set(skipped)))}; run migrations)")
+    else:
+        modes["cascade"] = delete_cascade
+
+    user_id = conn.execute(
+        text("INSERT INTO users (username, password_hash) VALUES (:name, '!bench!') RETURNING id"),
+        {"name": f"bench_{secrets.token_hex(5)}"},
+    ).scalar_one()
+    for _ in range(background):
+        seed_vehicle(conn, user_id, years)
+    targets = {mode: [seed_vehicle(conn, user_id, years) for _ in range(repeat)] for mode in modes}
+    print(f"seeded {background + repeat * len(modes)} vehicle(s), {rows_per_vehicle(conn, targets['legacy'][0])} child rows each")
+    for table in ("vehicles", *LEGACY_DELETE_ORDER):
+        conn.execute(text(f'ANALYZE "{table}"'))
+
+    timings: dict[str, list[float]] = {mode: [] for mode in modes}
+    # 캐시 상태 차이를 줄이기 위해 방식을 번갈아 실행
+    for round_index in range(repeat):
+        for mode, delete in modes.items():
+            started = time.perf_counter()
+            delete(conn, targets[mode][round_index])
+            timings[mode].append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Benchmark deleting a vehicle with years of history.")
+    parser.add_argument("--years", type=int, default=5, help="Years of history per vehicle")
+    parser.add_argument("--repeat", type=int, default=5, help="Vehicles deleted per mode")
+    parser.add_argument("--background", type=int, default=50, help="Other vehicles seeded so tables are not tiny")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            timings = run_benchmark(conn, args.years, args.repeat, args.background)
+        finally:
+            transaction.rollback()
+
+    for mode, values in timings.items():
+        print(
+            f"{mode:8s} median {statistics.median(values):8.1f} ms  "
+            f"min {min(values):8.1f} ms  max {max(values):8.1f} ms  ({len(values)} run(s))"
+        )
+
+
+if __name__ == "__main__":
+    main()
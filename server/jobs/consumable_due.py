@@ -0,0 +1,186 @@
+"""
+소모품 교체 예정(due) 계산 배치.
+- 전체 consumable_items 를 서버 사이드 커서로 chunk 단위 스트리밍하고, chunk 의 행마다 계산 (DB 왕복은 chunk 당 upsert 1번)
+- 결과는 notifications 의 항목별 행(item_id)에 due_date/due_odo/status 로 벌크 upsert (값이 바뀐 행만 갱신)
+- 판정 기준은 패널(OilPanel 등)의 화면 표시와 동일
+  - distance: 남은 거리 <= 0 이면 overdue, max(500km, 주기의 20%) 이내면 due
+  - time: 남은 개월 <= 0 이면 overdue, max(1개월, 주기의 20%) 이내면 due
+- 실행: python -m jobs.consumable_due [--chunk-size N]
+  또는 DUE_ENGINE_INTERVAL_MINUTES > 0 이면 앱 프로세스 안에서 주기적으로 실행
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import logging
+import threading
+import time
+from datetime import date
+from typing import Optional, Sequence
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+# 관계(relationship) 해석을 위해 모든 모델 import
+from models import CarMaker, CarMakerAbroad, CarModel, CarModelAbroad, ChargingRecord, Expense, FuelRecord, MaintenanceRecord, Tire, User, VehicleOdometerLog, VehicleOdometerSummary, legalinfo  # noqa: F401
+from models.ConsumableItem import ConsumableItem
+from models.Notification import Notification
+from models.Vehicle import Vehicle
+
+logger = logging.getLogger("carcare.jobs")
+
+# 여러 워커/인스턴스가 동시에 계산하지 않도록 잡는 advisory lock 키
+DUE_ENGINE_LOCK_KEY = 73510014
+
+# consumable_items.category → notifications.type (알림 설정 행과 같은 값)
+NOTIFICATION_TYPES = {"오일": "oil", "필터": "filter", "소모품": "consumable"}
+
+DISTANCE_WARN_MIN_KM = 500
+TIME_WARN_MIN_MONTHS = 1
+WARN_RATIO = 0.2
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(index, 12)
+    month += 1
+    return date(year, month, min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def compute_chunk(rows: Sequence, today: date) -> list[dict]:
+    """
+    (id, user_id, vehicle_id, category, mode, cycle_km, cycle_months, last_date, last_odo_km, vehicle_odo) 행마다
+    due 값과 status 를 계산. 계산할 수 없는 항목(주기/마지막 교체 정보 없음)은 due 값과 status 를 비움.
+    """
+    today_index = today.year * 12 + today.month
+    results = []
+    for item_id, user_id, vehicle_id, category, mode, cycle_km, cycle_months, last_date, last_odo, odo in rows:
+        due_date = due_odo = status = None
+        if (mode or "distance") == "time":
+            cycle = cycle_months or 0
+            if cycle > 0 and last_date is not None:
+                due_date = add_months(last_date, cycle)
+                remain = cycle - (today_index - (last_date.year * 12 + last_date.month))
+                status = "overdue" if remain <= 0 else "due" if remain <= max(TIME_WARN_MIN_MONTHS, cycle * WARN_RATIO) else "ok"
+        else:
+            cycle = cycle_km or 0
+            if cycle > 0 and last_odo is not None:
+                due_odo = last_odo + cycle
+                if odo is not None:
+                    remain = cycle - max(0, odo - last_odo)
+                    status = "overdue" if remain <= 0 else "due" if remain <= max(DISTANCE_WARN_MIN_KM, cycle * WARN_RATIO) else "ok"
+        results.append(
+            {
+                "item_id": item_id,
+                "user_id": user_id,
+                "vehicle_id": vehicle_id,
+                "type": NOTIFICATION_TYPES.get(category, "consumable"),
+                "due_date": due_date,
+                "due_odo": due_odo,
+                "status": status,
+            }
+        )
+    return results
+
+
+def _upsert_statement():
+    stmt = pg_insert(Notification)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[Notification.item_id],
+        set_={"due_date": excluded.due_date, "due_odo": excluded.due_odo, "status": excluded.status},
+        # 값이 그대로인 행은 다시 쓰지 않음 (불필요한 WAL/dead tuple 방지)
+        where=tuple_(Notification.due_date, Notification.due_odo, Notification.status).is_distinct_from(
+            tuple_(excluded.due_date, excluded.due_odo, excluded.status)
+        ),
+    )
+
+
+def run_due_engine(engine: Engine, chunk_size: int = 5000, today: Optional[date] = None) -> dict:
+    """
+    전체 항목을 한 번 계산. 읽기는 서버 사이드 커서 1개(한 스냅샷), 쓰기는 chunk 마다 별도 트랜잭션으로 커밋.
+    다른 프로세스가 이미 실행 중이면 건너뛰고 skipped=True 를 반환.
+    """
+    today = today or date.today()
+    source = (
+        select(
+            ConsumableItem.id,
+            ConsumableItem.user_id,
+            ConsumableItem.vehicle_id,
+            ConsumableItem.category,
+            ConsumableItem.mode,
+            ConsumableItem.cycle_km,
+            ConsumableItem.cycle_months,
+            ConsumableItem.last_date,
+            ConsumableItem.last_odo_km,
+            Vehicle.odo_km,
+        )
+        .join(Vehicle, Vehicle.id == ConsumableItem.vehicle_id)
+        .order_by(ConsumableItem.id)
+    )
+    upsert = _upsert_statement()
+    summary = {"skipped": False, "items": 0, "chunks": 0, "overdue": 0, "due": 0}
+    started = time.perf_counter()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": DUE_ENGINE_LOCK_KEY}).scalar():
+            summary["skipped"] = True
+            return summary
+        try:
+            with engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_size) as reader:
+                result = reader.execute(source)
+                for chunk in result.partitions(chunk_size):
+                    rows = compute_chunk(chunk, today)
+                    with engine.begin() as writer:
+                        writer.execute(upsert, rows)
+                    summary["items"] += len(rows)
+                    summary["chunks"] += 1
+                    for row in rows:
+                        if row["status"] in ("overdue", "due"):
+                            summary[row["status"]] += 1
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": DUE_ENGINE_LOCK_KEY})
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 2)
+    logger.info("due_engine %s", summary)
+    return summary
+
+
+def start_due_scheduler(engine: Engine, interval_minutes: float) -> threading.Thread:
+    """앱 프로세스 안에서 interval 마다 run_due_engine 을 실행하는 데몬 스레드 (advisory lock 으로 인스턴스 간 1회만 실행)."""
+
+    def loop():
+        while True:
+            try:
+                run_due_engine(engine, settings.DUE_ENGINE_CHUNK_SIZE)
+            except Exception:
+                logger.warning("due_engine_failed", exc_info=True)
+            time.sleep(interval_minutes * 60)
+
+    thread = threading.Thread(target=loop, name="consumable-due-engine", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Compute consumable due dates for every vehicle.")
+    parser.add_argument("--chunk-size", type=int, default=settings.DUE_ENGINE_CHUNK_SIZE, help="Items per fetch/upsert batch")
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="Evaluate as of this date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    summary = run_due_engine(engine, args.chunk_size, args.today)
+    if summary["skipped"]:
+        print("Another due-engine run holds the lock; skipped.")
+        return
+    print(
+        f"Processed {summary['items']} item(s) in {summary['chunks']} chunk(s): "
+        f"{summary['overdue']} overdue, {summary['due']} due ({summary['elapsed_s']}s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+오래 사용하지 않은 비회원 계정 정리 배치.
+- "가입 없이 시작" 할 때마다 guest_<hex> 계정이 생기고 다시 쓰지 않아도 계정과 차량/기록이 계속 남으므로 주기적으로 삭제
+- 대상: 마지막 활동(last_active_at, 없으면 created_at) 이 GUEST_GC_INACTIVE_DAYS 보다 오래된 비회원 계정
+- ix_users_guest_last_active 를 (마지막 활동, id) 키셋 순서로 읽어 GUEST_GC_BATCH_SIZE 개씩 한 문장으로 비활성화
+  (같은 UPDATE 에서 조건을 다시 확인하므로 그 사이 활동이 생긴 계정은 건너뜀), 이후 계정마다 purge_user 로 배치 삭제
+- 한 번 실행에서 최대 GUEST_GC_MAX_ACCOUNTS 개까지만 지우고, 삭제에 실패한 계정은 비활성 상태로 남아 다음 실행에서 다시 시도
+- 실행: python -m jobs.guest_gc [--inactive-days N] [--max-accounts N] [--dry-run]
+  또는 GUEST_GC_INTERVAL_MINUTES > 0 이면 앱 프로세스 안에서 주기적으로 실행
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.engine import Engine
+
+from core.auth import invalidate_principal
+from core.config import settings
+from core.metrics import registry
+from jobs.account_deletion import purge_user
+from models.User import GUEST_USERNAME_SQL, User
+
+logger = logging.getLogger("carcare.jobs")
+
+# 여러 워커/인스턴스가 동시에 정리하지 않도록 잡는 advisory lock 키
+GUEST_GC_LOCK_KEY = 73510025
+
+GUEST_GC_ACCOUNTS = registry.counter(
+    "guest_gc_accounts_total", "Stale guest accounts processed by the guest GC.", ("result",)
+)
+GUEST_GC_ROWS = registry.counter("guest_gc_rows_deleted_total", "Rows deleted by the guest GC (user, vehicles and records).")
+GUEST_GC_DURATION = registry.histogram(
+    "guest_gc_run_duration_seconds",
+    "Guest GC run duration.",
+    buckets=(1, 5, 15, 60, 300, 900, 3600),
+)
+GUEST_GC_LAST_RUN = registry.gauge("guest_gc_last_run_timestamp_seconds", "Unix time the last guest GC run finished.")
+
+LAST_ACTIVE = func.coalesce(User.last_active_at, User.created_at)
+
+
+def _stale_guests(cutoff: datetime, after: Optional[tuple[datetime, int]], limit: int):
+    """마지막 활동이 cutoff 이전인 비회원 (마지막 활동, id) 순. 다른 실행이 잡고 있는 행은 건너뜀."""
+    stmt = select(User.id).where(text(GUEST_USERNAME_SQL), LAST_ACTIVE < cutoff)
+    if after is not None:
+        stmt = stmt.where(tuple_(LAST_ACTIVE, User.id) > after)
+    return stmt.order_by(LAST_ACTIVE, User.id).limit(limit).with_for_update(skip_locked=True)
+
+
+def count_stale_guests(engine: Engine, cutoff: datetime) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            select(func.count()).select_from(User).where(text(GUEST_USERNAME_SQL), LAST_ACTIVE < cutoff)
+        ).scalar_one()
+
+
+def run_guest_gc(
+    engine: Engine,
+    inactive_days: int,
+    batch_size: int = 100,
+    max_accounts: int = 5000,
+) -> dict:
+    """
+    정리 한 번 실행. 다른 프로세스가 이미 실행 중이면 건너뛰고 skipped=True 를 반환.
+    계정 비활성화는 batch_size 개씩 한 트랜잭션, 데이터 삭제는 계정별 purge_user (ACCOUNT_DELETION_BATCH_SIZE 행씩).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=inactive_days)
+    summary = {"skipped": False, "accounts": 0, "failed": 0, "rows": 0}
+    started = time.perf_counter()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": GUEST_GC_LOCK_KEY}).scalar():
+            summary["skipped"] = True
+            return summary
+        try:
+            after: Optional[tuple[datetime, int]] = None
+            while summary["accounts"] + summary["failed"] < max_accounts:
+                limit = min(batch_size, max_accounts - summary["accounts"] - summary["failed"])
+                candidates = _stale_guests(cutoff, after, limit).scalar_subquery()
+                with engine.begin() as conn:
+                    rows = conn.execute(
+                        update(User)
+                        .where(User.id.in_(candidates))
+                        .values(disabled_at=func.coalesce(User.disabled_at, func.now()))
+                        .returning(LAST_ACTIVE, User.id)
+                    ).all()
+                if not rows:
+                    break
+                after = max(tuple(row) for row in rows)
+                for _, user_id in sorted(rows):
+                    invalidate_principal(user_id)
+                    try:
+                        deleted = purge_user(engine, user_id, settings.ACCOUNT_DELETION_BATCH_SIZE)
+                    except Exception:
+                        summary["failed"] += 1
+                        GUEST_GC_ACCOUNTS.inc(result="failed")
+                        logger.warning("guest_gc_purge_failed user_id=%s", user_id, exc_info=True)
+                        continue
+                    summary["accounts"] += 1
+                    summary["rows"] += deleted
+                    GUEST_GC_ACCOUNTS.inc(result="deleted")
+                    GUEST_GC_ROWS.inc(deleted)
+                if len(rows) < limit:
+                    break
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": GUEST_GC_LOCK_KEY})
+
+    elapsed = time.perf_counter() - started
+    GUEST_GC_DURATION.observe(elapsed)
+    GUEST_GC_LAST_RUN.set(time.time())
+    summary["elapsed_s"] = round(elapsed, 2)
+    logger.info("guest_gc cutoff=%s %s", cutoff.isoformat(timespec="seconds"), summary)
+    return summary
+
+
+def start_guest_gc_scheduler(engine: Engine, interval_minutes: float) -> threading.Thread:
+    """앱 프로세스 안에서 interval 마다 run_guest_gc 를 실행하는 데몬 스레드 (advisory lock 으로 인스턴스 간 1회만 실행)."""
+
+    def loop():
+        while True:
+            try:
+                run_guest_gc(
+                    engine,
+                    settings.GUEST_GC_INACTIVE_DAYS,
+                    settings.GUEST_GC_BATCH_SIZE,
+                    settings.GUEST_GC_MAX_ACCOUNTS,
+                )
+            except Exception:
+                logger.warning("guest_gc_failed", exc_info=True)
+            time.sleep(interval_minutes * 60)
+
+    thread = threading.Thread(target=loop, name="guest-gc", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Delete guest accounts with no recent activity.")
+    parser.add_argument("--inactive-days", type=int, default=settings.GUEST_GC_INACTIVE_DAYS, help="Delete guests idle longer than this")
+    parser.add_argument("--batch-size", type=int, default=settings.GUEST_GC_BATCH_SIZE, help="Accounts disabled per transaction")
+    parser.add_argument("--max-accounts", type=int, default=settings.GUEST_GC_MAX_ACCOUNTS, help="Stop after this many accounts")
+    parser.add_argument("--dry-run", action="store_true", help="Only count stale guest accounts")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        cutoff = datetime.utcnow() - timedelta(days=args.inactive_days)
+        print(f"{count_stale_guests(engine, cutoff)} guest account(s) idle since before {cutoff:%Y-%m-%d}.")
+        return
+
+    summary = run_guest_gc(engine, args.inactive_days, args.batch_size, args.max_accounts)
+    if summary["skipped"]:
+        print("Another guest GC run holds the lock; skipped.")
+        return
+    print(
+        f"Deleted {summary['accounts']} guest account(s) and {summary['rows']} row(s), "
+        f"{summary['failed']} failed ({summary['elapsed_s']}s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
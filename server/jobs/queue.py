@@ -0,0 +1,193 @@
+"""
+jobs 테이블 기반의 프로세스 내 작업 큐.
+- enqueue: 요청 트랜잭션 안에서 jobs 행을 추가 (커밋되면 재시작해도 남음)
+- 워커: 앱 프로세스의 데몬 스레드가 FOR UPDATE SKIP LOCKED 로 하나씩 가져가 처리하므로 워커/인스턴스가 여러 개여도 중복 실행 없음
+- 실행 중 heartbeat 가 JOB_STALE_SECONDS 이상 멈춘 작업(프로세스 종료 등)은 다른 워커가 다시 가져감
+  → 핸들러는 중간에 끊겨도 처음부터 다시 실행해도 되도록(멱등) 작성
+- 실패 시 attempts 에 따라 지연 후 재시도, JOB_MAX_ATTEMPTS 를 넘으면 failed
+- 실행: 앱 안에서 JOB_WORKER_ENABLED=true (기본) 또는 python -m jobs.queue [--once]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.Job import Job
+
+logger = logging.getLogger("carcare.jobs")
+
+ACTIVE_STATUSES = ("queued", "running")
+RETRY_BASE_SECONDS = 30
+
+
+class JobContext:
+    """핸들러에 넘기는 실행 정보. report() 는 진행 상황과 heartbeat 를 호출 측 트랜잭션 안에서 함께 기록."""
+
+    def __init__(self, engine: Engine, job_id: uuid.UUID, kind: str, payload: dict, progress: dict, attempts: int):
+        self.engine = engine
+        self.job_id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.progress = dict(progress or {})
+        self.attempts = attempts
+
+    def report(self, conn: Connection, **progress: Any) -> None:
+        self.progress.update(progress)
+        conn.execute(
+            update(Job).where(Job.id == self.job_id).values(progress=self.progress, heartbeat_at=func.now())
+        )
+
+
+Handler = Callable[[JobContext], None]
+HANDLERS: dict[str, Handler] = {}
+_wakeup = threading.Event()
+_stop = threading.Event()
+
+
+def register(kind: str) -> Callable[[Handler], Handler]:
+    def decorator(handler: Handler) -> Handler:
+        HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+def enqueue(db: Session, kind: str, payload: dict, dedupe_key: Optional[str] = None) -> uuid.UUID:
+    """
+    작업 추가 (커밋은 호출 측). 같은 dedupe_key 의 작업이 이미 대기/실행 중이면 그 작업 id 를 반환.
+    커밋 후 notify_worker() 를 부르면 같은 프로세스의 워커가 폴링을 기다리지 않고 바로 처리.
+    """
+    stmt = (
+        pg_insert(Job)
+        .values(id=uuid.uuid4(), kind=kind, payload=payload, progress={}, dedupe_key=dedupe_key)
+        .on_conflict_do_nothing(index_elements=[Job.dedupe_key], index_where=Job.status.in_(ACTIVE_STATUSES))
+        .returning(Job.id)
+    )
+    job_id = db.execute(stmt).scalar()
+    if job_id is None:
+        job_id = db.execute(
+            select(Job.id).where(Job.dedupe_key == dedupe_key, Job.status.in_(ACTIVE_STATUSES))
+        ).scalar_one()
+    return job_id
+
+
+def notify_worker() -> None:
+    _wakeup.set()
+
+
+def claim_next(engine: Engine) -> Optional[JobContext]:
+    """실행할 작업 하나를 running 으로 바꾸며 가져옴 (다른 워커가 잡고 있는 행은 건너뜀)."""
+    stale = literal_column(f"interval '{int(settings.JOB_STALE_SECONDS)} seconds'")
+    candidate = (
+        select(Job.id)
+        .where(
+            ((Job.status == "queued") & (Job.run_after <= func.now()))
+            | ((Job.status == "running") & (Job.heartbeat_at < func.now() - stale))
+        )
+        .order_by(Job.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Job)
+        .where(Job.id == candidate)
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            heartbeat_at=func.now(),
+            started_at=func.coalesce(Job.started_at, func.now()),
+        )
+        .returning(Job.id, Job.kind, Job.payload, Job.progress, Job.attempts)
+    )
+    with engine.begin() as conn:
+        row = conn.execute(stmt).first()
+    if row is None:
+        return None
+    return JobContext(engine, *row)
+
+
+def _finish(engine: Engine, context: JobContext, error: Optional[BaseException]) -> None:
+    if error is None:
+        values = {"status": "done", "finished_at": func.now(), "last_error": None}
+    elif context.attempts >= settings.JOB_MAX_ATTEMPTS:
+        values = {"status": "failed", "finished_at": func.now(), "last_error": repr(error)}
+    else:
+        delay = literal_column(f"interval '{RETRY_BASE_SECONDS * 2 ** (context.attempts - 1)} seconds'")
+        values = {"status": "queued", "run_after": func.now() + delay, "last_error": repr(error)}
+    with engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == context.job_id).values(progress=context.progress, **values))
+
+
+def run_one(engine: Engine) -> bool:
+    """작업 하나를 가져와 실행. 가져온 작업이 없으면 False."""
+    context = claim_next(engine)
+    if context is None:
+        return False
+    handler = HANDLERS.get(context.kind)
+    error: Optional[BaseException] = None
+    try:
+        if handler is None:
+            raise LookupError(f"no handler registered for job kind {context.kind!r}")
+        handler(context)
+    except Exception as exc:
+        error = exc
+        logger.warning("job_failed id=%s kind=%s attempts=%s", context.job_id, context.kind, context.attempts, exc_info=True)
+    _finish(engine, context, error)
+    if error is None:
+        logger.info("job_done id=%s kind=%s progress=%s", context.job_id, context.kind, context.progress)
+    return True
+
+
+def start_job_worker(engine: Engine, poll_seconds: float) -> threading.Thread:
+    """앱 프로세스 안에서 작업을 처리하는 데몬 스레드 시작. stop_job_worker() 를 부르면 현재 작업을 마친 뒤 종료."""
+    _stop.clear()
+
+    def loop():
+        while not _stop.is_set():
+            try:
+                if run_one(engine):
+                    continue
+            except Exception:
+                logger.warning("job_worker_poll_failed", exc_info=True)
+            _wakeup.wait(poll_seconds)
+            _wakeup.clear()
+
+    thread = threading.Thread(target=loop, name="job-worker", daemon=True)
+    thread.start()
+    return thread
+
+
+def stop_job_worker() -> None:
+    _stop.set()
+    _wakeup.set()
+
+
+def main():
+    from db.session import engine
+    import jobs.account_deletion  # noqa: F401  (핸들러 등록)
+
+    parser = argparse.ArgumentParser(description="Process queued background jobs.")
+    parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling forever")
+    args = parser.parse_args()
+
+    if args.once:
+        processed = 0
+        while run_one(engine):
+            processed += 1
+        print(f"Processed {processed} job(s).")
+        return
+    start_job_worker(engine, settings.JOB_POLL_SECONDS).join()
+
+
+if __name__ == "__main__":
+    main()
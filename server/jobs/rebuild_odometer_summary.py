@@ -0,0 +1,54 @@
+"""
+vehicle_odometer_summary / vehicle_odometer_monthly 를 로그에서 다시 만드는 복구 명령.
+- 평소에는 로그 쓰기와 같은 트랜잭션에서 갱신되므로, 수동 SQL 수정 등으로 어긋났을 때만 실행
+- 차량 행을 잠그고 차량 단위로 재집계하므로 서비스 중에 실행해도 안전
+- 실행: python -m jobs.rebuild_odometer_summary [--vehicle-id N] [--batch-size N]
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.odometer import refresh_odometer_summary
+# 관계(relationship) 해석을 위해 모든 모델 import
+from models import CarMaker, CarMakerAbroad, CarModel, CarModelAbroad, ChargingRecord, ConsumableItem, Expense, FuelRecord, MaintenanceRecord, Notification, Tire, User, VehicleOdometerLog, VehicleOdometerSummary, legalinfo  # noqa: F401
+from models.Vehicle import Vehicle
+
+
+def rebuild(db: Session, vehicle_id: Optional[int] = None, batch_size: int = 200) -> int:
+    rebuilt = 0
+    last_id = 0
+    while True:
+        query = select(Vehicle.id).where(Vehicle.id > last_id).order_by(Vehicle.id).limit(batch_size)
+        if vehicle_id is not None:
+            query = query.where(Vehicle.id == vehicle_id)
+        vehicle_ids = db.scalars(query.with_for_update()).all()
+        if not vehicle_ids:
+            break
+        for current_id in vehicle_ids:
+            refresh_odometer_summary(db, current_id)
+        db.commit()
+        rebuilt += len(vehicle_ids)
+        last_id = vehicle_ids[-1]
+        print(f"[ODOMETER] vehicles <= {last_id}: rebuilt {len(vehicle_ids)}")
+    return rebuilt
+
+
+def main():
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild odometer summary tables from vehicle_odometer_logs.")
+    parser.add_argument("--vehicle-id", type=int, default=None, help="Only rebuild this vehicle")
+    parser.add_argument("--batch-size", type=int, default=200, help="Vehicles per transaction")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        rebuilt = rebuild(db, args.vehicle_id, args.batch_size)
+    print(f"Rebuilt odometer summary for {rebuilt} vehicle(s).")
+
+
+if __name__ == "__main__":
+    main()
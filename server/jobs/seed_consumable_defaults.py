@@ -0,0 +1,51 @@
+"""
+기존 차량에 소모품 기본 설정 항목(consumable_items)을 채우는 백필.
+- 새 차량은 vehicles.add_vehicle 에서 생성과 함께 시드되므로 배포 시 한 번만 실행하면 됨
+- 차량 id 구간 단위로 INSERT ... ON CONFLICT DO NOTHING 을 실행하고 구간마다 커밋 (재실행해도 안전)
+- 실행: python -m jobs.seed_consumable_defaults [--batch-size N]
+"""
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.consumables import seed_default_items
+# 관계(relationship) 해석을 위해 모든 모델 import
+from models import CarMaker, CarMakerAbroad, CarModel, CarModelAbroad, ChargingRecord, ConsumableItem, Expense, FuelRecord, MaintenanceRecord, Notification, Tire, User, VehicleOdometerLog, VehicleOdometerSummary, legalinfo  # noqa: F401
+from models.Vehicle import Vehicle
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    inserted = 0
+    last_id = 0
+    while True:
+        vehicle_ids = db.scalars(
+            select(Vehicle.id).where(Vehicle.id > last_id).order_by(Vehicle.id).limit(batch_size)
+        ).all()
+        if not vehicle_ids:
+            break
+        count = seed_default_items(db, vehicle_ids)
+        db.commit()
+        inserted += count
+        last_id = vehicle_ids[-1]
+        print(f"[SEED] vehicles <= {last_id}: +{count} item(s)")
+    return inserted
+
+
+def main():
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Seed default consumable items for existing vehicles.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Vehicles per transaction")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count()).select_from(Vehicle))
+        inserted = backfill(db, args.batch_size)
+    print(f"Seeded {inserted} item(s) across {total} vehicle(s).")
+
+
+if __name__ == "__main__":
+    main()
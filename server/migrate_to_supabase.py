@@ -16,12 +16,14 @@ from models import (  # noqa: F401
     ConsumableItem,
     Expense,
     FuelRecord,
+    Job,
     MaintenanceRecord,
     Notification,
     Tire,
     User,
     Vehicle,
     VehicleOdometerLog,
+    VehicleOdometerSummary,
     legalinfo,
 )
 
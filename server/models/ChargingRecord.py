@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 
 from db.session import Base
@@ -6,9 +6,13 @@ from db.session import Base
 
 class ChargingRecord(Base):
     __tablename__ = "charging_records"
+    __table_args__ = (
+        Index("ix_charging_records_vehicle_odo_date_id", "vehicle_id", "odo_km", "date", "id"),
+        Index("ix_charging_records_vehicle_date_id", "vehicle_id", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True, nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), index=True, nullable=False)
     date = Column(Date, nullable=False)
     energy_kwh = Column(Numeric(10, 3), nullable=False)
     price_total = Column(Numeric(12, 2), nullable=False)
@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, DateTime, Index
 from db.session import Base
 from datetime import datetime
 
 # History table: public.consumables
 class Consumable(Base):
     __tablename__ = "consumables"
+    __table_args__ = (
+        Index("ix_consumables_user_vehicle_category_kind_date", "user_id", "vehicle_id", "category", "kind", "date"),
+        Index("ix_consumables_vehicle_date_id", "vehicle_id", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False)
     category = Column(String, index=True)    # 오일/필터/타이어/소모품 등
     kind = Column(String, index=True)        # 엔진오일 등
     date = Column(Date, nullable=True)       # 교체일
@@ -21,10 +25,15 @@ class Consumable(Base):
 # Settings table: public.consumable_items
 class ConsumableItem(Base):
     __tablename__ = "consumable_items"
+    __table_args__ = (
+        # 기본 항목 시드의 ON CONFLICT 대상
+        Index("uq_consumable_items_user_vehicle_category_kind", "user_id", "vehicle_id", "category", "kind", unique=True),
+        Index("ix_consumable_items_vehicle_id", "vehicle_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False)
     category = Column(String, index=True)    # 오일/필터/타이어/소모품 등
     kind = Column(String, index=True)        # 엔진오일/미션오일 등
     mode = Column(String, nullable=True)     # distance | time
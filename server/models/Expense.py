@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index, Numeric
 from db.session import Base
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_vehicle_date_id", "vehicle_id", "date", "id"),
+    )
     id = Column(Integer, primary_key=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True, nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), index=True, nullable=False)
     date = Column(Date, nullable=False)
     type = Column(String(32), nullable=False)  # 보험/세금/정비비 등
     amount = Column(Numeric(12,2), default=0)
@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey, Numeric, Boolean
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, Numeric, Boolean
 from sqlalchemy.orm import relationship
 from db.session import Base
 
 class FuelRecord(Base):
     __tablename__ = "fuel_records"
+    __table_args__ = (
+        Index("ix_fuel_records_vehicle_date_id", "vehicle_id", "date", "id"),
+        Index("ix_fuel_records_vehicle_odo", "vehicle_id", "odo_km"),
+    )
     id = Column(Integer, primary_key=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True, nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), index=True, nullable=False)
     date = Column(Date, nullable=False)
     liters = Column(Numeric(10,3), nullable=False)
     price_total = Column(Numeric(12,2), nullable=False)
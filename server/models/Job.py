@@ -0,0 +1,35 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db.session import Base
+
+
+# 요청 밖에서 처리하는 백그라운드 작업 (jobs/queue.py). id 는 추측할 수 없도록 UUID (공개 상태 조회에 사용)
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        # 같은 대상에 대한 작업은 대기/실행 중인 것이 하나만 있도록
+        Index(
+            "uq_jobs_active_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(32), nullable=False)
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, done, failed
+    payload = Column(JSONB, nullable=False, default=dict)
+    progress = Column(JSONB, nullable=False, default=dict)
+    dedupe_key = Column(String(64), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,16 +1,32 @@
-﻿from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, Text, DateTime
+﻿from sqlalchemy import DDL, Column, Computed, Integer, String, Date, ForeignKey, Index, Numeric, Text, DateTime, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from db.session import Base
 
+# 검색 대상 텍스트 (제목 + 정비소 + 메모). 두 생성 컬럼이 같은 식을 쓰므로 한 곳에서 정의
+SEARCH_TEXT_SQL = "coalesce(title, '') || ' ' || coalesce(shop_name, '') || ' ' || coalesce(notes, '')"
+# 한국어 형태소 사전이 없으므로 단어 단위(simple) 사전 사용. 부분 일치는 pg_trgm 인덱스가 담당
+SEARCH_CONFIG = "simple"
+
 
 class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
+    __table_args__ = (
+        Index("ix_maintenance_records_vehicle_service_date_id", "vehicle_id", "service_date", "id"),
+        Index("ix_maintenance_records_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_maintenance_records_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
     service_date = Column(Date, nullable=False, index=True)
     title = Column(String(120), nullable=False)
     service_type = Column(String(16), nullable=False, index=True)  # scheduled, unscheduled
@@ -20,5 +36,14 @@ class MaintenanceRecord(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # 쓰기 시 DB 가 직접 갱신하는 검색용 생성 컬럼 (목록 응답에는 필요 없으므로 지연 로딩)
+    search_text = deferred(Column(Text, Computed(SEARCH_TEXT_SQL, persisted=True)))
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, {SEARCH_TEXT_SQL})", persisted=True))
+    )
 
     vehicle = relationship("Vehicle", backref="maintenance_records")
+
+
+# gin_trgm_ops 인덱스를 create_all 로 만들기 전에 확장이 있어야 함
+event.listen(MaintenanceRecord.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
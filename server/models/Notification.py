@@ -5,9 +5,12 @@ class Notification(Base):
     __tablename__ = "notifications"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True, nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), index=True, nullable=False)
     type = Column(String(32))  # "oil", "filter", "consumable" 등
     due_date = Column(Date, nullable=True)
     due_odo = Column(Integer, nullable=True)
     sent_at = Column(Date, nullable=True)
     enabled = Column(Boolean, default=True)  # 알림 설정 여부 추가
+    # 소모품 항목별 교체 예정 행 (jobs/consumable_due.py 가 채움). NULL 이면 type 단위 알림 설정 행
+    item_id = Column(Integer, ForeignKey("consumable_items.id", ondelete="CASCADE"), unique=True, nullable=True)
+    status = Column(String(16), nullable=True)  # ok | due | overdue
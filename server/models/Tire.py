@@ -1,5 +1,5 @@
 ﻿from enum import Enum
-from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -30,7 +30,7 @@ class VehicleTire(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
     position = Column(String(16), nullable=False, index=True)
     brand = Column(String(64), nullable=True)
     model = Column(String(64), nullable=True)
@@ -55,11 +55,14 @@ class VehicleTire(Base):
 
 class TireMeasurement(Base):
     __tablename__ = "tire_measurements"
+    __table_args__ = (
+        Index("ix_tire_measurements_tire_measured_at", "tire_id", "measured_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
-    tire_id = Column(Integer, ForeignKey("vehicle_tires.id"), nullable=False, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
+    tire_id = Column(Integer, ForeignKey("vehicle_tires.id", ondelete="CASCADE"), nullable=False, index=True)
     measured_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     pressure_kpa = Column(Float, nullable=True)
     tread_depth_mm = Column(Float, nullable=True)
@@ -73,11 +76,15 @@ class TireMeasurement(Base):
 
 class TireServiceRecord(Base):
     __tablename__ = "tire_service_records"
+    __table_args__ = (
+        Index("ix_tire_service_records_tire_performed_at", "tire_id", "performed_at", "id"),
+        Index("ix_tire_service_records_vehicle_performed_at", "vehicle_id", "performed_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
-    tire_id = Column(Integer, ForeignKey("vehicle_tires.id"), nullable=True, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
+    tire_id = Column(Integer, ForeignKey("vehicle_tires.id", ondelete="CASCADE"), nullable=True, index=True)
     positions = Column(String(64), nullable=True)
     service_type = Column(String(32), nullable=False)
     performed_at = Column(Date, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from db.session import Base
@@ -9,4 +9,20 @@ class User(Base):
     username = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 탈퇴 요청 시각. 값이 있으면 로그인/인증 불가이고 jobs/account_deletion.py 가 데이터를 지운 뒤 행도 삭제
+    disabled_at = Column(DateTime, nullable=True)
+    # 인증된 요청이 있었던 대략의 시각 (core/auth.py 가 LAST_ACTIVE_TOUCH_MINUTES 간격으로만 갱신). NULL 이면 created_at 기준
+    last_active_at = Column(DateTime, nullable=True)
     vehicles = relationship("Vehicle", back_populates="user", cascade="all, delete-orphan")
+
+
+# 비회원(guest_ 로 시작하는 아이디) 판별 조건. 부분 인덱스 조건과 글자까지 같아야 플래너가 인덱스를 사용
+GUEST_USERNAME_SQL = "username LIKE 'guest\\_%'"
+
+# 오래 사용하지 않은 비회원 정리(jobs/guest_gc.py)를 마지막 활동 시각 순으로 인덱스만 읽어 찾기 위함
+Index(
+    "ix_users_guest_last_active",
+    func.coalesce(User.last_active_at, User.created_at),
+    User.id,
+    postgresql_where=text(GUEST_USERNAME_SQL),
+)
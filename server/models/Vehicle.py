@@ -20,6 +20,6 @@ class Vehicle(Base):
     owner_name = Column(String(64))
 
     user = relationship("User", back_populates="vehicles")
-    fuel_records = relationship("FuelRecord", back_populates="vehicle", cascade="all, delete-orphan")
-    charging_records = relationship("ChargingRecord", back_populates="vehicle", cascade="all, delete-orphan")
-    tires = relationship("VehicleTire", back_populates="vehicle", cascade="all, delete-orphan")
+    fuel_records = relationship("FuelRecord", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
+    charging_records = relationship("ChargingRecord", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
+    tires = relationship("VehicleTire", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Date, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 from db.session import Base
 
 class VehicleOdometerLog(Base):
     __tablename__ = "vehicle_odometer_logs"
+    __table_args__ = (
+        Index("ix_vehicle_odometer_logs_vehicle_date_id", "vehicle_id", "date", "id", postgresql_include=["odo_km"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, TIMESTAMP, func
+from db.session import Base
+
+
+# 차량별 주행 기록 요약 (vehicle_odometer_logs 쓰기 시 같은 트랜잭션에서 갱신, api/odometer.py 참고)
+class VehicleOdometerSummary(Base):
+    __tablename__ = "vehicle_odometer_summary"
+
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), primary_key=True)
+    first_date = Column(Date, nullable=True)
+    first_km = Column(Integer, nullable=True)
+    last_date = Column(Date, nullable=True)
+    last_km = Column(Integer, nullable=True)
+    log_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+# 차량별 월 단위 요약 (month 는 해당 월 1일)
+class VehicleOdometerMonthly(Base):
+    __tablename__ = "vehicle_odometer_monthly"
+
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    first_date = Column(Date, nullable=False)
+    first_km = Column(Integer, nullable=False)
+    last_date = Column(Date, nullable=False)
+    last_km = Column(Integer, nullable=False)
+    max_km = Column(Integer, nullable=False)
+    log_count = Column(Integer, nullable=False)
@@ -15,7 +15,7 @@ class LegalInfo(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # 보험 관련
     insurance_company = Column(String(100), nullable=True)
@@ -55,9 +55,9 @@ class LegalNotification(Base):
     __tablename__ = "legal_notifications"
 
     id = Column(Integer, primary_key=True, index=True)
-    legal_id = Column(Integer, ForeignKey("legal_info.id", ondelete="CASCADE"), nullable=False)
+    legal_id = Column(Integer, ForeignKey("legal_info.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), nullable=False, index=True)
 
     type = Column(String(50), nullable=False)  # 예: insurance, tax, inspection
     due_date = Column(Date, nullable=True)
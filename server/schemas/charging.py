@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Optional
 
 from pydantic import BaseModel
@@ -7,7 +8,7 @@ from schemas.common import ORMBase
 
 class ChargingCreate(BaseModel):
     vehicle_id: int
-    date: str
+    date: date
     energy_kwh: float
     price_total: float
     odo_km: int
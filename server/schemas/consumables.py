@@ -1,6 +1,6 @@
 ﻿from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 
 
 # NOTE:
@@ -41,5 +41,13 @@ class Consumable(ConsumableBase):
     class Config:
         from_attributes = True
 
+class ConsumableUsage(BaseModel):
+    """종류(kind)별 교체 이력 요약: 가장 최근 기록 + 최대 주행거리/최대 교체일 + 기록 수."""
+    kind: str
+    latest: Consumable
+    max_odo_km: Optional[int] = None
+    max_date: Optional[date] = None
+    count: int
+
 class BulkDeleteRequest(BaseModel):
     ids: List[int]
@@ -1,10 +1,11 @@
+from datetime import date
+
 from pydantic import BaseModel
-from typing import Optional
 from schemas.common import ORMBase
 
 class FuelCreate(BaseModel):
     vehicle_id: int
-    date: str
+    date: date
     liters: float
     price_total: float
     odo_km: int
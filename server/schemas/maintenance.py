@@ -39,6 +39,16 @@ class MaintenanceOut(MaintenanceBase):
         from_attributes = True
 
 
+class MaintenanceSearchHit(MaintenanceOut):
+    rank: float
+    snippet: str
+
+
+class MaintenanceSearchResponse(BaseModel):
+    items: List[MaintenanceSearchHit]
+    next_offset: Optional[int] = None
+
+
 class MaintenanceOverview(BaseModel):
     vehicle_id: int
     total_cost_month: Decimal
@@ -47,3 +57,17 @@ class MaintenanceOverview(BaseModel):
     unscheduled_count_month: int
     last_service_date: Optional[date]
     recent: List[MaintenanceOut]
+
+
+class MaintenanceMonthSummary(BaseModel):
+    month: date
+    total_cost_month: Decimal
+    total_count_month: int
+    scheduled_count_month: int
+    unscheduled_count_month: int
+    last_service_date_month: Optional[date]
+
+
+class MaintenanceOverviewSeries(BaseModel):
+    vehicle_id: int
+    items: List[MaintenanceMonthSummary]
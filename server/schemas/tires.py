@@ -96,6 +96,8 @@ class TireHistoryResponse(BaseModel):
     tire: TireSummaryItem
     measurements: List[TireMeasurementOut]
     services: List[TireServiceRecordOut]
+    measurements_next_cursor: Optional[str] = None
+    services_next_cursor: Optional[str] = None
 
 
 class TireRotationCreate(BaseModel):
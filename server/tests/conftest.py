@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# server/ 를 import 경로에 추가 (앱 모듈은 server/ 기준 절대 import 를 사용)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
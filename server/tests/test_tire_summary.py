@@ -0,0 +1,95 @@
+"""
+GET /api/tires/summary 의 쿼리 수가 계측 기록 수와 무관하게 고정인지 확인.
+- DATABASE_URL 의 PostgreSQL 이 필요하고, 접속할 수 없으면 건너뜀
+- 모든 데이터는 한 트랜잭션 안에서 만들고 끝나면 ROLLBACK
+"""
+import importlib
+import secrets
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from api.tires import get_tire_summary
+from db.instrumentation import begin_request
+from db.session import engine
+from models.User import User
+
+# 앱을 불러와 요청별 쿼리 집계 이벤트(setup_db_timing_logging)를 등록
+importlib.import_module("app")
+
+MEASUREMENTS_PER_TIRE = 50
+
+
+@pytest.fixture
+def db():
+    try:
+        connection = engine.connect()
+    except OperationalError as exc:
+        pytest.skip(f"database unavailable: {exc}")
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+def _seed_vehicle(db: Session) -> tuple[User, int]:
+    user_id = db.execute(
+        text("INSERT INTO users (username, password_hash) VALUES (:name, '!test!') RETURNING id"),
+        {"name": f"test_{secrets.token_hex(5)}"},
+    ).scalar_one()
+    vehicle_id = db.execute(
+        text("INSERT INTO vehicles (user_id, plate_no) VALUES (:uid, 'TEST') RETURNING id"), {"uid": user_id}
+    ).scalar_one()
+    db.execute(
+        text(
+            "INSERT INTO vehicle_tires (user_id, vehicle_id, position, pressure_unit) "
+            "SELECT :uid, :vid, p, 'kPa' FROM unnest(ARRAY['front_left', 'front_right', 'rear_left', 'rear_right']) p"
+        ),
+        {"uid": user_id, "vid": vehicle_id},
+    )
+    db.execute(
+        text(
+            "INSERT INTO tire_service_records (user_id, vehicle_id, tire_id, service_type, performed_at) "
+            "SELECT :uid, :vid, id, 'rotation', current_date FROM vehicle_tires WHERE vehicle_id = :vid"
+        ),
+        {"uid": user_id, "vid": vehicle_id},
+    )
+    return db.get(User, user_id), vehicle_id
+
+
+def _add_measurements(db: Session, user: User, vehicle_id: int, per_tire: int) -> None:
+    db.execute(
+        text(
+            "INSERT INTO tire_measurements (user_id, vehicle_id, tire_id, measured_at, pressure_kpa) "
+            "SELECT :uid, :vid, t.id, now() - make_interval(days => d), 230 + d "
+            "FROM vehicle_tires t, generate_series(1, :n) d WHERE t.vehicle_id = :vid"
+        ),
+        {"uid": user.id, "vid": vehicle_id, "n": per_tire},
+    )
+
+
+def _summary_query_count(db: Session, user: User, vehicle_id: int) -> int:
+    db.expire_all()
+    stats = begin_request("GET", "/api/tires/summary")
+    summary = get_tire_summary(vehicleId=vehicle_id, db=db, current_user=user)
+    assert len(summary.tires) == 4
+    return stats["count"]
+
+
+def test_summary_query_count_independent_of_measurements(db):
+    user, vehicle_id = _seed_vehicle(db)
+
+    _add_measurements(db, user, vehicle_id, 1)
+    with_one = _summary_query_count(db, user, vehicle_id)
+
+    _add_measurements(db, user, vehicle_id, MEASUREMENTS_PER_TIRE)
+    with_many = _summary_query_count(db, user, vehicle_id)
+
+    assert with_one > 0
+    assert with_many == with_one
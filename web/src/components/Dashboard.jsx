@@ -23,7 +23,11 @@ const menu = [
 const DUE_TONE_PRIORITY = { danger: 0, warn: 1, ok: 2, muted: 3 };
 const DASHBOARD_CACHE_TTL = 60 * 1000;
 const dashboardSnapshotCache = new Map();
-const dashboardDueCache = new Map();
+// 홈 화면 데이터는 /vehicles/{id}/dashboard 한 번으로 받음 (법적 서류는 bootstrap 의 legalSummary 사용)
+const DASHBOARD_SECTIONS = ["fuel", "charging", "odometer", "consumables", "tires"];
+const DUE_SECTIONS = ["consumables", "tires"];
+const EMPTY_FUEL_STATS = { avg_km_per_l: null, total_cost: null, avg_cost_per_l: null };
+const EMPTY_CHARGE_STATS = { avg_km_per_kwh: null, total_cost: null, total_kwh: null, avg_cost_per_kwh: null };
 const FUEL_TYPE_LABEL = {
   gasoline: "휘발유",
   diesel: "경유",
@@ -45,6 +49,7 @@ export default function Dashboard({ vehicle, onVehicleRefresh, costRefreshKey =
   const [odoKm, setOdoKm] = useState("");
   const [odoSaving, setOdoSaving] = useState(false);
   const [dueSummary, setDueSummary] = useState({ loading: true, items: [], error: null });
+  const [dueSources, setDueSources] = useState(null);
   const [dueModalOpen, setDueModalOpen] = useState(false);
   const [adStatus, setAdStatus] = useState(isAdMobSupported() ? "loading" : "web");
 
@@ -68,6 +73,7 @@ export default function Dashboard({ vehicle, onVehicleRefresh, costRefreshKey =
     setChargeStats(cached.chargeStats);
     setExpenseMonthly(cached.expenseMonthly);
     setCurrentOdo(cached.currentOdo);
+    setDueSources(cached.dueSources ?? null);
     setOdoReady(true);
   }, [snapshotCacheKey, vehicle?.id]);
 
@@ -81,28 +87,31 @@ export default function Dashboard({ vehicle, onVehicleRefresh, costRefreshKey =
 
     let cancelled = false;
 
-    Promise.allSettled([
-      api.get("/fuel/stats", { params: { vehicleId: vehicle.id } }),
-      api.get("/charging/stats", { params: { vehicleId: vehicle.id } }),
-      api.get("/odometer/current", { params: { vehicleId: vehicle.id } }),
-    ]).then((results) => {
-      if (cancelled) return;
-      const nextStats = results[0].status === "fulfilled" ? results[0].value.data : { avg_km_per_l: null, total_cost: null, avg_cost_per_l: null };
-      const nextChargeStats =
-        results[1].status === "fulfilled" ? results[1].value.data : { avg_km_per_kwh: null, total_cost: null, total_kwh: null, avg_cost_per_kwh: null };
-      const nextOdo = results[2].status === "fulfilled" ? results[2].value.data?.odo_km : null;
-      setStats(nextStats);
-      setChargeStats(nextChargeStats);
-      setCurrentOdo(nextOdo);
-      setOdoReady(true);
-      dashboardSnapshotCache.set(snapshotCacheKey, {
-        timestamp: Date.now(),
-        stats: nextStats,
-        chargeStats: nextChargeStats,
-        currentOdo: nextOdo,
-        expenseMonthly: hasFreshCache ? cached.expenseMonthly : expenseMonthly,
+    fetchVehicleDashboard(vehicle.id, DASHBOARD_SECTIONS)
+      .catch((error) => {
+        console.error("대시보드 데이터를 불러오지 못했습니다.", error);
+        return null;
+      })
+      .then((data) => {
+        if (cancelled) return;
+        const nextStats = data?.fuel ?? EMPTY_FUEL_STATS;
+        const nextChargeStats = data?.charging ?? EMPTY_CHARGE_STATS;
+        const nextOdo = data?.odometer?.odo_km ?? null;
+        const nextDueSources = data ? { consumables: data.consumables, tires: data.tires } : null;
+        setStats(nextStats);
+        setChargeStats(nextChargeStats);
+        setCurrentOdo(nextOdo);
+        setDueSources(nextDueSources);
+        setOdoReady(true);
+        dashboardSnapshotCache.set(snapshotCacheKey, {
+          timestamp: Date.now(),
+          stats: nextStats,
+          chargeStats: nextChargeStats,
+          currentOdo: nextOdo,
+          dueSources: nextDueSources,
+          expenseMonthly: hasFreshCache ? cached.expenseMonthly : expenseMonthly,
+        });
       });
-    });
 
     return () => {
       cancelled = true;
@@ -148,6 +157,7 @@ export default function Dashboard({ vehicle, onVehicleRefresh, costRefreshKey =
             stats: previous.stats ?? stats,
             chargeStats: previous.chargeStats ?? chargeStats,
             currentOdo: previous.currentOdo ?? currentOdo,
+            dueSources: previous.dueSources ?? dueSources,
           });
         }
       } catch (error) {
@@ -164,47 +174,46 @@ export default function Dashboard({ vehicle, onVehicleRefresh, costRefreshKey =
     };
   }, [vehicle?.id, snapshotCacheKey]);
 
+  // 교체 알림 다시 불러오기: 소모품/타이어 섹션만 다시 받음
   const loadDueSummary = useCallback(async () => {
-    if (!vehicle) {
-      setDueSummary({ loading: false, items: [], error: null });
-      return;
-    }
-    const baseMileage = Number.isFinite(Number(currentOdo))
-      ? Number(currentOdo)
-      : Number.isFinite(Number(vehicle?.odo_km))
-      ? Number(vehicle?.odo_km)
-      : null;
-    const dueCacheKey = `${vehicle.id}:${baseMileage ?? "none"}:${JSON.stringify(legalSummary ?? {})}`;
-    const cached = dashboardDueCache.get(dueCacheKey);
-    if (cached && Date.now() - cached.timestamp <= DASHBOARD_CACHE_TTL) {
-      setDueSummary({ loading: false, items: cached.items, error: null });
-      return;
-    }
-
+    if (!vehicle?.id) return;
     setDueSummary((prev) => ({ ...prev, loading: true, error: null }));
     try {
-      const [consumableDue, tireDue] = await Promise.all([
-        summarizeConsumableDue(vehicle.id, baseMileage),
-        summarizeTireDue(vehicle.id),
-      ]);
-      const legalDue = summarizeLegalDue(legalSummary);
-      const items = [...consumableDue, ...tireDue, ...legalDue].sort((a, b) => {
-        const diff = DUE_TONE_PRIORITY[a.tone] - DUE_TONE_PRIORITY[b.tone];
-        if (diff !== 0) return diff;
-        return a.area.localeCompare(b.area, "ko-KR");
-      });
-      dashboardDueCache.set(dueCacheKey, { timestamp: Date.now(), items });
-      setDueSummary({ loading: false, items, error: null });
+      const data = await fetchVehicleDashboard(vehicle.id, DUE_SECTIONS);
+      const nextDueSources = { consumables: data.consumables, tires: data.tires };
+      setDueSources(nextDueSources);
+      const previous = dashboardSnapshotCache.get(snapshotCacheKey);
+      if (previous) {
+        dashboardSnapshotCache.set(snapshotCacheKey, { ...previous, dueSources: nextDueSources });
+      }
     } catch (error) {
-        console.error("교체 알림 정보를 불러오지 못했습니다.", error);
-        setDueSummary({ loading: false, items: [], error: "교체 알림 정보를 불러오지 못했습니다." });
+      console.error("교체 알림 정보를 불러오지 못했습니다.", error);
+      setDueSummary({ loading: false, items: [], error: "교체 알림 정보를 불러오지 못했습니다." });
     }
-  }, [vehicle, currentOdo, legalSummary]);
+  }, [vehicle?.id, snapshotCacheKey]);
 
   useEffect(() => {
     if (!vehicle || !odoReady) return;
-    loadDueSummary();
-  }, [vehicle, odoReady, loadDueSummary]);
+    if (!dueSources) {
+      setDueSummary({ loading: false, items: [], error: "교체 알림 정보를 불러오지 못했습니다." });
+      return;
+    }
+    const baseMileage = Number.isFinite(Number(currentOdo))
+      ? Number(currentOdo)
+      : Number.isFinite(Number(vehicle?.odo_km))
+      ? Number(vehicle?.odo_km)
+      : null;
+    const items = [
+      ...buildConsumableDue(dueSources.consumables, baseMileage),
+      ...buildTireDue(dueSources.tires),
+      ...summarizeLegalDue(legalSummary),
+    ].sort((a, b) => {
+      const diff = DUE_TONE_PRIORITY[a.tone] - DUE_TONE_PRIORITY[b.tone];
+      if (diff !== 0) return diff;
+      return a.area.localeCompare(b.area, "ko-KR");
+    });
+    setDueSummary({ loading: false, items, error: null });
+  }, [vehicle, odoReady, dueSources, currentOdo, legalSummary]);
 
   useEffect(() => {
     let cancelled = false;
@@ -628,78 +637,71 @@ function DueItemsSheet({ open, onClose, summary, onReload, onItemSelect })
   );
 }
 
-export async function summarizeConsumableDue(vehicleId, currentMileage) {
-  const chunks = await Promise.all(
-    CONSUMABLE_CATEGORY_META.map(async (meta) => {
-      const [itemsRes, historyRes] = await Promise.all([
-        api.get("/consumables/items", { params: { vehicleId, category: meta.category } }),
-        api.get("/consumables/search", {
-          params: { vehicleId, category: meta.category, sort: "id", order: "desc" },
-        }),
-      ]);
-      const items = itemsRes.data || [];
-      const history = historyRes.data || [];
-      const { latestOdo, latestDate } = summarizeOdoFromHistory(history);
-      return items
-        .map((item) => {
-          const status = computeConsumableStatus({
-            item,
-            currentMileage,
-            latestOdo: latestOdo[item.kind],
-            latestDate: latestDate[item.kind],
-          });
-          if (status.tone === "danger" || status.tone === "warn" || status.tone === "muted") {
-            return {
-              id: `${meta.category}-${item.kind || "unknown"}`,
-              area: meta.panelLabel || meta.category,
-              name: item.kind || meta.panelLabel || meta.category,
-              status: status.message,
-              tone: status.tone,
-              category: meta.key,
-              kind: item.kind || null,
-            };
-          }
-          return null;
-        })
-        .filter(Boolean);
-    }),
-  );
-
-  return chunks.flat();
+export async function fetchVehicleDashboard(vehicleId, sections) {
+  const { data } = await api.get(`/vehicles/${vehicleId}/dashboard`, {
+    params: sections?.length ? { include: sections.join(",") } : {},
+  });
+  return data;
 }
 
-export async function summarizeTireDue(vehicleId) {
-  try {
-    const { data } = await api.get("/tires/summary", { params: { vehicleId } });
-    const tires = data?.tires || [];
-    return tires
-      .filter((tire) => Array.isArray(tire.warnings) && tire.warnings.length)
-      .map((tire) => {
-        const tone =
-          tire.status === "critical"
-            ? "danger"
-            : tire.status === "warning"
-            ? "warn"
-            : "muted";
-        const localizedWarnings = (tire.warnings || []).map(localizeTireWarning).filter(Boolean);
-        const statusParts = [
-          tire.next_action || null,
-          ...localizedWarnings,
-        ].filter(Boolean);
-        return {
-          id: `tire-${tire.position || tire.position_label || Math.random().toString(36).slice(2, 8)}`,
-          area: "타이어 관리",
-          name: localizeTirePosition(tire.position_label || tire.position),
-          status: statusParts.join(" · "),
-          tone,
-          position: tire.position || null,
-        };
+// consumables: 대시보드 응답의 카테고리별 { items, history }
+export function buildConsumableDue(consumables, currentMileage) {
+  return CONSUMABLE_CATEGORY_META.flatMap((meta) => {
+    const section = consumables?.[meta.category] || {};
+    const items = section.items || [];
+    const { latestOdo, latestDate } = summarizeOdoFromHistory(section.history || []);
+    return items
+      .map((item) => {
+        const status = computeConsumableStatus({
+          item,
+          currentMileage,
+          latestOdo: latestOdo[item.kind],
+          latestDate: latestDate[item.kind],
+        });
+        if (status.tone === "danger" || status.tone === "warn" || status.tone === "muted") {
+          return {
+            id: `${meta.category}-${item.kind || "unknown"}`,
+            area: meta.panelLabel || meta.category,
+            name: item.kind || meta.panelLabel || meta.category,
+            status: status.message,
+            tone: status.tone,
+            category: meta.key,
+            kind: item.kind || null,
+          };
+        }
+        return null;
       })
       .filter(Boolean);
-  } catch (error) {
-    console.warn("타이어 요약 정보를 불러오지 못했습니다.", error);
-    return [];
-  }
+  });
+}
+
+// tireSummary: /tires/summary 와 같은 형식
+export function buildTireDue(tireSummary) {
+  const tires = tireSummary?.tires || [];
+  return tires
+    .filter((tire) => Array.isArray(tire.warnings) && tire.warnings.length)
+    .map((tire) => {
+      const tone =
+        tire.status === "critical"
+          ? "danger"
+          : tire.status === "warning"
+          ? "warn"
+          : "muted";
+      const localizedWarnings = (tire.warnings || []).map(localizeTireWarning).filter(Boolean);
+      const statusParts = [
+        tire.next_action || null,
+        ...localizedWarnings,
+      ].filter(Boolean);
+      return {
+        id: `tire-${tire.position || tire.position_label || Math.random().toString(36).slice(2, 8)}`,
+        area: "타이어 관리",
+        name: localizeTirePosition(tire.position_label || tire.position),
+        status: statusParts.join(" · "),
+        tone,
+        position: tire.position || null,
+      };
+    })
+    .filter(Boolean);
 }
 
 function parseYmd(value) {
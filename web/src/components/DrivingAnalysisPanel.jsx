@@ -88,10 +88,18 @@ export function useDrivingAnalysis(vehicle, apiClient = api) {
       } else if (rangeMode === "monthly") {
         const prevMonth = selectedMonth === 1 ? 12 : selectedMonth - 1;
         const prevYear = selectedMonth === 1 ? selectedYear - 1 : selectedYear;
-        [response, comparisonResponse] = await Promise.all([
-          apiClient.get("/odometer/monthly", { params: { vehicleId: vehicle.id, year: selectedYear, month: selectedMonth } }),
-          apiClient.get("/odometer/monthly", { params: { vehicleId: vehicle.id, year: prevYear, month: prevMonth } }),
-        ]);
+        const pad = (value) => String(value).padStart(2, "0");
+        const series = await apiClient.get("/odometer/series", {
+          params: {
+            vehicleId: vehicle.id,
+            granularity: "month",
+            from: `${prevYear}-${pad(prevMonth)}-01`,
+            to: `${selectedYear}-${pad(selectedMonth)}-01`,
+          },
+        });
+        const [prevItem, currentItem] = series?.data?.items || [];
+        response = { data: currentItem };
+        comparisonResponse = { data: prevItem };
       } else {
         response = await apiClient.get("/odometer/range", { params: { vehicleId: vehicle.id, fromDate, toDate } });
       }
@@ -848,34 +848,24 @@ export default function OtherConsumablesPanel({ currentMileage, vehicleId, fuelT
       const qs = new URLSearchParams({
         vehicleId: String(vehicleId),
         category: CATEGORY,
-        sort: "id",
-        order: "desc",
       }).toString();
-      const rows = await request("get", `${apiPrefix}/consumables/search?${qs}`);
+      // 종류별 최근 기록/최대 주행거리/최대 교체일은 서버에서 집계
+      const rows = await request("get", `${apiPrefix}/consumables/usage?${qs}`);
       const odoMap = {};
       const dateMap = {};
       const latestMap = {};
       const kindsWithHistory = new Set();
       if (Array.isArray(rows)) {
         for (const r of rows) {
-          const k = r.kind || r.label;
+          const k = r.kind;
           if (!k) continue;
           kindsWithHistory.add(k);
-          if (!latestMap[k]) latestMap[k] = r;
-          if (r.odo_km != null) {
-            const val = Number(r.odo_km);
-            if (Number.isFinite(val)) {
-              odoMap[k] = Math.max(odoMap[k] ?? 0, val);
-            }
+          latestMap[k] = r.latest;
+          if (r.max_odo_km != null) {
+            odoMap[k] = Number(r.max_odo_km);
           }
-          if (r.date) {
-            const t = Date.parse(r.date);
-            if (!Number.isNaN(t)) {
-              const prev = dateMap[k] ? Date.parse(dateMap[k]) : undefined;
-              if (prev === undefined || t > prev) {
-                dateMap[k] = String(r.date).slice(0, 10);
-              }
-            }
+          if (r.max_date) {
+            dateMap[k] = String(r.max_date).slice(0, 10);
           }
         }
       }
@@ -54,7 +54,7 @@ export default function SettingsPanel({ userId, vehicle, username, accountType,
     try {
       setDeleting(true);
       await api.delete("/auth/me");
-      showToast({ tone: "success", message: "탈퇴가 완료되었습니다.", placement: "center", duration: 1800 });
+      showToast({ tone: "success", message: "탈퇴가 완료되었습니다. 남은 데이터는 잠시 후 모두 삭제됩니다.", placement: "center", duration: 1800 });
       setConfirmDelete(false);
       if (onAccountDeleted) onAccountDeleted();
     } catch (error) {
@@ -1,8 +1,7 @@
 import { useEffect, useMemo, useState } from "react";
 import { useNavigate } from "react-router-dom";
 
-import api from "../api/client";
-import { summarizeConsumableDue, summarizeLegalDue, summarizeTireDue } from "./Dashboard";
+import { buildConsumableDue, buildTireDue, fetchVehicleDashboard, summarizeLegalDue } from "./Dashboard";
 
 const TONE_PRIORITY = { danger: 0, warn: 1, muted: 2, ok: 3 };
 
@@ -59,19 +58,14 @@ export default function TasksPanel({ vehicle, legalSummary = {} }) {
     const run = async () => {
       setLoading(true);
       try {
-        const [statsRes, odoRes] = await Promise.all([
-          api.get("/fuel/stats", { params: { vehicleId: vehicle.id } }),
-          api.get("/odometer/current", { params: { vehicleId: vehicle.id } }),
-        ]);
-        const odo = odoRes.data?.odo_km ?? null;
-        const [consumableDue, tireDue] = await Promise.all([
-          summarizeConsumableDue(vehicle.id, odo),
-          summarizeTireDue(vehicle.id),
-        ]);
+        const data = await fetchVehicleDashboard(vehicle.id, ["fuel", "odometer", "consumables", "tires"]);
+        const odo = data?.odometer?.odo_km ?? null;
+        const consumableDue = buildConsumableDue(data?.consumables, odo);
+        const tireDue = buildTireDue(data?.tires);
         const legalDue = summarizeLegalDue(legalSummary);
 
         if (cancelled) return;
-        setStats(statsRes.data || { avg_km_per_l: null, total_cost: null });
+        setStats(data?.fuel || { avg_km_per_l: null, total_cost: null });
         setCurrentOdo(odo);
         setDueItems([...consumableDue, ...tireDue, ...legalDue]);
       } catch (error) {